@@ -0,0 +1,243 @@
+# api.py
+
+"""
+Stateless HTTP API over core.py, for services that need the simulator's
+results without a Streamlit session.
+
+    python api.py --port 8000 [--workers 4]
+    uvicorn api:app --port 8000 --workers 4
+
+Endpoints:
+    GET  /health
+    GET  /v1/weapons   catalog entries with their yield, burst height and effect radii;
+                       filter with ?q=, ?country=, ?min_yield_kt=, ?max_yield_kt=, ?limit=
+    POST /v1/assess    batches of (weapon, detonation, point) triples
+    GET  /v1/tiles/{field}/{z}/{x}/{y}.png?yield_kt=&hob_m=&lat=&lon=
+                       heatmap tiles (see tiles.py) for the app's TILE_SERVER_URL
+
+A batch is either a list of items
+    {"items": [{"weapon": "...", "detonation": [lat, lon], "point": [lat, lon],
+                "yield_kt": 10, "hob_m": 0}, ...]}
+or columns
+    {"columns": {"weapon": [...], "det_lat": [...], "det_lon": [...],
+                 "lat": [...], "lon": [...], "yield_kt": [...], "hob_m": [...]}}
+or an Arrow IPC stream with those columns (Content-Type
+application/vnd.apache.arrow.stream). yield_kt and hob_m are optional and
+default to the weapon's preset. Add "recommendations": true (or
+?recommendations=1) to also get the static safety text for each zone that
+occurs in the batch.
+
+Results come back as JSON in the shape of the request, or as an Arrow IPC
+stream with ?format=arrow or an Accept header naming the Arrow type. Every
+batch goes through the vectorized core.assess_batch; large ones run in the
+worker thread pool so the event loop keeps serving other requests.
+"""
+
+import argparse
+import json
+
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+import core
+from catalog import get_catalog
+
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+COLUMNS = ("weapon", "det_lat", "det_lon", "lat", "lon", "yield_kt", "hob_m")
+INLINE_MAX_ITEMS = 256
+MAX_BATCH_ITEMS = 2_000_000
+
+
+class BadRequest(ValueError):
+    pass
+
+
+def _columns_from_items(items: list) -> dict:
+    if not isinstance(items, list):
+        raise BadRequest("'items' must be a list")
+    try:
+        return {
+            "weapon": [item["weapon"] for item in items],
+            "det_lat": [item["detonation"][0] for item in items],
+            "det_lon": [item["detonation"][1] for item in items],
+            "lat": [item["point"][0] for item in items],
+            "lon": [item["point"][1] for item in items],
+            "yield_kt": [item.get("yield_kt") for item in items],
+            "hob_m": [item.get("hob_m") for item in items],
+        }
+    except (KeyError, IndexError, TypeError) as exc:
+        raise BadRequest(f"Each item needs 'weapon', 'detonation' and 'point': {exc!r}") from None
+
+
+def _columns_from_arrow(body: bytes) -> dict:
+    import pyarrow as pa
+
+    try:
+        table = pa.ipc.open_stream(body).read_all()
+    except pa.ArrowInvalid as exc:
+        raise BadRequest(f"Invalid Arrow stream: {exc}") from None
+    return {name: table.column(name).to_numpy(zero_copy_only=False) for name in table.column_names}
+
+
+def _batch_size(columns: dict) -> int:
+    if not isinstance(columns, dict):
+        raise BadRequest("'columns' must be an object")
+    missing = [name for name in COLUMNS[:5] if name not in columns]
+    if missing:
+        raise BadRequest(f"Missing columns: {', '.join(missing)}")
+    try:
+        lengths = {len(columns[name]) for name in COLUMNS if columns.get(name) is not None}
+    except TypeError:
+        raise BadRequest("Every column must be a list") from None
+    if len(lengths) != 1:
+        raise BadRequest("All columns must have the same length")
+    n = lengths.pop()
+    if n > MAX_BATCH_ITEMS:
+        raise BadRequest(f"Batch of {n} items exceeds the limit of {MAX_BATCH_ITEMS}")
+    return n
+
+
+def assess(columns: dict, recommendations: bool = False) -> dict:
+    """
+    Runs one batch given as columns; returns result columns plus the
+    per-zone recommendation texts when asked for.
+    """
+    _batch_size(columns)
+    try:
+        result = core.assess_batch(columns["weapon"], columns["det_lat"], columns["det_lon"], columns["lat"],
+                                   columns["lon"], yield_kt=columns.get("yield_kt"), hob_m=columns.get("hob_m"))
+    except (TypeError, ValueError) as exc:
+        raise BadRequest(str(exc)) from None
+    texts = {zone: core.recommendations(zone) for zone in dict.fromkeys(result["zone"])} if recommendations else None
+    return {"columns": result, "recommendations": texts}
+
+
+def _json_response(result: dict, as_items: bool) -> JSONResponse:
+    columns = result["columns"]
+    if as_items:
+        body = {"results": [
+            {"distance_m": d, "zone": z, "yield_kt": y, "hob_m": h}
+            for d, z, y, h in zip(columns["distance_m"].tolist(), columns["zone"].tolist(),
+                                  columns["yield_kt"].tolist(), columns["hob_m"].tolist())
+        ]}
+    else:
+        body = {"columns": {name: values.tolist() for name, values in columns.items()}}
+    if result["recommendations"] is not None:
+        body["recommendations"] = result["recommendations"]
+    return JSONResponse(body)
+
+
+def _arrow_response(result: dict) -> Response:
+    import pyarrow as pa
+
+    columns = result["columns"]
+    table = pa.table({
+        "distance_m": columns["distance_m"],
+        "zone": pa.array(columns["zone"], type=pa.string()).dictionary_encode(),
+        "yield_kt": columns["yield_kt"],
+        "hob_m": columns["hob_m"],
+    })
+    if result["recommendations"] is not None:
+        table = table.replace_schema_metadata({f"recommendations:{zone}": text
+                                               for zone, text in result["recommendations"].items()})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return Response(sink.getvalue().to_pybytes(), media_type=ARROW_MEDIA_TYPE)
+
+
+async def assess_endpoint(request):
+    body = await request.body()
+    wants_arrow = request.query_params.get("format") == "arrow" or ARROW_MEDIA_TYPE in request.headers.get("accept", "")
+    recommendations = request.query_params.get("recommendations") in ("1", "true")
+    try:
+        if request.headers.get("content-type", "").startswith(ARROW_MEDIA_TYPE):
+            columns, as_items = await run_in_threadpool(_columns_from_arrow, body), False
+        else:
+            try:
+                payload = json.loads(body)
+            except ValueError:
+                raise BadRequest("Body must be JSON or an Arrow IPC stream") from None
+            if not isinstance(payload, dict):
+                raise BadRequest("Body must be a JSON object")
+            recommendations = recommendations or bool(payload.get("recommendations"))
+            as_items = "items" in payload
+            columns = _columns_from_items(payload["items"]) if as_items else payload.get("columns", {})
+
+        # Small batches are cheaper to compute inline than to hand to a thread.
+        if _batch_size(columns) <= INLINE_MAX_ITEMS:
+            result = assess(columns, recommendations)
+        else:
+            result = await run_in_threadpool(assess, columns, recommendations)
+    except BadRequest as exc:
+        return JSONResponse({"error": str(exc)}, status_code=400)
+
+    if wants_arrow:
+        return await run_in_threadpool(_arrow_response, result)
+    if len(result["columns"]["zone"]) <= INLINE_MAX_ITEMS:
+        return _json_response(result, as_items)
+    return await run_in_threadpool(_json_response, result, as_items)
+
+
+async def weapons_endpoint(request):
+    params = request.query_params
+    catalog = get_catalog()
+    try:
+        rows = catalog.search(params.get("q", ""), params.get("country"),
+                              float(params["min_yield_kt"]) if "min_yield_kt" in params else None,
+                              float(params["max_yield_kt"]) if "max_yield_kt" in params else None)
+        limit = int(params.get("limit", 100))
+    except ValueError:
+        return JSONResponse({"error": "min_yield_kt, max_yield_kt and limit must be numbers"}, status_code=400)
+    return JSONResponse({"total": len(rows), "weapons": [catalog.record(row) for row in rows[:limit]]})
+
+
+async def tiles_endpoint(request):
+    from tiles import FIELDS, MAX_TILE_ZOOM, blank_tile, field_tile
+
+    field, z, x, y = (request.path_params[key] for key in ("field", "z", "x", "y"))
+    params = request.query_params
+    try:
+        if field not in FIELDS:
+            raise ValueError(f"Unknown field: {field!r}")
+        if not (0 <= z <= MAX_TILE_ZOOM and 0 <= x < 2 ** z and 0 <= y < 2 ** z):
+            raise ValueError(f"No tile {z}/{x}/{y} (zoom 0-{MAX_TILE_ZOOM})")
+        burst = [float(params[key]) for key in ("yield_kt", "hob_m", "lat", "lon")]
+        core.validate_inputs(burst[2], burst[3], burst[2], burst[3], burst[0], burst[1])
+    except KeyError as exc:
+        return JSONResponse({"error": f"Missing query parameter {exc}"}, status_code=400)
+    except ValueError as exc:
+        return JSONResponse({"error": str(exc)}, status_code=400)
+    png = await run_in_threadpool(field_tile, field, *burst, z, x, y)
+    # A tile depends only on its URL, so clients and proxies may keep it.
+    return Response(png or blank_tile(), media_type="image/png", headers={"Cache-Control": "public, max-age=86400"})
+
+
+async def health_endpoint(request):
+    return JSONResponse({"status": "ok"})
+
+
+app = Starlette(routes=[
+    Route("/health", health_endpoint),
+    Route("/v1/weapons", weapons_endpoint),
+    Route("/v1/assess", assess_endpoint, methods=["POST"]),
+    Route("/v1/tiles/{field}/{z:int}/{x:int}/{y:int}.png", tiles_endpoint),
+])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the effect computation over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes (one core each)")
+    args = parser.parse_args(argv)
+
+    import uvicorn
+
+    uvicorn.run("api:app", host=args.host, port=args.port, workers=args.workers, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,18 @@
 # app.py (Final Version with KeyError Fix)
 
+import uuid
+from concurrent.futures import CancelledError
+
 import streamlit as st
-import pandas as pd
-import folium
-import requests
-from streamlit_folium import st_folium
-from geopy.distance import geodesic
-from geopy.geocoders import Nominatim
 
-# Import data and LLM function from other files
-from data import BOMB_DATA
-from llm import get_safety_recommendations
+# Only light modules here. The effect, scenario, fallout and timeline modules
+# (NumPy/SciPy/Shapely) are imported in the sections or cached functions that
+# use them, folium and streamlit-folium in the map section, and geocoding/LLM/
+# raster libraries inside the shared resource getters, so the page starts
+# painting before they load.
+# `python bench/import_budget.py` checks this list against its time budget.
+from resources import get_geocache, get_population_raster, get_recommender, get_scenario
+import perf
 
 # --- 1. APP CONFIGURATION & INITIALIZATION ---
 st.set_page_config(
@@ -19,77 +21,189 @@ st.set_page_config(
     layout="wide",
     initial_sidebar_state="expanded"
 )
+# Per-phase timings for this rerun; a no-op unless the performance panel (or NUKE_PERF=1) is on.
+perf.begin_run(st.session_state.get("perf_panel", False))
 
 # --- Autocomplete & Session State Management ---
-if 'GEOAPIFY_API_KEY' not in st.secrets:
-    st.error("Geoapify API key not found! Please add it to your .streamlit/secrets.toml file.")
+# GAZETTEER is the path prefix of an index built with `python gazetteer.py`.
+API_KEY = st.secrets.get("GEOAPIFY_API_KEY")
+GAZETTEER = st.secrets.get("GAZETTEER")
+if not API_KEY and not GAZETTEER:
+    st.error("Geoapify API key not found! Please add it (or a GAZETTEER index) to your .streamlit/secrets.toml file.")
     st.stop()
-API_KEY = st.secrets["GEOAPIFY_API_KEY"]
 
-geolocator = Nominatim(user_agent="nuclear_bomb_visualizer_app_v9")
+# Endpoints are overridable so benchmarks can point them at local stand-ins (see bench/).
+# GEOAPIFY_MAX_QPS / NOMINATIM_MAX_QPS cap this process's upstream calls (0 = unlimited).
+geocache = get_geocache(API_KEY, GAZETTEER, st.secrets.get("GEOAPIFY_AUTOCOMPLETE_URL"),
+                        st.secrets.get("NOMINATIM_DOMAIN"), st.secrets.get("NOMINATIM_SCHEME"),
+                        st.secrets.get("GEOAPIFY_MAX_QPS"), st.secrets.get("NOMINATIM_MAX_QPS"))
+
+# Optional LLM backend for tailored recommendations (any OpenAI-compatible server).
+recommender = get_recommender(st.secrets.get("LLM_BASE_URL"), st.secrets.get("LLM_MODEL", "gpt-4o-mini"),
+                              st.secrets.get("LLM_API_KEY"), float(st.secrets.get("LLM_TIMEOUT_S", 20)))
+
+# Optional gridded population dataset (.npy + .json sidecar, or GeoTIFF).
+POPULATION_RASTER = st.secrets.get("POPULATION_RASTER")
+# Optional api.py deployment serving the heatmap tiles (/v1/tiles); without it they are sent as image overlays.
+TILE_SERVER_URL = st.secrets.get("TILE_SERVER_URL")
+
+@st.cache_data(max_entries=256)
+def get_population_exposure(path, lat, lon, yield_kt, hob_m, radii):
+    from data import build_effects
+
+    return get_population_raster(path).exposure(lat, lon, build_effects(yield_kt, hob_m, radii))
 
 # Initialize session state
 if 'target_lat' not in st.session_state:
     st.session_state.update({
         'target_lat': 40.7128, 'target_lon': -74.0060,
         'user_lat': 40.7580, 'user_lon': -73.9855,
-        'map_center': [40.7128, -74.0060], 'map_zoom': 10,
+        'map_center': [40.7128, -74.0060], 'map_zoom': 10, 'map_bounds': None,
         'det_suggestions': [], 'user_suggestions': [],
-        'det_query': "", 'user_query': ""
+        'det_query': "", 'user_query': "",
+        'det_pending': None, 'user_pending': None, 'search_slot': uuid.uuid4().hex,
+        'scenario_bursts': []
     })
 
 # --- Helper Functions for Autocomplete ---
+# Suggestions are kept as compact geocache.Suggestion records. A query change
+# only schedules a debounced lookup (a newer query in the same box cancels one
+# not yet sent); the result is collected after the map is built, so the lookup
+# overlaps the rest of the rerun. A lookup still running then is kept, and a
+# small polling fragment reruns the app once it finishes.
+SUGGESTION_WAIT_S = 0.25
+
 def fetch_suggestions(location_type):
-    query_key = f"{location_type}_query"
-    suggestions_key = f"{location_type}_suggestions"
-    query = st.session_state[query_key]
-    if len(query) < 3:
-        st.session_state[suggestions_key] = []
-        return
-    url = f"https://api.geoapify.com/v1/geocode/autocomplete?text={query}&apiKey={API_KEY}"
-    try:
-        response = requests.get(url)
-        if response.status_code == 200:
-            st.session_state[suggestions_key] = response.json().get('features', [])
-        else:
-            st.session_state[suggestions_key] = []
-    except requests.RequestException:
-        st.session_state[suggestions_key] = []
+    # Callbacks run before the script body, so the rerun's recording starts here.
+    perf.begin_callback_run(st.session_state.get("perf_panel", False))
+    st.session_state[f"{location_type}_pending"] = geocache.autocomplete_debounced(
+        (st.session_state.search_slot, location_type), st.session_state[f"{location_type}_query"])
+    st.session_state[f"{location_type}_suggestions"] = []
+
+def show_suggestions(container, location_type):
+    pending = st.session_state[f"{location_type}_pending"]
+    if pending is not None:
+        with perf.span("autocomplete"):
+            try:
+                st.session_state[f"{location_type}_suggestions"] = pending.result(timeout=SUGGESTION_WAIT_S)
+            except TimeoutError:
+                with container:
+                    poll_suggestions(location_type)
+                return
+            except CancelledError:
+                pass
+            except Exception:
+                # A failed lookup shows no suggestions rather than failing the rerun.
+                st.session_state[f"{location_type}_suggestions"] = []
+        # The lookup ran outside this rerun's context; its counters are attached to the future.
+        perf.merge(getattr(pending, "perf_counters", {}))
+        st.session_state[f"{location_type}_pending"] = None
+    for i, suggestion in enumerate(st.session_state[f"{location_type}_suggestions"]):
+        # The position keeps keys unique even if two suggestions share an id.
+        container.button(suggestion.label, key=f"{location_type}_{i}_{suggestion.place_id}",
+                         on_click=on_suggestion_click, args=(suggestion, location_type), use_container_width=True)
+
+@st.fragment(run_every=SUGGESTION_WAIT_S)
+def poll_suggestions(location_type):
+    pending = st.session_state[f"{location_type}_pending"]
+    if pending is None or pending.done():
+        st.rerun()
+    st.caption("Searching…")
 
 def on_suggestion_click(suggestion, location_type):
-    coords = suggestion['geometry']['coordinates']
     if location_type == 'det':
-        st.session_state.target_lon, st.session_state.target_lat = coords[0], coords[1]
-        st.session_state.map_center = [coords[1], coords[0]]
+        st.session_state.target_lat, st.session_state.target_lon = suggestion.lat, suggestion.lon
+        st.session_state.map_center = [suggestion.lat, suggestion.lon]
         st.session_state.det_suggestions = []
         st.session_state.det_query = ""
     else:
-        st.session_state.user_lon, st.session_state.user_lat = coords[0], coords[1]
+        st.session_state.user_lat, st.session_state.user_lon = suggestion.lat, suggestion.lon
         st.session_state.user_suggestions = []
         st.session_state.user_query = ""
 
+def add_burst_to_scenario(bomb, yield_kt, hob_m):
+    from scenario import make_burst
+
+    burst = make_burst(st.session_state.target_lat, st.session_state.target_lon, bomb, yield_kt, hob_m)
+    st.session_state.scenario_bursts = st.session_state.scenario_bursts + [burst]
+
+def clear_scenario():
+    st.session_state.scenario_bursts = []
+
 # --- 2. SIDEBAR (USER INPUTS) ---
+# Weapon selector: catalogs can hold thousands of variants, so the selectbox
+# only ever lists the first MAX_WEAPON_OPTIONS matches of the filters above it.
+MAX_WEAPON_OPTIONS = 200
+YIELD_FILTER_STOPS_KT = [0.1, 1, 10, 100, 1000, 10000, 100000]
+
 st.sidebar.title("Simulation Controls 🕹️")
 st.sidebar.markdown("Set the detonation scenario using the options below.")
-selected_bomb = st.sidebar.selectbox("Select Bomb Type:", list(BOMB_DATA.keys()))
+from catalog import get_catalog
+
+catalog = get_catalog()
+with st.sidebar.expander("🔎 Filter Weapons"):
+    # Filters run against the catalog's indexes; only the matching names are sent to the selectbox.
+    weapon_query = st.text_input("Name contains", key="weapon_query")
+    weapon_country = st.selectbox("Possessing country", ["All countries"] + catalog.countries(), key="weapon_country")
+    catalog_min_kt, catalog_max_kt = catalog.yield_range()
+    yield_stops = [kt for kt in YIELD_FILTER_STOPS_KT if catalog_min_kt <= kt <= catalog_max_kt]
+    yield_stops = sorted({catalog_min_kt, catalog_max_kt, *yield_stops})
+    min_filter_kt, max_filter_kt = st.select_slider("Yield range (kt)", options=yield_stops,
+                                                    value=(yield_stops[0], yield_stops[-1]), format_func=lambda kt: f"{kt:g}")
+weapon_rows = catalog.search(weapon_query, None if weapon_country == "All countries" else weapon_country,
+                             min_filter_kt, max_filter_kt)
+if len(weapon_rows) == 0:
+    st.sidebar.warning("No weapons match these filters; showing the whole catalog.")
+    weapon_rows = catalog.search()
+if len(weapon_rows) < len(catalog) or len(weapon_rows) > MAX_WEAPON_OPTIONS:
+    st.sidebar.caption(f"{len(weapon_rows):,} of {len(catalog):,} weapons match"
+                       + (f"; showing the first {MAX_WEAPON_OPTIONS}." if len(weapon_rows) > MAX_WEAPON_OPTIONS else "."))
+selected_bomb = st.sidebar.selectbox("Select Bomb Type:", catalog.names(weapon_rows[:MAX_WEAPON_OPTIONS]))
+weapon = catalog.record(selected_bomb)
+with st.sidebar.expander("⚙️ Yield & Burst Height"):
+    # Keyed by bomb so switching presets resets both inputs to the preset's values.
+    # Bounds always take in the whole catalog, and the preset values are kept
+    # exactly (floats, off the step grid if need be) so core.weapon_radii
+    # recognizes them and the catalog's stored radii apply.
+    yield_kt = st.number_input("Yield (kilotons)", min_value=min(0.01, catalog_min_kt),
+                               max_value=max(100000.0, catalog_max_kt), value=float(weapon['yield_kt']),
+                               format="%g", key=f"yield_{selected_bomb}")
+    hob_m = st.slider("Height of Burst (m)", min_value=0.0, max_value=max(20000.0, weapon['hob_m']),
+                      value=float(weapon['hob_m']), step=10.0, format="%g", key=f"hob_{selected_bomb}")
 
 st.sidebar.subheader("📍 Set Detonation Point")
 st.sidebar.text_input("Search for a location", key="det_query", on_change=fetch_suggestions, args=("det",))
 det_suggestions_container = st.sidebar.container()
-for suggestion in st.session_state.det_suggestions:
-    det_suggestions_container.button(
-        suggestion['properties']['formatted'], key=f"det_{suggestion['properties']['place_id']}",
-        on_click=on_suggestion_click, args=(suggestion, "det"), use_container_width=True
-    )
 
 st.sidebar.subheader("👤 Set Your Location")
 st.sidebar.text_input("Search for your location", key="user_query", on_change=fetch_suggestions, args=("user",))
 user_suggestions_container = st.sidebar.container()
-for suggestion in st.session_state.user_suggestions:
-    user_suggestions_container.button(
-        suggestion['properties']['formatted'], key=f"user_{suggestion['properties']['place_id']}",
-        on_click=on_suggestion_click, args=(suggestion, "user"), use_container_width=True
-    )
+
+st.sidebar.subheader("🎯 Multi-Detonation Scenario")
+st.sidebar.caption(f"{len(st.session_state.scenario_bursts)} additional detonation(s) pinned.")
+scenario_col1, scenario_col2 = st.sidebar.columns(2)
+scenario_col1.button("➕ Pin Ground Zero", on_click=add_burst_to_scenario, args=(selected_bomb, yield_kt, hob_m),
+                     use_container_width=True)
+scenario_col2.button("🗑️ Clear", on_click=clear_scenario, use_container_width=True,
+                     disabled=not st.session_state.scenario_bursts)
+
+st.sidebar.subheader("🗣️ Safety Advice")
+recommendation_language = st.sidebar.radio("Recommendation Language:", ["English", "العربية (Arabic)"],
+                                           horizontal=True)
+
+st.sidebar.subheader("🗺️ Map Overlay")
+from tiles import FIELDS
+
+map_overlay = st.sidebar.selectbox("Show field:", ["Zone Rings Only"] + list(FIELDS),
+                                   help="Heatmaps are computed for the visible area of the map only.")
+with st.sidebar.expander("☢️ Fallout Plume"):
+    show_fallout = st.checkbox("Model local fallout", value=False)
+    wind_kmh = st.slider("Wind speed (km/h)", min_value=5, max_value=100, value=24, step=1)
+    wind_from_deg = st.slider("Wind from (degrees, 270 = west)", min_value=0, max_value=359, value=270, step=5)
+    fission_fraction = st.slider("Fission fraction", min_value=0.1, max_value=1.0, value=0.5, step=0.05)
+show_timeline = st.sidebar.checkbox("🎬 Animate blast timeline", value=False,
+                                    help="Fireball, thermal pulse and blast front over time. "
+                                         "Playback runs in the map and does not rerun the app.")
 
 st.sidebar.info("💡 **Pro Tip:** You can also click and drag markers on the map.")
 st.sidebar.divider()
@@ -99,36 +213,112 @@ st.sidebar.markdown(
 )
 
 # --- 3. DATA PROCESSING & ANALYSIS ---
-bomb_info = BOMB_DATA[selected_bomb]
-effects = bomb_info['effects']
-sorted_effects = sorted(effects.items(), key=lambda item: item[1]['radius_m'], reverse=True)
+from core import assess_point, effect_table, weapon_radii
+from timeline import arrival_time
+
+with perf.span("effects"):
+    # Shared, pre-sorted table for this (yield, HOB); built once per process.
+    # The catalog's stored radii while the weapon is used at its own yield and HOB.
+    zone_radii = weapon_radii(selected_bomb, yield_kt, hob_m)
+    effects_table = effect_table(float(yield_kt), float(hob_m), zone_radii)
 detonation_point = (st.session_state.target_lat, st.session_state.target_lon)
 user_point = (st.session_state.user_lat, st.session_state.user_lon)
-user_distance_m = geodesic(detonation_point, user_point).meters
-user_effect_zone = "Outside all immediate impact radii"
-for effect_name, details in sorted(effects.items(), key=lambda item: item[1]['radius_m']):
-    if user_distance_m <= details['radius_m']:
-        user_effect_zone = effect_name
-        break
-recommendations = get_safety_recommendations(user_effect_zone)
+with perf.span("assessment"):
+    # Same computation the HTTP API (api.py) serves in batches.
+    assessment = assess_point(selected_bomb, detonation_point, user_point, yield_kt, hob_m)
+    user_distance_m, user_effect_zone = assessment['distance_m'], assessment['zone']
+    user_blast_arrival_s = float(arrival_time(user_distance_m, yield_kt, hob_m))
+scenario = None
+if st.session_state.scenario_bursts:
+    with perf.span("scenario"):
+        from scenario import make_burst
+
+        current_burst = make_burst(*detonation_point, selected_bomb, yield_kt, hob_m)
+        bursts_key = tuple(tuple(burst.items()) for burst in st.session_state.scenario_bursts + [current_burst])
+        scenario = get_scenario(bursts_key)
+        user_effect_zone = scenario.zone_at(*user_point)[1]
 
 # --- 4. MAIN PAGE LAYOUT ---
 st.title(f"☢️ Nuclear Detonation Effects: {selected_bomb}")
-st.markdown(f"Visualizing a **{bomb_info['yield_kt']} kiloton** yield detonation.")
+st.markdown(f"Visualizing a **{yield_kt:g} kiloton** yield detonation at **{hob_m:,g} m** height of burst.")
+if scenario is not None:
+    st.markdown(f"Scenario: **{len(scenario)} detonations**. Your impact zone is the most severe one across all of them.")
 
 # --- MAP (FULL WIDTH) ---
-m = folium.Map(location=st.session_state.map_center, zoom_start=st.session_state.map_zoom, tiles="CartoDB dark_matter")
-for name, details in sorted_effects:
-    folium.Circle(location=detonation_point, radius=details['radius_m'],
-                  color=f"#{details['color'][0]:02x}{details['color'][1]:02x}{details['color'][2]:02x}",
-                  fill=True, fill_opacity=0.3).add_to(m)
-folium.Marker(location=detonation_point, popup="Ground Zero", tooltip="Ground Zero (Drag Me!)",
-              icon=folium.Icon(color="red", icon="radiation", prefix='fa'), draggable=True).add_to(m)
-folium.Marker(location=user_point, popup="Your Location", tooltip="Your Location (Drag Me!)",
-              icon=folium.Icon(color="green", icon="user", prefix='fa'), draggable=True).add_to(m)
-
-map_key = f"{selected_bomb}-{st.session_state.target_lat}-{st.session_state.target_lon}"
-map_data = st_folium(m, key=map_key, width='100%', height=600, returned_objects=["all_drawings", "center", "zoom"])
+# Imported here, after the title and sidebar are out: the two take about a second to import cold.
+import folium
+from streamlit_folium import st_folium
+
+from data import build_effects
+from fallout import plume_geojson
+from scenario import rings_geojson
+from tiles import MAX_TILE_ZOOM, field_tiles, tile_url
+from timeline import animation_element
+
+# st_folium keys its component on a hash of the base map's JS, so the base map
+# must come out identical on every rerun: it carries only the tile layer and
+# fixed defaults. Everything that changes (rings, markers, view) is sent as
+# feature groups plus center/zoom, which the component applies as in-place
+# updates instead of remounting and re-sending the whole map.
+def make_base_map():
+    return folium.Map(location=[40.7128, -74.0060], zoom_start=10, tiles="CartoDB dark_matter")
+
+@st.cache_data(max_entries=512)
+def get_rings_geojson(lat, lon, yield_kt, hob_m, radii):
+    return rings_geojson(lat, lon, build_effects(yield_kt, hob_m, radii))
+
+def zone_style(feature):
+    color = feature['properties']['color']
+    return {"color": color, "fillColor": color, "weight": 1, "fillOpacity": 0.3}
+
+with perf.span("map_build"):
+    field_layer = folium.FeatureGroup(name="Field Heatmap")
+    if map_overlay in FIELDS and TILE_SERVER_URL:
+        folium.TileLayer(tile_url(TILE_SERVER_URL, map_overlay, yield_kt, hob_m, *detonation_point),
+                         attr="Field heatmap", name=map_overlay, overlay=True,
+                         max_native_zoom=MAX_TILE_ZOOM).add_to(field_layer)
+    elif map_overlay in FIELDS and st.session_state.map_bounds:
+        # Tiles for the viewport reported on the previous run; panning reports new bounds and reruns.
+        for tile_bounds, png_url in field_tiles(map_overlay, yield_kt, hob_m, *detonation_point,
+                                                st.session_state.map_bounds, st.session_state.map_zoom):
+            folium.raster_layers.ImageOverlay(png_url, bounds=tile_bounds).add_to(field_layer)
+
+    zones_layer = folium.FeatureGroup(name="Effect Zones")
+    if scenario is not None:
+        # One dissolved polygon per zone instead of a circle per ring per burst.
+        zones_geojson = scenario.to_geojson()
+    else:
+        zones_geojson = get_rings_geojson(*detonation_point, yield_kt, hob_m, zone_radii)
+    folium.GeoJson(zones_geojson, style_function=zone_style,
+                   tooltip=folium.GeoJsonTooltip(fields=["name"], labels=False)).add_to(zones_layer)
+
+    fallout_layer = folium.FeatureGroup(name="Fallout")
+    if show_fallout:
+        # The plume grid is memoized per (yield, fission, HOB, wind speed); direction only rotates the contours.
+        fallout_geojson = plume_geojson(*detonation_point, yield_kt, fission_fraction, hob_m, wind_kmh, wind_from_deg)
+        if fallout_geojson['features']:
+            folium.GeoJson(fallout_geojson, style_function=zone_style,
+                           tooltip=folium.GeoJsonTooltip(fields=["name"], labels=False)).add_to(fallout_layer)
+
+    timeline_layer = folium.FeatureGroup(name="Blast Timeline")
+    if show_timeline:
+        # Frames are precomputed per (yield, HOB) and played back client-side.
+        animation_element(*detonation_point, yield_kt, hob_m, user_blast_arrival_s, zone_radii).add_to(timeline_layer)
+
+    markers_layer = folium.FeatureGroup(name="Markers")
+    for burst in st.session_state.scenario_bursts:
+        folium.CircleMarker(location=(burst['lat'], burst['lon']), radius=4, color="red", fill=True,
+                            tooltip=f"{burst['bomb']} ({burst['yield_kt']:g} kt)").add_to(markers_layer)
+    folium.Marker(location=detonation_point, popup="Ground Zero", tooltip="Ground Zero (Drag Me!)",
+                  icon=folium.Icon(color="red", icon="radiation", prefix='fa'), draggable=True).add_to(markers_layer)
+    folium.Marker(location=user_point, popup="Your Location", tooltip="Your Location (Drag Me!)",
+                  icon=folium.Icon(color="green", icon="user", prefix='fa'), draggable=True).add_to(markers_layer)
+
+with perf.span("st_folium"):
+    map_data = st_folium(make_base_map(), key="main_map", width='100%', height=600,
+                         center=st.session_state.map_center, zoom=st.session_state.map_zoom,
+                         feature_group_to_add=[field_layer, fallout_layer, zones_layer, timeline_layer, markers_layer],
+                         returned_objects=["all_drawings", "center", "zoom", "bounds"])
 
 # --- THE FIX IS HERE ---
 if map_data:
@@ -137,12 +327,18 @@ if map_data:
         st.session_state.map_center = [map_data["center"]["lat"], map_data["center"]["lng"]]
     if map_data.get("zoom"):
         st.session_state.map_zoom = map_data["zoom"]
+    bounds = map_data.get("bounds")
+    if bounds and bounds.get("_southWest") and bounds["_southWest"].get("lat") is not None:
+        st.session_state.map_bounds = ((bounds["_southWest"]["lat"], bounds["_southWest"]["lng"]),
+                                       (bounds["_northEast"]["lat"], bounds["_northEast"]["lng"]))
 
     # Safely process dragged markers if returned
     if map_data.get("all_drawings"):
         needs_rerun = False
         for feature in map_data["all_drawings"]:
             lon, lat = feature["geometry"]["coordinates"]
+            # Leaflet keeps counting past the antimeridian on a wrapped world map.
+            lon = (lon + 180) % 360 - 180
             popup_text = feature.get("properties", {}).get("popup", "")
             if popup_text == "Ground Zero" and (abs(st.session_state.target_lat - lat) > 1e-6 or abs(st.session_state.target_lon - lon) > 1e-6):
                 st.session_state.target_lat, st.session_state.target_lon = lat, lon
@@ -153,46 +349,77 @@ if map_data:
         if needs_rerun:
             st.rerun()
 
+# --- AUTOCOMPLETE SUGGESTIONS (SIDEBAR) ---
+# Filled in now that the map is out; see fetch_suggestions.
+show_suggestions(det_suggestions_container, "det")
+show_suggestions(user_suggestions_container, "user")
+
 # --- HORIZONTAL LEGEND (BELOW MAP) ---
 st.divider()
 st.header("💥 Effect Legend")
-st.markdown("Radii shown are for an airburst. Effects vary based on terrain and weather.")
-legend_cols = st.columns(len(sorted_effects))
-for i, (name, details) in enumerate(sorted_effects):
+st.markdown("Radii are computed from the yield and burst height. Effects vary based on terrain and weather.")
+with perf.span("population"):
+    try:
+        exposure = (get_population_exposure(POPULATION_RASTER, *detonation_point, yield_kt, hob_m, zone_radii)
+                    if POPULATION_RASTER else None)
+    except ImportError as exc:
+        st.warning(f"Population estimates are unavailable: {exc}")
+        exposure = None
+legend_cols = st.columns(len(effects_table.by_radius))
+for i, (name, details) in enumerate(effects_table.by_radius):
     with legend_cols[i]:
         color_hex = f"#{details['color'][0]:02x}{details['color'][1]:02x}{details['color'][2]:02x}"
         radius_km = details['radius_m'] / 1000
-        description = BOMB_DATA[selected_bomb]['effects'][name]['description']
+        description = details['description']
+        population_html = f"<span style='font-size: 0.9em;'>Population: <strong>{exposure[name]:,.0f}</strong></span><br>" if exposure else ""
         st.markdown(f"""
         <div style="color: var(--text-color); border-left: 10px solid {color_hex}; padding-left: 10px; height: 100%;">
             <strong style="font-size: 1.1em;">{name}</strong><br>
             <span style="font-size: 0.9em;">Radius: <strong>{radius_km:.2f} km</strong></span><br>
+            {population_html}
             <small>{description}</small>
         </div>
         """, unsafe_allow_html=True)
 
+if exposure:
+    st.caption(f"Estimated population within all rings of this ground zero: **{sum(exposure.values()):,.0f}** "
+               "(each person counted once, in the most severe zone containing them).")
+
 # --- INFORMATION SECTION (BELOW LEGEND) ---
 st.divider()
 info_col1, info_col2 = st.columns(2, gap="large")
 with info_col1:
     st.header("📍 Selected Locations")
-    try:
-        det_loc_name = geolocator.reverse(detonation_point, exactly_one=True, timeout=10)
-        st.markdown(f"<div style='color: var(--text-color);'><strong>Detonation Point:</strong><br>{det_loc_name.address}</div>", unsafe_allow_html=True)
-    except Exception:
-        st.markdown(f"<div style='color: var(--text-color);'><strong>Detonation Point:</strong><br>{st.session_state.target_lat:.4f}, {st.session_state.target_lon:.4f}</div>", unsafe_allow_html=True)
+    with perf.span("reverse_geocode"):
+        det_address, user_address = geocache.reverse_many([detonation_point, user_point])
+    det_address = det_address or f"{st.session_state.target_lat:.4f}, {st.session_state.target_lon:.4f}"
+    st.markdown(f"<div style='color: var(--text-color);'><strong>Detonation Point:</strong><br>{det_address}</div>", unsafe_allow_html=True)
     st.markdown("") # Vertical space
-    try:
-        user_loc_name = geolocator.reverse(user_point, exactly_one=True, timeout=10)
-        st.markdown(f"<div style='color: var(--text-color);'><strong>Your Location:</strong><br>{user_loc_name.address}</div>", unsafe_allow_html=True)
-    except Exception:
-        st.markdown(f"<div style='color: var(--text-color);'><strong>Your Location:</strong><br>{st.session_state.user_lat:.4f}, {st.session_state.user_lon:.4f}</div>", unsafe_allow_html=True)
+    user_address = user_address or f"{st.session_state.user_lat:.4f}, {st.session_state.user_lon:.4f}"
+    st.markdown(f"<div style='color: var(--text-color);'><strong>Your Location:</strong><br>{user_address}</div>", unsafe_allow_html=True)
 with info_col2:
     st.header("👤 Your Situation")
     st.metric("Distance from Ground Zero", f"{user_distance_m / 1000:.2f} km")
+    st.metric("Blast Wave Arrival", f"T+{user_blast_arrival_s:.1f} s",
+              help="Time for the blast front from this ground zero to reach you. "
+                   "The flash and heat arrive almost instantly; the window in between is for taking cover.")
     st.subheader(f"Impact Zone: `{user_effect_zone}`")
+    if show_fallout:
+        from fallout import contour_label, dose_rate_at, local_fraction
+
+        if local_fraction(yield_kt, hob_m) == 0:
+            st.info("No significant local fallout: the fireball of this airburst does not touch the ground. "
+                    "Lower the height of burst to model a surface burst.")
+        else:
+            user_dose_rate = dose_rate_at(*user_point, *detonation_point, yield_kt, fission_fraction, hob_m,
+                                          wind_kmh, wind_from_deg)
+            st.metric("Fallout Dose Rate (H+1)", f"{user_dose_rate:,.1f} R/hr",
+                      help=f"Dose contour: {contour_label(user_dose_rate) or 'below 1 R/hr'}")
     with st.expander("**Click here for safety recommendations**"):
-        st.markdown(recommendations)
+        # Cached answers appear at once; otherwise tokens stream in as the model produces them.
+        with perf.span("recommendations"):
+            st.write_stream(recommender.stream(user_effect_zone, selected_bomb, yield_kt, user_distance_m,
+                                               recommendation_language))
 
 # --- FOOTER ---
 st.divider()
@@ -202,4 +429,21 @@ footer_html = f"""
     <p>Built by Islam Khairy | <a href="{linkedin_url}" target="_blank" style="text-decoration: none; color: var(--primary);"> View my LinkedIn Profile</a></p>
 </div>
 """
-st.markdown(footer_html, unsafe_allow_html=True)
\ No newline at end of file
+st.markdown(footer_html, unsafe_allow_html=True)
+
+# --- PERFORMANCE PANEL (SIDEBAR, OPT-IN) ---
+st.sidebar.divider()
+st.sidebar.checkbox("⏱️ Show performance panel", key="perf_panel")
+run_summary = perf.end_run()
+if run_summary and st.session_state.perf_panel:
+    with st.sidebar.expander("⏱️ Rerun Performance", expanded=True):
+        st.metric("Rerun time", f"{run_summary['total_ms']:.0f} ms")
+        st.metric("Session state", f"{perf.deep_sizeof(st.session_state.to_dict()) / 1024:.1f} KiB")
+        st.caption("Upstream calls/s in this process (last minute): "
+                   + ", ".join(f"{name} {qps:.2f}" for name, qps in geocache.upstream_qps().items()))
+        st.table([{"Phase": phase, "ms": round(ms, 1)}
+                  for phase, ms in sorted(run_summary['spans_ms'].items(), key=lambda item: -item[1])])
+        if run_summary['counters']:
+            st.table([{"Event": event, "Count": n} for event, n in sorted(run_summary['counters'].items())])
+        st.download_button("Prometheus metrics", perf.prometheus_text(), file_name="metrics.prom",
+                           mime="text/plain")
@@ -0,0 +1,169 @@
+# bench/api_load.py
+
+"""
+Load generator for the HTTP API (api.py).
+
+    python bench/api_load.py --serve --workers 2 --batch 1000 --concurrency 8
+    python bench/api_load.py --url http://127.0.0.1:8000 --format arrow --duration 30
+
+Sends batches of random (weapon, detonation, point) triples to /v1/assess from
+--concurrency client threads for --duration seconds and reports requests/s,
+triples/s and p50/p99 request latency. --serve starts the API on a free port
+with --workers processes for the duration of the run. Requests are encoded
+before the clock starts, so client-side serialization does not count.
+"""
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+import requests
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+
+def make_batches(count: int, size: int, body_format: str, seed: int = 0) -> list:
+    """
+    `count` distinct encoded request bodies as (bytes, content type).
+    """
+    sys.path.insert(0, REPO_DIR)
+    from catalog import get_catalog
+
+    rng = np.random.default_rng(seed)
+    weapons = get_catalog().names()
+    batches = []
+    for _ in range(count):
+        det_lat, det_lon = rng.uniform(-60, 60), rng.uniform(-180, 180)
+        columns = {
+            "weapon": rng.choice(weapons, size).tolist(),
+            "det_lat": [det_lat] * size,
+            "det_lon": [det_lon] * size,
+            "lat": (det_lat + rng.normal(0, 0.3, size)).tolist(),
+            # Wrap so points near the antimeridian stay within the API's [-180, 180] range.
+            "lon": ((det_lon + rng.normal(0, 0.3, size) + 180) % 360 - 180).tolist(),
+        }
+        if body_format == "arrow":
+            import pyarrow as pa
+
+            table = pa.table(columns)
+            sink = pa.BufferOutputStream()
+            with pa.ipc.new_stream(sink, table.schema) as writer:
+                writer.write_table(table)
+            batches.append((sink.getvalue().to_pybytes(), ARROW_MEDIA_TYPE))
+        elif body_format == "items":
+            items = [{"weapon": w, "detonation": [a, b], "point": [c, d]}
+                     for w, a, b, c, d in zip(*columns.values())]
+            batches.append((json.dumps({"items": items}).encode(), "application/json"))
+        else:
+            batches.append((json.dumps({"columns": columns}).encode(), "application/json"))
+    return batches
+
+
+def run_load(url: str, batches: list, batch_size: int, concurrency: int, duration: float, arrow_out: bool) -> dict:
+    latencies, errors = [], []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+    endpoint = url.rstrip("/") + "/v1/assess" + ("?format=arrow" if arrow_out else "")
+
+    def client(index: int):
+        session = requests.Session()
+        samples, failures, i = [], 0, index
+        while time.perf_counter() < deadline:
+            body, content_type = batches[i % len(batches)]
+            i += concurrency
+            start = time.perf_counter()
+            try:
+                response = session.post(endpoint, data=body, headers={"Content-Type": content_type}, timeout=60)
+                response.content
+                ok = response.status_code == 200
+            except requests.RequestException:
+                ok = False
+            if ok:
+                samples.append((time.perf_counter() - start) * 1000)
+            else:
+                failures += 1
+        with lock:
+            latencies.extend(samples)
+            errors.append(failures)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    samples = np.asarray(latencies) if latencies else np.zeros(1)
+    return {
+        "batch": batch_size, "concurrency": concurrency, "elapsed_s": elapsed,
+        "requests": len(latencies), "errors": sum(errors),
+        "requests_per_s": len(latencies) / elapsed, "triples_per_s": len(latencies) * batch_size / elapsed,
+        "p50_ms": float(np.percentile(samples, 50)), "p99_ms": float(np.percentile(samples, 99)),
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(workers: int) -> tuple:
+    port = _free_port()
+    process = subprocess.Popen([sys.executable, "api.py", "--port", str(port), "--workers", str(workers)],
+                               cwd=REPO_DIR)
+    url = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        try:
+            requests.get(url + "/health", timeout=1)
+            return process, url
+        except requests.ConnectionError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("API server did not start")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load generator for api.py.")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--serve", action="store_true", help="Start api.py on a free port for this run")
+    parser.add_argument("--workers", type=int, default=1, help="Server worker processes with --serve")
+    parser.add_argument("--batch", type=int, default=1000, help="Triples per request")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--format", choices=["columns", "items", "arrow"], default="columns",
+                        help="Request body encoding; arrow also asks for Arrow results")
+    parser.add_argument("--out", help="Write results as JSON here")
+    args = parser.parse_args(argv)
+
+    batches = make_batches(16, args.batch, args.format)
+    process = None
+    url = args.url
+    if args.serve:
+        process, url = start_server(args.workers)
+    try:
+        result = run_load(url, batches, args.batch, args.concurrency, args.duration, args.format == "arrow")
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    result.update(format=args.format, workers=args.workers if args.serve else None)
+    print(f"{result['requests_per_s']:.1f} req/s, {result['triples_per_s']:,.0f} triples/s, "
+          f"p50 {result['p50_ms']:.1f} ms, p99 {result['p99_ms']:.1f} ms, errors {result['errors']}")
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+# bench/apptest_bench.py
+
+"""
+Headless latency and load benchmarks for app.py and the Information page.
+
+    python bench/apptest_bench.py --out results.json
+    python bench/apptest_bench.py --sessions 1 4 16 --out results.json
+    python bench/apptest_bench.py --compare main.json branch.json
+
+Each page is driven through streamlit.testing's AppTest. Geoapify, Nominatim
+and the LLM are served by local stand-ins (stub_geo.py, stub_llm.py) with
+configurable latency. On-disk caches go to a fresh temporary directory, so
+runs do not see each other's cached results.
+
+Single-session scenarios: cold start (first run in this process), warm rerun,
+marker-drag rerun, bomb-switch rerun, location search (a new autocomplete
+query per rerun) and Information-page language toggle.
+Load mode runs N sessions concurrently (one process each) and reports p50/p99
+latency, throughput, peak RSS, session-state size and upstream requests/s
+for each N. The app's upstream rate limits are off, since the stubs have none.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+APP_PATH = os.path.join(REPO_DIR, "app.py")
+INFO_PATH = os.path.join(REPO_DIR, "pages", "02_Information.py")
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux and bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _summary(samples_ms: list) -> dict:
+    samples = np.asarray(samples_ms, dtype=float)
+    return {
+        "runs": int(samples.size),
+        "mean_ms": float(samples.mean()),
+        "p50_ms": float(np.percentile(samples, 50)),
+        "p99_ms": float(np.percentile(samples, 99)),
+        "max_ms": float(samples.max()),
+    }
+
+
+def _install_secrets(secrets: dict):
+    # Set process-wide rather than through AppTest.secrets, which swaps st.secrets
+    # in and out around every run.
+    import streamlit as st
+    from streamlit.runtime.secrets import Secrets
+
+    st.secrets = Secrets()
+    st.secrets._secrets = secrets
+
+
+def _new_app(path: str, timeout: float):
+    from streamlit.testing.v1 import AppTest
+
+    return AppTest.from_file(path, default_timeout=timeout)
+
+
+def _timed(at, action=None) -> float:
+    start = time.perf_counter()
+    (action(at) if action else at).run()
+    elapsed = (time.perf_counter() - start) * 1000
+    if at.exception:
+        raise RuntimeError(f"script raised: {at.exception[0].value}")
+    return elapsed
+
+
+def _session_state_kib(at) -> float:
+    from perf import deep_sizeof
+
+    return deep_sizeof(at.session_state.to_dict()) / 1024
+
+
+def _load_session(secrets: dict, timeout: float, index: int, reruns: int, barrier, results):
+    """
+    One concurrent session: a cold run followed by `reruns` detonation moves.
+    """
+    sys.path.insert(0, REPO_DIR)
+    _install_secrets(secrets)
+    at = _new_app(APP_PATH, timeout)
+    barrier.wait()
+    try:
+        samples = [_timed(at)]
+        for i in range(reruns):
+            at.session_state.target_lat = 40.7128 + 0.001 * index + 0.0005 * i
+            samples.append(_timed(at))
+        results.put({"latencies": samples, "error": None, "peak_rss_mb": _peak_rss_mb(),
+                     "session_state_kib": _session_state_kib(at)})
+    except Exception as exc:
+        results.put({"latencies": [], "error": repr(exc), "peak_rss_mb": _peak_rss_mb(), "session_state_kib": None})
+
+
+class Bench:
+    def __init__(self, geo_latency_ms: float, llm_first_token_ms: float, llm_token_ms: float, timeout: float):
+        sys.path.insert(0, BENCH_DIR)
+        import stub_geo
+        import stub_llm
+
+        self.geo = stub_geo.serve(0, geo_latency_ms)
+        self.llm = stub_llm.serve(0, llm_first_token_ms, llm_token_ms)
+        self.timeout = timeout
+        geo = f"127.0.0.1:{self.geo.server_port}"
+        self.secrets = {
+            "GEOAPIFY_API_KEY": "bench",
+            "GEOAPIFY_AUTOCOMPLETE_URL": f"http://{geo}/v1/geocode/autocomplete",
+            "NOMINATIM_DOMAIN": geo,
+            "NOMINATIM_SCHEME": "http",
+            "LLM_BASE_URL": f"http://127.0.0.1:{self.llm.server_port}/v1",
+            "LLM_MODEL": "stub",
+            "GEOAPIFY_MAX_QPS": 0,
+            "NOMINATIM_MAX_QPS": 0,
+        }
+        _install_secrets(self.secrets)
+
+    def new_app(self, path: str = APP_PATH):
+        return _new_app(path, self.timeout)
+
+    timed = staticmethod(_timed)
+
+    # --- Single-session scenarios ---
+
+    def scenarios(self, reruns: int) -> dict:
+        from catalog import get_catalog
+
+        results = {}
+        at = self.new_app()
+        results["cold_start"] = _summary([self.timed(at)])
+        results["warm_rerun"] = _summary([self.timed(at) for _ in range(reruns)])
+
+        drag = []
+        for i in range(reruns):
+            # Same state change a marker drag produces, followed by the rerun it triggers.
+            at.session_state.user_lat = 40.7580 + 0.005 * (i + 1)
+            at.session_state.user_lon = -73.9855 - 0.005 * (i + 1)
+            drag.append(self.timed(at))
+        results["marker_drag_rerun"] = _summary(drag)
+
+        bombs = get_catalog().names()[:10]
+
+        def switch_bomb(at, i):
+            selector = next(s for s in at.selectbox if s.label == "Select Bomb Type:")
+            return selector.select(bombs[(i + 1) % len(bombs)])
+
+        results["bomb_switch_rerun"] = _summary([
+            self.timed(at, lambda at, i=i: switch_bomb(at, i)) for i in range(reruns)
+        ])
+
+        # Includes the debounce delay and one stub round trip per distinct query.
+        results["location_search"] = _summary([
+            self.timed(at, lambda at, i=i: at.text_input(key="det_query").input(f"bench place {i}"))
+            for i in range(reruns)
+        ])
+        results["session_state_kib"] = _session_state_kib(at)
+
+        info = self.new_app(INFO_PATH)
+        self.timed(info)
+        languages = info.radio[0].options
+        results["language_toggle"] = _summary([
+            self.timed(info, lambda info, i=i: info.radio[0].set_value(languages[(i + 1) % len(languages)]))
+            for i in range(reruns)
+        ])
+        return results
+
+    # --- Concurrent sessions ---
+
+    def load(self, sessions: int, reruns: int) -> dict:
+        """
+        Runs `sessions` sessions at once, each in its own process: AppTest keeps
+        process-global state (the runtime singleton, st.secrets), so sessions
+        cannot share one interpreter. They still share the CPU, the disk caches
+        and the upstream stubs, but not st.cache_resource, so RSS per session is
+        an upper bound.
+        """
+        # Referenced through the module, not __main__: AppTest replaces sys.modules["__main__"].
+        from apptest_bench import _load_session
+
+        context = multiprocessing.get_context("spawn")
+        barrier = context.Barrier(sessions + 1)
+        queue = context.Queue()
+        processes = [
+            context.Process(target=_load_session, args=(self.secrets, self.timeout, i, reruns, barrier, queue))
+            for i in range(sessions)
+        ]
+        for process in processes:
+            process.start()
+        # Start the clock once every session has imported Streamlit and is ready.
+        barrier.wait()
+        upstream_before = sum(self.geo.counts.values())
+        start = time.perf_counter()
+        reports = [queue.get() for _ in processes]
+        elapsed = time.perf_counter() - start
+        upstream = sum(self.geo.counts.values()) - upstream_before
+        for process in processes:
+            process.join()
+
+        latencies = [sample for report in reports for sample in report["latencies"]]
+        peaks = [report["peak_rss_mb"] for report in reports]
+        state_sizes = [report["session_state_kib"] for report in reports if report["session_state_kib"] is not None]
+        result = {"sessions": sessions, "errors": [r["error"] for r in reports if r["error"]],
+                  "elapsed_s": elapsed, "reruns_per_s": len(latencies) / elapsed if elapsed else 0.0,
+                  "peak_rss_mb": sum(peaks), "max_rss_per_session_mb": max(peaks),
+                  "max_session_state_kib": max(state_sizes, default=None),
+                  "upstream_requests_per_s": upstream / elapsed if elapsed else 0.0}
+        if latencies:
+            result.update(_summary(latencies))
+        return result
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(base_path: str, new_path: str):
+    with open(base_path) as f:
+        base = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    print(f"{'scenario':<22}{'base p50':>10}{'new p50':>10}{'change':>9}")
+    for name, stats in new.get("scenarios", {}).items():
+        if isinstance(stats, dict) and isinstance(base.get("scenarios", {}).get(name), dict):
+            before, after = base["scenarios"][name]["p50_ms"], stats["p50_ms"]
+            print(f"{name:<22}{before:>10.1f}{after:>10.1f}{(after / before - 1) * 100:>8.0f}%")
+    base_load = {entry["sessions"]: entry for entry in base.get("load", [])}
+    for entry in new.get("load", []):
+        before = base_load.get(entry["sessions"])
+        if before and "p99_ms" in before and "p99_ms" in entry:
+            print(f"{'load x' + str(entry['sessions']) + ' p99':<22}{before['p99_ms']:>10.1f}{entry['p99_ms']:>10.1f}"
+                  f"{(entry['p99_ms'] / before['p99_ms'] - 1) * 100:>8.0f}%")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="AppTest latency and load benchmarks.")
+    parser.add_argument("--reruns", type=int, default=10)
+    parser.add_argument("--sessions", type=int, nargs="*", default=[],
+                        help="Concurrent session counts for load mode, e.g. 1 4 16")
+    parser.add_argument("--load-reruns", type=int, default=5)
+    parser.add_argument("--geo-latency-ms", type=float, default=150)
+    parser.add_argument("--llm-first-token-ms", type=float, default=300)
+    parser.add_argument("--llm-token-ms", type=float, default=10)
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--out", help="Write results as JSON here")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), help="Compare two result files and exit")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    # Fresh disk caches, set before any app module reads NUKE_CACHE_DIR.
+    os.environ["NUKE_CACHE_DIR"] = tempfile.mkdtemp(prefix="nuke-bench-")
+    sys.path.insert(0, REPO_DIR)
+    bench = Bench(args.geo_latency_ms, args.llm_first_token_ms, args.llm_token_ms, args.timeout)
+
+    results = {
+        "meta": {
+            "revision": _git_revision(), "python": platform.python_version(), "platform": platform.platform(),
+            "timestamp": time.time(), "geo_latency_ms": args.geo_latency_ms,
+            "llm_first_token_ms": args.llm_first_token_ms, "llm_token_ms": args.llm_token_ms,
+        },
+        "scenarios": bench.scenarios(args.reruns),
+        "load": [bench.load(n, args.load_reruns) for n in args.sessions],
+        "upstream_requests": dict(bench.geo.counts),
+    }
+    for name, stats in results["scenarios"].items():
+        if isinstance(stats, dict):
+            print(f"{name:<22} p50 {stats['p50_ms']:8.1f} ms   p99 {stats['p99_ms']:8.1f} ms")
+    print(f"{'session state':<22} {results['scenarios']['session_state_kib']:8.1f} KiB")
+    for entry in results["load"]:
+        print(f"load x{entry['sessions']:<3} p50 {entry.get('p50_ms', float('nan')):8.1f} ms   "
+              f"p99 {entry.get('p99_ms', float('nan')):8.1f} ms   peak RSS {entry['peak_rss_mb']:.0f} MB   "
+              f"upstream {entry['upstream_requests_per_s']:.1f} req/s   errors {len(entry['errors'])}")
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
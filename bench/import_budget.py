@@ -0,0 +1,127 @@
+# bench/import_budget.py
+
+"""
+Import-time budget for the pages' startup imports.
+
+    python bench/import_budget.py                  # check against BUDGET_MS and STARTUP_BUDGET_MS
+    python bench/import_budget.py --budget-ms 800 --top 15
+
+Sorts the imports of app.py and pages/*.py into three sets:
+  - header: before the first statement that is not an import; these run
+    before anything is drawn.
+  - startup: every import that runs on each cold start, i.e. the header plus
+    imports anywhere at module level (including module-level `with` blocks,
+    such as perf spans), in the order the script reaches them.
+  - deferred: imports inside functions or conditional branches, which only
+    run when that path is taken. Listed but not counted.
+The header and startup sets are each imported in a fresh interpreter under
+`python -X importtime`, and the slowest packages of the startup set are
+reported. The best of --repeat runs, minus interpreter startup, is compared
+against the budgets, and the exit status is 1 when either is exceeded, so
+this can run in CI.
+"""
+
+import argparse
+import ast
+import glob
+import os
+import subprocess
+import sys
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+PAGES = [os.path.join(REPO_DIR, "app.py")] + sorted(glob.glob(os.path.join(REPO_DIR, "pages", "*.py")))
+
+# Cold import of Streamlit alone is roughly 450 ms on a typical CI runner.
+BUDGET_MS = 900
+# Everything a cold start imports, folium and streamlit-folium (~1 s) included.
+STARTUP_BUDGET_MS = 2500
+
+
+def _imported_names(node) -> list:
+    if isinstance(node, ast.Import):
+        return [alias.name for alias in node.names]
+    if isinstance(node, ast.ImportFrom) and node.level == 0:
+        return [node.module]
+    return []
+
+
+def _unconditional(statements):
+    """
+    Statements that always run when `statements` does: module-level `with`
+    bodies are entered, but not functions, classes or branches.
+    """
+    for node in statements:
+        yield node
+        if isinstance(node, ast.With):
+            yield from _unconditional(node.body)
+
+
+def startup_imports(paths: list) -> tuple[list, list, list]:
+    """
+    (header, startup, deferred) top-level modules imported by the given scripts, in order.
+    """
+    header, startup, deferred = [], [], []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            tree = ast.parse(f.read(), filename=path)
+        in_header = True
+        always = set()
+        for node in _unconditional(tree.body):
+            names = _imported_names(node)
+            in_header = in_header and bool(names)
+            always.add(node)
+            for target in ([header, startup] if in_header else [startup]):
+                target.extend(name for name in names if name not in target)
+        for node in ast.walk(tree):
+            if node not in always:
+                deferred.extend(name for name in _imported_names(node) if name not in deferred)
+    return header, startup, [name for name in deferred if name not in startup]
+
+
+def measure(modules: list) -> tuple[float, list]:
+    """
+    Total import time in ms and [(cumulative ms, module)] for top-level packages.
+    """
+    code = "; ".join(f"import {module}" for module in modules) or "pass"
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=REPO_DIR,
+                            capture_output=True, text=True, check=True)
+    packages = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit() and not name.startswith("  "):
+            packages.append((int(cumulative) / 1000, name.strip()))
+    return sum(ms for ms, _ in packages), sorted(packages, reverse=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the pages' startup import time against a budget.")
+    parser.add_argument("--budget-ms", type=float, default=BUDGET_MS, help="Budget for the header imports")
+    parser.add_argument("--startup-budget-ms", type=float, default=STARTUP_BUDGET_MS,
+                        help="Budget for every import a cold start runs")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    header, startup, deferred = startup_imports(PAGES)
+    baseline = min(measure([])[0] for _ in range(args.repeat))
+    header_total = min(measure(header)[0] for _ in range(args.repeat)) - baseline
+    startup_total, packages = min((measure(startup) for _ in range(args.repeat)), key=lambda run: run[0])
+    startup_total -= baseline
+    print(f"Header imports: {', '.join(header)}")
+    print(f"Also imported on every cold start: {', '.join(name for name in startup if name not in header) or '-'}")
+    print(f"Deferred to functions and branches: {', '.join(deferred) or '-'}")
+    for ms, name in packages[:args.top]:
+        print(f"{ms:9.1f} ms  {name}")
+    print(f"Excluding {baseline:.1f} ms interpreter startup:")
+    print(f"{header_total:9.1f} ms  header (budget {args.budget_ms:.0f} ms)")
+    print(f"{startup_total:9.1f} ms  cold start (budget {args.startup_budget_ms:.0f} ms)")
+    if header_total > args.budget_ms or startup_total > args.startup_budget_ms:
+        print("Import-time budget exceeded.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# bench/stub_geo.py
+
+"""
+Local stand-ins for Geoapify autocomplete and Nominatim reverse geocoding.
+
+    python bench/stub_geo.py --port 8766 --latency-ms 150
+
+Serves `GET /v1/geocode/autocomplete?text=...` (Geoapify-shaped features) and
+`GET /reverse?lat=...&lon=...` (Nominatim JSON) after a configurable delay.
+Point the app at it in .streamlit/secrets.toml:
+    GEOAPIFY_AUTOCOMPLETE_URL = "http://127.0.0.1:8766/v1/geocode/autocomplete"
+    NOMINATIM_DOMAIN = "127.0.0.1:8766"
+    NOMINATIM_SCHEME = "http"
+"""
+
+import argparse
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+def _autocomplete(text: str) -> dict:
+    features = []
+    for i in range(5):
+        place_id = hashlib.sha1(f"{text}-{i}".encode()).hexdigest()[:12]
+        lon, lat = -74.0 + i * 0.05, 40.7 + i * 0.05
+        features.append({
+            "type": "Feature",
+            "properties": {"formatted": f"{text.title()} {i + 1}, Stubland", "place_id": place_id,
+                           "lat": lat, "lon": lon},
+            "geometry": {"type": "Point", "coordinates": [lon, lat]},
+        })
+    return {"type": "FeatureCollection", "features": features}
+
+
+def _reverse(lat: str, lon: str) -> dict:
+    return {
+        "place_id": 1, "lat": lat, "lon": lon,
+        "display_name": f"Stub Street, Stub City ({float(lat):.4f}, {float(lon):.4f})",
+        "address": {"road": "Stub Street", "city": "Stub City"},
+    }
+
+
+def make_handler(latency_s: float, counts: dict):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = {key: values[0] for key, values in parse_qs(url.query).items()}
+            if url.path.endswith("/autocomplete"):
+                body = _autocomplete(query.get("text", ""))
+            elif url.path.startswith("/reverse"):
+                body = _reverse(query.get("lat", "0"), query.get("lon", "0"))
+            else:
+                self.send_error(404)
+                return
+            counts[url.path] = counts.get(url.path, 0) + 1
+            time.sleep(latency_s)
+            data = json.dumps(body).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    return Handler
+
+
+def serve(port: int = 0, latency_ms: float = 150) -> ThreadingHTTPServer:
+    """
+    Starts the stub in a background thread. Request counts per path are in server.counts.
+    """
+    counts = {}
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(latency_ms / 1000, counts))
+    server.counts = counts
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stub Geoapify + Nominatim server.")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--latency-ms", type=float, default=150)
+    args = parser.parse_args(argv)
+    server = serve(args.port, args.latency_ms)
+    print(f"Stub geocoder listening on http://127.0.0.1:{server.server_port}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
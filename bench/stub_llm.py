@@ -0,0 +1,84 @@
+# bench/stub_llm.py
+
+"""
+Local stand-in for an OpenAI-compatible chat-completions server.
+
+    python bench/stub_llm.py --port 8765 --first-token-ms 300 --token-ms 20
+
+Streams a canned Markdown answer word by word as server-sent events, with
+configurable latency, so the streaming, timeout and caching paths can be
+exercised without a real model. Point the app at it with
+LLM_BASE_URL = "http://127.0.0.1:8765/v1" in .streamlit/secrets.toml.
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ANSWER = (
+    "### Zone: {zone}\n"
+    "- **Impact:** Stub model answer for testing.\n"
+    "- **Recommendations:**\n"
+    "    - Get inside the most solid building nearby and stay away from windows.\n"
+    "    - Keep a radio on and follow instructions from emergency services.\n"
+)
+
+
+def make_handler(first_token_s: float, token_s: float):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        requests_served = 0
+
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            Handler.requests_served += 1
+            prompt = body.get("messages", [{}])[-1].get("content", "")
+            zone = prompt.split("in the zone '")[-1].split("'")[0] if "in the zone '" in prompt else "Unknown"
+
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            time.sleep(first_token_s)
+            for word in ANSWER.format(zone=zone).split(" "):
+                chunk = {"choices": [{"delta": {"content": word + " "}}]}
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                self.wfile.flush()
+                time.sleep(token_s)
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+            self.close_connection = True
+
+    return Handler
+
+
+def serve(port: int = 0, first_token_ms: float = 300, token_ms: float = 20) -> ThreadingHTTPServer:
+    """
+    Starts the stub in a background thread and returns the server (its port is server.server_port).
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(first_token_ms / 1000, token_ms / 1000))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stub OpenAI-compatible streaming server.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--first-token-ms", type=float, default=300)
+    parser.add_argument("--token-ms", type=float, default=20)
+    args = parser.parse_args(argv)
+    server = serve(args.port, args.first_token_ms, args.token_ms)
+    print(f"Stub LLM listening on http://127.0.0.1:{server.server_port}/v1")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+# cache.py
+
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import perf
+
+# All on-disk cache tiers live here. Override with NUKE_CACHE_DIR, e.g. to point
+# several app processes on one host at a shared volume.
+CACHE_DIR = os.environ.get(
+    "NUKE_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache"),
+)
+
+_MISSING = object()
+
+
+class LRUCache:
+    """
+    Thread-safe in-memory LRU cache with an optional time-to-live per entry.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float | None = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+            value, expires = entry
+            if expires is not None and expires < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        expires = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class DiskCache:
+    """
+    SQLite-backed key/value store. Values are pickled; keys are their repr().
+    Safe to share between threads and between processes on the same host.
+    """
+
+    def __init__(self, name: str, ttl: float | None = None, directory: str | None = None):
+        directory = directory or CACHE_DIR
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, f"{name}.sqlite3")
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=5)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB, created REAL)"
+        )
+        self._conn.commit()
+
+    def get(self, key, default=None):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created FROM cache WHERE key = ?", (repr(key),)
+            ).fetchone()
+        if row is None:
+            return default
+        value, created = row
+        if self.ttl is not None and created + self.ttl < time.time():
+            return default
+        return pickle.loads(value)
+
+    def set(self, key, value):
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, created) VALUES (?, ?, ?)",
+                (repr(key), blob, time.time()),
+            )
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+            self._conn.commit()
+
+
+class Coalescer:
+    """
+    Deduplicates in-flight work: when several threads (i.e. several Streamlit
+    sessions) call `run` with the same key at once, only the first one calls
+    `compute`; the rest wait for its result (or its exception).
+    """
+
+    def __init__(self):
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.waits = 0
+
+    def run(self, key, compute):
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+            else:
+                self.waits += 1
+        if not owner:
+            return future.result()
+
+        try:
+            value = compute()
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(value)
+            return value
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+
+class TieredCache:
+    """
+    In-memory LRU in front of an optional disk tier.
+
+    `get_or_compute` goes through a Coalescer, so concurrent misses on the same
+    key compute it once. `stats` is updated under a lock (sessions share the
+    cache across threads); read it through `snapshot`.
+    """
+
+    def __init__(self, name: str, maxsize: int = 1024, ttl: float | None = None, disk: bool = True):
+        self.name = name
+        self.memory = LRUCache(maxsize=maxsize, ttl=ttl)
+        self.disk = DiskCache(name, ttl=ttl) if disk else None
+        self.coalescer = Coalescer()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "inflight_waits": 0}
+        self._stats_lock = threading.Lock()
+
+    def _bump(self, stat: str):
+        with self._stats_lock:
+            self.stats[stat] += 1
+
+    def get(self, key, default=None):
+        value = self.memory.get(key, _MISSING)
+        if value is not _MISSING:
+            self._bump("memory_hits")
+            perf.count(f"cache.{self.name}.memory_hit")
+            return value
+        if self.disk is not None:
+            value = self.disk.get(key, _MISSING)
+            if value is not _MISSING:
+                self._bump("disk_hits")
+                perf.count(f"cache.{self.name}.disk_hit")
+                self.memory.set(key, value)
+                return value
+        return default
+
+    def set(self, key, value):
+        self.memory.set(key, value)
+        if self.disk is not None:
+            self.disk.set(key, value)
+
+    def get_or_compute(self, key, compute, should_cache=lambda value: True):
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        def fill():
+            self._bump("misses")
+            perf.count(f"cache.{self.name}.miss")
+            value = compute()
+            if should_cache(value):
+                self.set(key, value)
+            return value
+
+        value = self.coalescer.run(key, fill)
+        with self._stats_lock:
+            self.stats["inflight_waits"] = self.coalescer.waits
+        return value
+
+    def hit_rate(self) -> float:
+        with self._stats_lock:
+            hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+            total = hits + self.stats["misses"]
+        return hits / total if total else 0.0
+
+    def snapshot(self) -> dict:
+        """
+        A consistent copy of `stats` plus the hit rate.
+        """
+        with self._stats_lock:
+            stats = dict(self.stats, inflight_waits=self.coalescer.waits)
+        hits = stats["memory_hits"] + stats["disk_hits"]
+        total = hits + stats["misses"]
+        return dict(stats, hit_rate=hits / total if total else 0.0)
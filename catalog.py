@@ -0,0 +1,247 @@
+# catalog.py
+
+"""
+Columnar weapon catalog.
+
+Each weapon is one row of a NumPy structured array: name, possessing country,
+yield, resolved height of burst, image file and one radius per effect zone.
+Radii come from the source table's radius_<metric> columns (meters, e.g.
+radius_5psi) where given, and are computed from yield and height of burst
+otherwise. Larger catalogs (thousands of variants) are compiled once from
+CSV or Parquet:
+
+    python catalog.py weapons.csv weapons.npy
+
+and selected with NUKE_WEAPON_CATALOG=weapons.npy. The file is memory-mapped
+on first use, so opening it costs a few milliseconds and rows are only paged
+in when read. Without it, the built-in presets from data.py form the catalog.
+
+Lookups go through indexes that are built lazily, once per process: exact
+name (binary search over a sorted copy of the name column), country (row ids
+per country) and yield range (binary search over a yield-sorted order).
+`search` combines them with a case-insensitive (casefolded) substring match on names.
+Only `record` creates Python objects, for the single row asked for.
+"""
+
+import argparse
+import os
+import time
+from functools import cached_property, lru_cache
+
+import numpy as np
+
+from data import BOMB_PRESETS, EFFECT_ZONES
+from effects import compute_radii, optimum_hob
+
+NAME_BYTES = 96
+COUNTRY_BYTES = 48
+IMAGE_BYTES = 48
+RECORD_DTYPE = np.dtype([
+    ("name", f"S{NAME_BYTES}"),
+    ("possessing_country", f"S{COUNTRY_BYTES}"),
+    ("yield_kt", "f8"),
+    ("hob_m", "f8"),
+    ("image", f"S{IMAGE_BYTES}"),
+] + [(f"radius_{zone['metric']}", "f8") for zone in EFFECT_ZONES.values()])
+
+
+def build_table(names, countries, yields, hobs=None, images=None, radii=None) -> np.ndarray:
+    """
+    Catalog rows from parallel columns. Missing (None/NaN) heights of burst
+    become the optimum airburst height, as for the presets. `radii` maps zone
+    metrics to per-row source radii; missing columns or values are computed
+    for every row in one batched call.
+    """
+    names = [str(name).encode("utf-8") for name in names]
+    if len(set(names)) != len(names):
+        raise ValueError("Weapon names must be unique")
+    if any(len(name) > NAME_BYTES for name in names):
+        raise ValueError(f"Weapon names are limited to {NAME_BYTES} bytes")
+    n = len(names)
+    yields = np.asarray(yields, dtype=float)
+    hobs = np.full(n, np.nan) if hobs is None else np.asarray(hobs, dtype=float)  # None -> NaN
+    hobs = np.where(np.isnan(hobs), np.round(optimum_hob(yields)), hobs)
+
+    table = np.zeros(n, dtype=RECORD_DTYPE)
+    table["name"] = names
+    table["possessing_country"] = [str(country or "").encode("utf-8")[:COUNTRY_BYTES] for country in countries]
+    table["yield_kt"] = yields
+    table["hob_m"] = hobs
+    table["image"] = [str(image or "").encode("utf-8")[:IMAGE_BYTES] for image in (images or [""] * n)]
+    computed = compute_radii(yields, hobs)
+    for zone in EFFECT_ZONES.values():
+        source = (radii or {}).get(zone["metric"])
+        source = np.full(n, np.nan) if source is None else np.asarray(source, dtype=float)  # None -> NaN
+        table[f"radius_{zone['metric']}"] = np.where(np.isnan(source), computed[zone["metric"]], source)
+    return table
+
+
+def presets_table() -> np.ndarray:
+    return build_table(list(BOMB_PRESETS), [p["possessing_country"] for p in BOMB_PRESETS.values()],
+                       [p["yield_kt"] for p in BOMB_PRESETS.values()],
+                       [p["hob_m"] for p in BOMB_PRESETS.values()],
+                       [p.get("image") for p in BOMB_PRESETS.values()])
+
+
+def compile_catalog(source: str, path: str) -> int:
+    """
+    Writes a catalog file from a CSV or Parquet table with columns name,
+    yield_kt and optionally possessing_country, hob_m, image and
+    radius_<metric> per zone (e.g. radius_fireball, radius_5psi). Returns the row count.
+    """
+    import pandas as pd
+
+    frame = pd.read_parquet(source) if source.endswith(".parquet") else pd.read_csv(source)
+
+    def column(name):
+        return frame[name].astype(object).where(frame[name].notna(), None).tolist() if name in frame else None
+
+    radii = {zone["metric"]: column(f"radius_{zone['metric']}") for zone in EFFECT_ZONES.values()}
+    table = build_table(frame["name"].tolist(), column("possessing_country") or [""] * len(frame),
+                        frame["yield_kt"].tolist(), column("hob_m"), column("image"), radii)
+    np.save(path, table)
+    return len(table)
+
+
+class WeaponCatalog:
+    """
+    Read-only view of a catalog file (or of the built-in presets when path is None).
+    """
+
+    def __init__(self, path: str | None = None):
+        self.path = path
+
+    @cached_property
+    def rows(self) -> np.ndarray:
+        if self.path is None:
+            return presets_table()
+        rows = np.load(self.path, mmap_mode="r")
+        if rows.dtype != RECORD_DTYPE:
+            raise ValueError(f"{self.path} is not a weapon catalog for this version; recompile it")
+        return rows
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __contains__(self, name: str) -> bool:
+        return self.index_of(name) is not None
+
+    # --- Indexes ---
+
+    @cached_property
+    def _name_order(self) -> tuple:
+        names = self.rows["name"]
+        order = np.argsort(names, kind="stable")
+        return order, names[order]
+
+    @cached_property
+    def _country_rows(self) -> dict:
+        codes, inverse = np.unique(self.rows["possessing_country"], return_inverse=True)
+        order = np.argsort(inverse, kind="stable")
+        bounds = np.cumsum(np.bincount(inverse, minlength=len(codes)))
+        return {code.decode("utf-8"): order[start:stop]
+                for code, start, stop in zip(codes, np.r_[0, bounds[:-1]], bounds)}
+
+    @cached_property
+    def _yield_order(self) -> tuple:
+        yields = self.rows["yield_kt"]
+        order = np.argsort(yields, kind="stable")
+        return order, yields[order]
+
+    @cached_property
+    def _search_names(self) -> np.ndarray:
+        # Casefolded in Python (np.char.lower only folds ASCII bytes); UTF-8
+        # substrings match on the encoded bytes.
+        folded = [name.decode("utf-8").casefold().encode("utf-8") for name in self.rows["name"]]
+        return np.array(folded, dtype=f"S{max(map(len, folded), default=1) or 1}")
+
+    # --- Lookups ---
+
+    def index_of(self, name: str) -> int | None:
+        order, sorted_names = self._name_order
+        key = name.encode("utf-8")
+        i = int(np.searchsorted(sorted_names, key))
+        return int(order[i]) if i < len(sorted_names) and sorted_names[i] == key else None
+
+    def countries(self) -> list:
+        return sorted(self._country_rows)
+
+    def rows_for_country(self, country: str) -> np.ndarray:
+        return self._country_rows.get(country, np.empty(0, dtype=np.intp))
+
+    def rows_in_yield_range(self, min_kt: float | None = None, max_kt: float | None = None) -> np.ndarray:
+        order, sorted_yields = self._yield_order
+        start = 0 if min_kt is None else np.searchsorted(sorted_yields, min_kt, side="left")
+        stop = len(order) if max_kt is None else np.searchsorted(sorted_yields, max_kt, side="right")
+        return np.sort(order[start:stop])
+
+    def yield_range(self) -> tuple:
+        _, sorted_yields = self._yield_order
+        return float(sorted_yields[0]), float(sorted_yields[-1])
+
+    def search(self, text: str = "", country: str | None = None, min_kt: float | None = None,
+               max_kt: float | None = None) -> np.ndarray:
+        """
+        Row ids (in catalog order) matching every given filter.
+        """
+        if country:
+            selected = self.rows_for_country(country)
+        else:
+            selected = np.arange(len(self.rows))
+        if min_kt is not None or max_kt is not None:
+            selected = np.intersect1d(selected, self.rows_in_yield_range(min_kt, max_kt), assume_unique=True)
+        text = text.strip().casefold()
+        if text:
+            found = np.char.find(self._search_names[selected], text.encode("utf-8")) >= 0
+            selected = selected[found]
+        return selected
+
+    def names(self, rows=None) -> list:
+        column = self.rows["name"] if rows is None else self.rows["name"][rows]
+        return [name.decode("utf-8") for name in column]
+
+    def record(self, name_or_row) -> dict | None:
+        """
+        One weapon as a dict: name, possessing_country, yield_kt, hob_m, image
+        and radii_m (zone name -> radius). None for an unknown name.
+        """
+        i = self.index_of(name_or_row) if isinstance(name_or_row, str) else int(name_or_row)
+        if i is None:
+            return None
+        row = self.rows[i]
+        return {
+            "name": row["name"].decode("utf-8"),
+            "possessing_country": row["possessing_country"].decode("utf-8"),
+            "yield_kt": float(row["yield_kt"]),
+            "hob_m": float(row["hob_m"]),
+            "image": row["image"].decode("utf-8") or None,
+            "radii_m": {name: float(row[f"radius_{zone['metric']}"]) for name, zone in EFFECT_ZONES.items()},
+        }
+
+
+@lru_cache(maxsize=None)
+def _open(path: str | None) -> WeaponCatalog:
+    return WeaponCatalog(path)
+
+
+def get_catalog() -> WeaponCatalog:
+    """
+    The process-wide catalog: NUKE_WEAPON_CATALOG if set, else the built-in presets.
+    """
+    return _open(os.environ.get("NUKE_WEAPON_CATALOG") or None)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile a weapon catalog from CSV or Parquet.")
+    parser.add_argument("source", help="CSV or .parquet with name, yield_kt[, possessing_country, hob_m, image, "
+                                       "radius_<metric>...]")
+    parser.add_argument("output", help="Catalog file to write (.npy)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    rows = compile_catalog(args.source, args.output)
+    print(f"Wrote {rows:,} weapons to {args.output} in {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
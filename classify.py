@@ -0,0 +1,143 @@
+# classify.py
+
+"""
+Headless batch classifier: assigns every point of a CSV or Parquet file to the
+most severe effect zone across one or more detonations.
+
+Usage:
+    python classify.py points.csv zones.csv --bomb "W-87 (Modern US Warhead)" \
+        --detonation 40.7128,-74.0060 [--detonation LAT,LON ...] [--workers 8]
+    python classify.py points.parquet zones.parquet --scenario scenario.json
+
+Input is streamed in chunks and results are written incrementally, so files
+far larger than memory can be processed. Output keeps every input column and
+adds `distance_m` (to the nearest detonation) and `zone`. Rows with a blank,
+non-numeric or out-of-range coordinate get an empty `distance_m` and the zone
+"Invalid coordinates" rather than stopping the job.
+"""
+
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from catalog import get_catalog
+from scenario import INVALID_RANK, INVALID_ZONE, ZONE_SEVERITY, Scenario, make_burst
+
+
+def _classify_frame(frame, lat_col: str, lon_col: str, scenario: Scenario):
+    import pandas as pd
+
+    # Non-numeric cells become NaN and are reported as invalid by Scenario.classify.
+    lat, lon = (pd.to_numeric(frame[col], errors='coerce').to_numpy(dtype=float) for col in (lat_col, lon_col))
+    distance, rank = scenario.classify(lat, lon)
+    frame = frame.copy()
+    frame['distance_m'] = distance
+    frame['zone'] = np.where(rank == INVALID_RANK, INVALID_ZONE, np.asarray(ZONE_SEVERITY, dtype=object)[rank])
+    return frame
+
+
+def _read_chunks(path: str, chunksize: int):
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        import pandas as pd
+        yield from pd.read_csv(path, chunksize=chunksize)
+
+
+class _ChunkWriter:
+    def __init__(self, path: str):
+        self.path = path
+        self._parquet_writer = None
+        self._first = True
+
+    def write(self, frame):
+        if self.path.endswith(".parquet"):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if self._parquet_writer is None:
+                self._parquet_writer = pq.ParquetWriter(self.path, table.schema)
+            self._parquet_writer.write_table(table)
+        else:
+            frame.to_csv(self.path, mode='w' if self._first else 'a', header=self._first, index=False)
+        self._first = False
+
+    def close(self):
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+
+
+def classify_file(input_path: str, output_path: str, scenario: Scenario, lat_col: str = "lat",
+                  lon_col: str = "lon", chunksize: int = 250_000, workers: int = 1) -> int:
+    """
+    Streams `input_path` through `Scenario.classify` and writes results chunk by chunk.
+    With workers > 1 chunks are classified in a process pool (output order is preserved).
+    Returns the number of rows written.
+    """
+    writer = _ChunkWriter(output_path)
+    rows = 0
+    try:
+        if workers <= 1:
+            for frame in _read_chunks(input_path, chunksize):
+                writer.write(_classify_frame(frame, lat_col, lon_col, scenario))
+                rows += len(frame)
+            return rows
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = []
+            for frame in _read_chunks(input_path, chunksize):
+                pending.append(pool.submit(_classify_frame, frame, lat_col, lon_col, scenario))
+                # Bound memory: keep at most two chunks per worker in flight.
+                while len(pending) >= 2 * workers:
+                    result = pending.pop(0).result()
+                    writer.write(result)
+                    rows += len(result)
+            for future in pending:
+                result = future.result()
+                writer.write(result)
+                rows += len(result)
+        return rows
+    finally:
+        writer.close()
+
+
+def _parse_detonation(text: str) -> tuple:
+    lat, lon = (float(v) for v in text.split(","))
+    return lat, lon
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Classify points against one or more detonations.")
+    parser.add_argument("input", help="CSV or .parquet file of points")
+    parser.add_argument("output", help="CSV or .parquet file to write")
+    parser.add_argument("--bomb", default=get_catalog().names([0])[0], help="Weapon name from the catalog")
+    parser.add_argument("--yield-kt", type=float, help="Override the preset's yield")
+    parser.add_argument("--hob-m", type=float, help="Override the preset's height of burst")
+    parser.add_argument("--detonation", action="append", type=_parse_detonation, default=[],
+                        metavar="LAT,LON", help="Ground zero for --bomb; repeat for several bursts")
+    parser.add_argument("--scenario", help="JSON list of bursts (lat, lon, bomb[, yield_kt, hob_m])")
+    parser.add_argument("--lat-col", default="lat")
+    parser.add_argument("--lon-col", default="lon")
+    parser.add_argument("--chunksize", type=int, default=250_000)
+    parser.add_argument("--workers", type=int, default=1, help=f"Process pool size (this host has {os.cpu_count()} cores)")
+    args = parser.parse_args(argv)
+
+    if not args.scenario and not args.detonation:
+        parser.error("give --scenario or at least one --detonation")
+    if args.bomb not in get_catalog():
+        parser.error(f"unknown weapon {args.bomb!r} (see NUKE_WEAPON_CATALOG)")
+    bursts = [make_burst(lat, lon, args.bomb, args.yield_kt, args.hob_m) for lat, lon in args.detonation]
+    if args.scenario:
+        bursts += Scenario.from_json(args.scenario).bursts
+    scenario = Scenario(bursts)
+    rows = classify_file(args.input, args.output, scenario, args.lat_col, args.lon_col,
+                         args.chunksize, args.workers)
+    print(f"Classified {rows:,} points into {args.output}")
+
+
+if __name__ == "__main__":
+    main()
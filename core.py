@@ -0,0 +1,162 @@
+# core.py
+
+"""
+The simulator's computation, independent of Streamlit: resolve a weapon to its
+yield and burst height, measure the distance from ground zero and place a
+point in an effect zone. Used by app.py for one point per rerun and by api.py
+for batches of (weapon, detonation, point) triples.
+
+Distances are great-circle (haversine), as in the scenario and batch
+classifiers, so a point lands in the same zone whichever path evaluates it.
+"""
+
+import textwrap
+from functools import lru_cache
+
+import numpy as np
+
+from catalog import get_catalog
+from data import EFFECT_ZONES, OUTSIDE_ZONE, build_effects
+from effects import compute_radii
+from geo import ZoneIndex, haversine_m
+
+_ZONE_NAMES = np.asarray(list(EFFECT_ZONES) + [OUTSIDE_ZONE], dtype=object)
+
+
+class EffectTable:
+    """
+    One (yield, HOB)'s effects dict with the lookups derived from it:
+    `by_radius` lists (name, details) largest ring first, as the legend shows
+    them, and `zones` is the ZoneIndex used to place a point.
+    """
+
+    def __init__(self, yield_kt: float, hob_m: float, radii: tuple | None = None):
+        self.effects = build_effects(yield_kt, hob_m, radii)
+        self.by_radius = tuple(sorted(self.effects.items(), key=lambda item: item[1]['radius_m'], reverse=True))
+        self.zones = ZoneIndex(self.effects)
+        # Position len(names) of ZoneIndex.assign means outside every ring.
+        self.zone_names = np.asarray(self.zones.names + [OUTSIDE_ZONE], dtype=object)
+
+
+@lru_cache(maxsize=256)
+def effect_table(yield_kt: float, hob_m: float, radii: tuple | None = None) -> EffectTable:
+    """
+    Memoized EffectTable; `radii` (EFFECT_ZONES order) overrides the computed radii.
+    """
+    return EffectTable(yield_kt, hob_m, radii)
+
+
+def validate_inputs(det_lat, det_lon, lat, lon, yield_kt, hob_m):
+    """
+    Raises ValueError unless every coordinate is a finite latitude/longitude,
+    every yield is finite and positive and every burst height finite and
+    non-negative. Arguments are scalars or equal-length sequences (None is NaN).
+    """
+    checks = (
+        ("det_lat", det_lat, lambda v: np.abs(v) <= 90, "a latitude in [-90, 90]"),
+        ("det_lon", det_lon, lambda v: np.abs(v) <= 180, "a longitude in [-180, 180]"),
+        ("lat", lat, lambda v: np.abs(v) <= 90, "a latitude in [-90, 90]"),
+        ("lon", lon, lambda v: np.abs(v) <= 180, "a longitude in [-180, 180]"),
+        ("yield_kt", yield_kt, lambda v: np.isfinite(v) & (v > 0), "a positive number"),
+        ("hob_m", hob_m, lambda v: np.isfinite(v) & (v >= 0), "a non-negative number"),
+    )
+    for name, values, is_valid, expected in checks:
+        # NaN fails every comparison, so it is rejected along with out-of-range values.
+        bad = ~is_valid(np.atleast_1d(np.asarray(values, dtype=float)))
+        if bad.any():
+            raise ValueError(f"{name} must be {expected} (first invalid item: {int(np.argmax(bad))})")
+
+
+def weapon_parameters(weapon: str, yield_kt: float | None = None, hob_m: float | None = None) -> tuple:
+    """
+    (yield_kt, hob_m) for a catalog weapon, with either value optionally overridden.
+    Raises ValueError for an unknown weapon.
+    """
+    preset = get_catalog().record(weapon)
+    if preset is None:
+        raise ValueError(f"Unknown weapon: {weapon!r}")
+    return (float(preset['yield_kt'] if yield_kt is None else yield_kt),
+            float(preset['hob_m'] if hob_m is None else hob_m))
+
+
+def weapon_radii(weapon: str, yield_kt: float | None = None, hob_m: float | None = None) -> tuple | None:
+    """
+    The catalog's stored radii for a weapon (EFFECT_ZONES order) when it is
+    used at its own yield and burst height; None if either is overridden or
+    the weapon is unknown, and radii are then computed.
+    """
+    record = get_catalog().record(weapon)
+    if record is None:
+        return None
+    if (yield_kt is not None and float(yield_kt) != record['yield_kt']) or \
+            (hob_m is not None and float(hob_m) != record['hob_m']):
+        return None
+    return tuple(record['radii_m'][name] for name in EFFECT_ZONES)
+
+
+def assess_point(weapon: str, detonation: tuple, point: tuple, yield_kt: float | None = None,
+                 hob_m: float | None = None) -> dict:
+    """
+    {"distance_m", "zone", "yield_kt", "hob_m"} for one point and one detonation.
+    """
+    yield_kt, hob_m = weapon_parameters(weapon, yield_kt, hob_m)
+    validate_inputs(*detonation, *point, yield_kt, hob_m)
+    distance_m = float(haversine_m(*detonation, *point))
+    table = effect_table(yield_kt, hob_m, weapon_radii(weapon, yield_kt, hob_m))
+    zone = table.zones.zone_of(distance_m) or OUTSIDE_ZONE
+    return {"distance_m": distance_m, "zone": zone, "yield_kt": yield_kt, "hob_m": hob_m}
+
+
+def assess_batch(weapons, det_lat, det_lon, lat, lon, yield_kt=None, hob_m=None) -> dict:
+    """
+    Vectorized `assess_point` over equal-length sequences. `yield_kt` and
+    `hob_m` may be None or contain NaN/None entries, meaning the weapon's preset.
+    Invalid coordinates, yields or burst heights raise ValueError (see validate_inputs).
+
+    Radii are computed once per distinct (yield, HOB) with the batched
+    `compute_radii`, and each point is placed with its group's severity
+    envelope, the same rule as ZoneIndex: the most severe containing ring wins.
+    Rows that use their weapon's own yield and HOB take the catalog's stored radii.
+    Returns arrays keyed "distance_m", "zone", "yield_kt", "hob_m".
+    """
+    index = {name: i for i, name in enumerate(dict.fromkeys(weapons))}
+    presets = np.array([weapon_parameters(name) for name in index], dtype=float).reshape(-1, 2)
+    stored = np.array([weapon_radii(name) for name in index], dtype=float).reshape(-1, len(EFFECT_ZONES))
+    weapon_index = np.fromiter((index[name] for name in weapons), dtype=np.intp, count=len(weapons))
+
+    yields = presets[weapon_index, 0]
+    hobs = presets[weapon_index, 1]
+    for values, override in ((yields, yield_kt), (hobs, hob_m)):
+        if override is not None:
+            override = np.asarray(override, dtype=float)  # None -> NaN
+            values[:] = np.where(np.isnan(override), values, override)
+    validate_inputs(det_lat, det_lon, lat, lon, yields, hobs)
+
+    # One complex key per (yield, HOB): a 1-D unique is far faster than unique(axis=0).
+    params, group = np.unique(yields + 1j * hobs, return_inverse=True)
+    group = group.reshape(-1)
+    radii = compute_radii(params.real, params.imag)
+    # (groups, zones) in severity order; see ZoneIndex for the envelope.
+    zone_radii = np.stack([radii[zone["metric"]] for zone in EFFECT_ZONES.values()], axis=1)
+    envelope = np.maximum.accumulate(zone_radii, axis=1)[group]
+    own = (yields == presets[weapon_index, 0]) & (hobs == presets[weapon_index, 1])
+    envelope[own] = np.maximum.accumulate(stored, axis=1)[weapon_index[own]]
+
+    distance = haversine_m(det_lat, det_lon, lat, lon) * np.ones(len(group))
+    # NaN compares False with every radius and would count as inside the most severe ring.
+    if not np.isfinite(distance).all():
+        raise ValueError("Distances must be finite")
+    # As in ZoneIndex.assign, zero-radius rings contain nothing.
+    position = np.maximum((envelope < distance[:, None]).sum(axis=1), (envelope <= 0).sum(axis=1))
+    return {"distance_m": distance, "zone": _ZONE_NAMES[position], "yield_kt": yields, "hob_m": hobs}
+
+
+@lru_cache(maxsize=64)
+def recommendations(zone: str) -> str:
+    """
+    The static recommendation text for a zone, as plain Markdown.
+    """
+    # llm.py pulls in requests; the app's startup path never needs it from here.
+    from llm import get_safety_recommendations
+
+    return textwrap.dedent(get_safety_recommendations(zone)).strip()
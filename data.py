@@ -1,73 +1,69 @@
-# data.py (Updated with possessing country)
+# data.py (Weapon presets feeding the effects engine)
 
-# Data structure:
+from effects import effect_radii, optimum_hob, overpressure_key, thermal_key
+
+# Zone definitions shared by every weapon:
+# Key: Zone Name
+#   "metric": Which radius from effects.effect_radii() defines the zone.
+#   "color": RGBA color for the map visualization.
+#   "description": A brief, scientific description of the effect at this range.
+EFFECT_ZONES = {
+    "Fireball": {"metric": "fireball", "color": [255, 255, 0, 150], "description": "Vaporization of materials."},
+    "Heavy Blast Damage": {"metric": overpressure_key(5.0), "color": [255, 0, 0, 120], "description": "Most concrete buildings destroyed."},
+    "Thermal Radiation": {"metric": thermal_key(8.0), "color": [255, 165, 0, 90], "description": "Widespread 3rd-degree burns."},
+    "Moderate Blast Damage": {"metric": overpressure_key(1.0), "color": [0, 0, 255, 70], "description": "Residential structures collapse."},
+}
+
+OUTSIDE_ZONE = "Outside all immediate impact radii"
+
+# Presets (the built-in weapon catalog; see catalog.py for larger compiled ones):
 # Key: Bomb Name
 #   "yield_kt": Kilotons of TNT equivalent.
 #   "possessing_country": The primary state possessing the weapon.
-#   "effects": Dictionary of impact types.
-#       "radius_m": The radius of the effect in meters, based on NUKEMAP models for airbursts.
-#       "color": RGBA color for the map visualization.
-#       "description": A brief, scientific description of the effect at this range.
+#   "hob_m": Height of burst in meters (None = optimum airburst for 5 psi).
+#   "image": File name under assets/ for the Information page.
+BOMB_PRESETS = {
+    "W-87 (Modern US Warhead)": {"yield_kt": 300, "possessing_country": "United States", "hob_m": None, "image": "w87.jpg"},
+    "B-61-12 (Modern US Tactical Bomb)": {"yield_kt": 50, "possessing_country": "United States", "hob_m": None, "image": "b61.jpg"},
+    "Topol-M SS-27 (Modern Russian ICBM)": {"yield_kt": 800, "possessing_country": "Russia", "hob_m": None, "image": "topol_m.jpg"},
+    "DF-5 (Modern Chinese ICBM)": {"yield_kt": 5000, "possessing_country": "China", "hob_m": None, "image": "df5.jpg"},  # 5 Megatons
+    "Tsar Bomba (Largest Tested)": {"yield_kt": 50000, "possessing_country": "Soviet Union (Former)", "hob_m": None, "image": "tsar_bomba.jpg"},  # 50 Megatons
+    "Little Boy (Hiroshima)": {"yield_kt": 15, "possessing_country": "United States", "hob_m": 580, "image": "little_boy.jpg"},
+}
+
+
+def default_hob(yield_kt: float) -> float:
+    return round(float(optimum_hob(yield_kt)))
 
+
+def build_effects(yield_kt: float, hob_m: float | None = None, radii=None) -> dict:
+    """
+    Returns the per-zone effects dict ("radius_m", "color", "description") for any yield and burst height.
+    Cheap to call on every rerun: the radii are memoized by (yield, HOB).
+    `radii`, one radius (m) per zone in EFFECT_ZONES order, replaces the computed
+    ones, e.g. a catalog variant's stored radii (see core.weapon_radii).
+    """
+    if radii is None:
+        if hob_m is None:
+            hob_m = default_hob(yield_kt)
+        computed = effect_radii(float(yield_kt), float(hob_m))
+        radii = [computed[zone["metric"]] for zone in EFFECT_ZONES.values()]
+    return {
+        name: {"radius_m": float(radius), "color": zone["color"], "description": zone["description"]}
+        for (name, zone), radius in zip(EFFECT_ZONES.items(), radii)
+    }
+
+
+# Data structure (the presets as dicts, for scripts that want them; the app,
+# pages and API read weapons through catalog.get_catalog()):
+# Key: Bomb Name
+#   "yield_kt", "possessing_country", "hob_m", "image": As in BOMB_PRESETS, with hob_m resolved.
+#   "effects": build_effects() output for the preset.
 BOMB_DATA = {
-    "W-87 (Modern US Warhead)": {
-        "yield_kt": 300,
-        "possessing_country": "United States",
-        "effects": {
-            "Fireball": {"radius_m": 750, "color": [255, 255, 0, 150], "description": "Vaporization of materials."},
-            "Heavy Blast Damage": {"radius_m": 4300, "color": [255, 0, 0, 120], "description": "Most concrete buildings destroyed."},
-            "Thermal Radiation": {"radius_m": 10500, "color": [255, 165, 0, 90], "description": "Widespread 3rd-degree burns."},
-            "Moderate Blast Damage": {"radius_m": 11500, "color": [0, 0, 255, 70], "description": "Residential structures collapse."},
-        }
-    },
-    "B-61-12 (Modern US Tactical Bomb)": {
-        "yield_kt": 50,
-        "possessing_country": "United States",
-        "effects": {
-            "Fireball": {"radius_m": 350, "color": [255, 255, 0, 150], "description": "Vaporization of materials."},
-            "Heavy Blast Damage": {"radius_m": 2000, "color": [255, 0, 0, 120], "description": "Most concrete buildings destroyed."},
-            "Thermal Radiation": {"radius_m": 5100, "color": [255, 165, 0, 90], "description": "Widespread 3rd-degree burns."},
-            "Moderate Blast Damage": {"radius_m": 6000, "color": [0, 0, 255, 70], "description": "Residential structures collapse."},
-        }
-    },
-    "Topol-M SS-27 (Modern Russian ICBM)": {
-        "yield_kt": 800,
-        "possessing_country": "Russia",
-        "effects": {
-            "Fireball": {"radius_m": 1100, "color": [255, 255, 0, 150], "description": "Vaporization of materials."},
-            "Heavy Blast Damage": {"radius_m": 7000, "color": [255, 0, 0, 120], "description": "Most concrete buildings destroyed."},
-            "Thermal Radiation": {"radius_m": 16000, "color": [255, 165, 0, 90], "description": "Widespread 3rd-degree burns."},
-            "Moderate Blast Damage": {"radius_m": 18000, "color": [0, 0, 255, 70], "description": "Residential structures collapse."},
-        }
-    },
-    "DF-5 (Modern Chinese ICBM)": {
-        "yield_kt": 5000, # 5 Megatons
-        "possessing_country": "China",
-        "effects": {
-            "Fireball": {"radius_m": 2800, "color": [255, 255, 0, 150], "description": "Vaporization of materials."},
-            "Heavy Blast Damage": {"radius_m": 18000, "color": [255, 0, 0, 120], "description": "Most concrete buildings destroyed."},
-            "Thermal Radiation": {"radius_m": 38000, "color": [255, 165, 0, 90], "description": "Widespread 3rd-degree burns."},
-            "Moderate Blast Damage": {"radius_m": 45000, "color": [0, 0, 255, 70], "description": "Residential structures collapse."},
-        }
-    },
-    "Tsar Bomba (Largest Tested)": {
-        "yield_kt": 50000, # 50 Megatons
-        "possessing_country": "Soviet Union (Former)",
-        "effects": {
-            "Fireball": {"radius_m": 4600, "color": [255, 255, 0, 150], "description": "Vaporization of materials."},
-            "Heavy Blast Damage": {"radius_m": 32000, "color": [255, 0, 0, 120], "description": "Most concrete buildings destroyed."},
-            "Thermal Radiation": {"radius_m": 65000, "color": [255, 165, 0, 90], "description": "Widespread 3rd-degree burns."},
-            "Moderate Blast Damage": {"radius_m": 90000, "color": [0, 0, 255, 70], "description": "Residential structures collapse."},
-        }
-    },
-    "Little Boy (Hiroshima)": {
-        "yield_kt": 15,
-        "possessing_country": "United States",
-        "effects": {
-            "Fireball": {"radius_m": 200, "color": [255, 255, 0, 150], "description": "Vaporization of materials."},
-            "Heavy Blast Damage": {"radius_m": 1600, "color": [255, 0, 0, 120], "description": "Most concrete buildings destroyed."},
-            "Thermal Radiation": {"radius_m": 2500, "color": [255, 165, 0, 90], "description": "Widespread 3rd-degree burns."},
-            "Moderate Blast Damage": {"radius_m": 3200, "color": [0, 0, 255, 70], "description": "Residential structures collapse."},
-        }
-    },
-}
\ No newline at end of file
+    name: {
+        **preset,
+        "hob_m": preset["hob_m"] if preset["hob_m"] is not None else default_hob(preset["yield_kt"]),
+        "effects": build_effects(preset["yield_kt"], preset["hob_m"]),
+    }
+    for name, preset in BOMB_PRESETS.items()
+}
@@ -0,0 +1,166 @@
+# effects.py
+
+from functools import lru_cache
+
+import numpy as np
+
+# Vectorized weapon-effects engine.
+#
+# Every function takes array-likes of yields (kt) and heights of burst (m) and
+# broadcasts them, so a whole batch of scenarios is evaluated in one call.
+# Models are the usual open-literature approximations (Glasstone & Dolan style
+# cube-root blast scaling, inverse-square thermal fluence), calibrated so the
+# 300 kt case reproduces the NUKEMAP figures the app originally shipped with.
+
+# Fireball: maximum radius R = 75 m * Y^0.4. Its ground footprint is the
+# sphere's cross-section at ground level, sqrt(R^2 - h^2), and is zero once
+# the burst is at least R above the ground.
+FIREBALL_COEFF_M = 75.0
+FIREBALL_EXPONENT = 0.4
+
+# Overpressure thresholds (psi) with their 1 kt reference figures:
+#   ground range at the optimum height of burst (m), and that optimum height (m).
+# Both scale with Y^(1/3).
+OVERPRESSURE_PSI = (20.0, 5.0, 3.0, 1.0)
+_OPTIMUM_RANGE_1KT_M = np.array([300.0, 640.0, 860.0, 1700.0])
+_OPTIMUM_HOB_1KT_M = np.array([160.0, 230.0, 280.0, 420.0])
+# A contact burst reaches about three quarters of the optimum-height range.
+SURFACE_BURST_FACTOR = 0.75
+
+# Thermal fluence thresholds (cal/cm^2).
+THERMAL_FLUENCE_CAL_CM2 = (8.0, 5.0, 2.5)
+THERMAL_PARTITION = 0.35          # fraction of yield emitted as thermal radiation
+CAL_PER_KT = 1e12
+ATTENUATION_LENGTH_M = 80_000.0   # clear-day atmospheric transmission length
+
+
+def overpressure_key(psi: float) -> str:
+    return f"{psi:g}psi"
+
+
+def thermal_key(fluence: float) -> str:
+    return f"{fluence:g}cal"
+
+
+def _scale(yields) -> np.ndarray:
+    return np.cbrt(np.asarray(yields, dtype=float))
+
+
+def fireball_radius(yields) -> np.ndarray:
+    return FIREBALL_COEFF_M * np.asarray(yields, dtype=float) ** FIREBALL_EXPONENT
+
+
+def fireball_ground_radius(yields, hobs) -> np.ndarray:
+    """
+    Radius (m) of the ground area inside the fireball at its maximum size.
+    """
+    radius, hobs = np.broadcast_arrays(fireball_radius(yields), np.asarray(hobs, dtype=float))
+    return np.sqrt(np.maximum(radius ** 2 - hobs ** 2, 0.0))
+
+
+def optimum_hob(yields, psi: float = 5.0) -> np.ndarray:
+    """
+    Height of burst (m) that maximizes the ground range of `psi` overpressure.
+    """
+    i = OVERPRESSURE_PSI.index(psi)
+    return _OPTIMUM_HOB_1KT_M[i] * _scale(yields)
+
+
+def overpressure_radii(yields, hobs) -> np.ndarray:
+    """
+    Ground ranges (m) for every threshold in OVERPRESSURE_PSI.
+    Returns an array of shape (len(OVERPRESSURE_PSI),) + broadcast(yields, hobs).shape.
+
+    Below the optimum height the range is interpolated linearly from the
+    surface-burst value; above it, the range shrinks as the burst point
+    moves away from the ground: r = sqrt(r_opt^2 - (h - h_opt)^2).
+    """
+    scale, hobs = np.broadcast_arrays(_scale(yields), np.asarray(hobs, dtype=float))
+    expand = (slice(None),) + (None,) * scale.ndim
+    r_opt = _OPTIMUM_RANGE_1KT_M[expand] * scale
+    h_opt = _OPTIMUM_HOB_1KT_M[expand] * scale
+    r_surface = SURFACE_BURST_FACTOR * r_opt
+    below = r_surface + (r_opt - r_surface) * np.clip(hobs / h_opt, 0.0, 1.0)
+    above = np.sqrt(np.maximum(r_opt ** 2 - (hobs - h_opt) ** 2, 0.0))
+    return np.where(hobs <= h_opt, below, above)
+
+
+def thermal_radii(yields, hobs, iterations: int = 30) -> np.ndarray:
+    """
+    Ground ranges (m) for every fluence in THERMAL_FLUENCE_CAL_CM2.
+    Returns an array of shape (len(THERMAL_FLUENCE_CAL_CM2),) + broadcast(yields, hobs).shape.
+
+    Solves Q = f * Y / (4 pi D^2) * exp(-D / L) for the slant range D by a
+    damped fixed-point iteration, then projects it onto the ground.
+    """
+    yields, hobs = np.broadcast_arrays(np.asarray(yields, dtype=float), np.asarray(hobs, dtype=float))
+    fluence = np.asarray(THERMAL_FLUENCE_CAL_CM2)[(slice(None),) + (None,) * yields.ndim]
+    # Unattenuated slant range, converted from cm to m.
+    d0 = np.sqrt(THERMAL_PARTITION * yields * CAL_PER_KT / (4 * np.pi * fluence)) / 100.0
+    d = d0.copy()
+    for _ in range(iterations):
+        d = 0.5 * (d + d0 * np.exp(-d / (2 * ATTENUATION_LENGTH_M)))
+    return np.sqrt(np.maximum(d ** 2 - hobs ** 2, 0.0))
+
+
+def peak_overpressure(distances_m, yield_kt: float, hob_m: float) -> np.ndarray:
+    """
+    Peak overpressure (psi) at ground distances from ground zero, for one burst.
+    Interpolates log(psi) against log(range) through the threshold radii and
+    extrapolates the end slopes, so the field stays consistent with the rings.
+
+    Only rings that reach the ground take part: a high burst can leave the
+    stronger thresholds with zero radius. If a single ring is left, the slope
+    of the reference table's last pair is used; with none, the result is 0 psi.
+    """
+    radii = overpressure_radii(yield_kt, hob_m)
+    distances = np.asarray(distances_m, dtype=float)
+    reached = radii >= 1.0
+    if not reached.any():
+        return np.zeros(distances.shape)
+    log_r = np.log(radii[reached])
+    log_p = np.log(np.asarray(OVERPRESSURE_PSI)[reached])
+    d = np.log(np.maximum(distances, 1.0))
+    if len(log_r) > 1:
+        inner = (log_p[1] - log_p[0]) / (log_r[1] - log_r[0])
+        outer = (log_p[-1] - log_p[-2]) / (log_r[-1] - log_r[-2])
+    else:
+        reference_r = np.log(_OPTIMUM_RANGE_1KT_M[-2:])
+        reference_p = np.log(np.asarray(OVERPRESSURE_PSI[-2:]))
+        inner = outer = (reference_p[1] - reference_p[0]) / (reference_r[1] - reference_r[0])
+    log_psi = np.interp(d, log_r, log_p)
+    log_psi = np.where(d < log_r[0], log_p[0] + inner * (d - log_r[0]), log_psi)
+    log_psi = np.where(d > log_r[-1], log_p[-1] + outer * (d - log_r[-1]), log_psi)
+    return np.exp(log_psi)
+
+
+def thermal_fluence(distances_m, yield_kt: float, hob_m: float) -> np.ndarray:
+    """
+    Thermal fluence (cal/cm^2) at ground distances from ground zero, for one burst.
+    """
+    slant_m = np.maximum(np.hypot(np.asarray(distances_m, dtype=float), hob_m), 1.0)
+    slant_cm = slant_m * 100.0
+    return (THERMAL_PARTITION * yield_kt * CAL_PER_KT * np.exp(-slant_m / ATTENUATION_LENGTH_M)
+            / (4 * np.pi * slant_cm ** 2))
+
+
+def compute_radii(yields, hobs) -> dict:
+    """
+    Batched entry point: every effect radius (m) for arrays of yields and burst heights.
+    Keys are "fireball", "<psi>psi" and "<fluence>cal"; values share the broadcast shape.
+    """
+    yields, hobs = np.broadcast_arrays(np.asarray(yields, dtype=float), np.asarray(hobs, dtype=float))
+    radii = {"fireball": fireball_ground_radius(yields, hobs)}
+    for psi, r in zip(OVERPRESSURE_PSI, overpressure_radii(yields, hobs)):
+        radii[overpressure_key(psi)] = r
+    for fluence, r in zip(THERMAL_FLUENCE_CAL_CM2, thermal_radii(yields, hobs)):
+        radii[thermal_key(fluence)] = r
+    return radii
+
+
+@lru_cache(maxsize=4096)
+def effect_radii(yield_kt: float, hob_m: float) -> dict:
+    """
+    Memoized scalar version of compute_radii, for the interactive UI.
+    """
+    return {name: float(r) for name, r in compute_radii(yield_kt, hob_m).items()}
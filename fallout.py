@@ -0,0 +1,133 @@
+# fallout.py
+
+from functools import lru_cache
+
+import numpy as np
+
+from effects import fireball_radius
+from geo import destination
+
+# Simplified local-fallout model (in the spirit of WSEG-10), evaluated on a grid
+# aligned with the wind: x runs downwind from ground zero, y crosswind.
+#
+# The H+1 dose rate at (x, y) is
+#     D = K * Y_fission * f_local * g(x) * n(y; sigma_y(x))
+# where g is a gamma-shaped along-wind deposition density (particles falling
+# out of the stabilized cloud as it drifts) and n is a Gaussian crosswind
+# profile that widens with distance. Both integrate to one, so K sets the
+# dose rate per kt of fission yield spread over one square kilometre.
+#
+# The field depends on yield, fission fraction, burst height and wind speed;
+# wind *direction* only rotates it. Grids are memoized without direction, and
+# direction is applied to the contours and to query points.
+
+UNIT_DOSE_RATE = 7500.0             # (R/hr at H+1) * km^2 per kt of fission yield
+FALL_SPEED_KMH = 4.0                # effective mean particle fall speed
+CROSSWIND_SPREAD = 0.1              # crosswind sigma growth per km downwind
+DOSE_RATE_CONTOURS = (1000.0, 300.0, 100.0, 10.0, 1.0)   # R/hr at H+1, strongest first
+CONTOUR_COLORS = ("#7f00ff", "#ff00ff", "#ff4040", "#ff9900", "#ffee00")
+
+
+def cloud_top_km(yield_kt: float) -> float:
+    return min(2.2 * yield_kt ** 0.3, 40.0)
+
+
+def cloud_radius_km(yield_kt: float) -> float:
+    return max(yield_kt ** (1 / 3), 0.5)
+
+
+def local_fraction(yield_kt: float, hob_m: float) -> float:
+    """
+    Share of the activity deposited as local fallout. Bursts whose fireball
+    does not touch the ground produce essentially none.
+    """
+    radius = float(fireball_radius(yield_kt))
+    if hob_m >= radius:
+        return 0.0
+    return 0.6 * (1 - hob_m / radius)
+
+
+@lru_cache(maxsize=64)
+def plume_field(yield_kt: float, fission_fraction: float, hob_m: float, wind_kmh: float, cells: int = 400) -> tuple:
+    """
+    Wind-aligned dose-rate grid. Returns (xs_km, ys_km, dose_rate[y, x]);
+    the grid is read-only because it is shared by every caller.
+    """
+    sigma0 = cloud_radius_km(yield_kt)
+    mean_km = max(wind_kmh, 1.0) * cloud_top_km(yield_kt) / FALL_SPEED_KMH
+    theta = mean_km / 2                                  # gamma(shape=2) scale
+    x_max = sigma0 + 6 * mean_km
+    xs = np.linspace(-3 * sigma0, x_max, cells)
+    sigma_y = np.sqrt(sigma0 ** 2 + (CROSSWIND_SPREAD * np.maximum(xs, 0)) ** 2)
+    y_max = 4 * sigma_y.max()
+    ys = np.linspace(-y_max, y_max, cells // 2 + 1)
+
+    shifted = np.maximum(xs + 3 * sigma0, 0.0)           # start deposition upwind of ground zero
+    along = shifted / theta ** 2 * np.exp(-shifted / theta)
+    across = np.exp(-ys[:, None] ** 2 / (2 * sigma_y[None, :] ** 2)) / (np.sqrt(2 * np.pi) * sigma_y[None, :])
+    total = UNIT_DOSE_RATE * yield_kt * fission_fraction * local_fraction(yield_kt, hob_m)
+    field = total * along[None, :] * across
+    field.setflags(write=False)
+    return xs, ys, field
+
+
+def _to_wind_frame(east_km, north_km, wind_from_deg: float) -> tuple:
+    toward = np.radians((wind_from_deg + 180) % 360)
+    downwind = east_km * np.sin(toward) + north_km * np.cos(toward)
+    crosswind = east_km * np.cos(toward) - north_km * np.sin(toward)
+    return downwind, crosswind
+
+
+def dose_rate_at(lat: float, lon: float, gz_lat: float, gz_lon: float, yield_kt: float, fission_fraction: float,
+                 hob_m: float, wind_kmh: float, wind_from_deg: float) -> float:
+    """
+    H+1 dose rate (R/hr) at a point, sampled from the cached grid (nearest cell).
+    """
+    xs, ys, field = plume_field(yield_kt, fission_fraction, hob_m, wind_kmh)
+    north_km = (lat - gz_lat) * 111.32
+    east_km = (lon - gz_lon) * 111.32 * np.cos(np.radians(gz_lat))
+    x, y = _to_wind_frame(east_km, north_km, wind_from_deg)
+    if not (xs[0] <= x <= xs[-1] and ys[0] <= y <= ys[-1]):
+        return 0.0
+    i = int(np.abs(ys - y).argmin())
+    j = int(np.abs(xs - x).argmin())
+    return float(field[i, j])
+
+
+def contour_label(dose_rate: float) -> str | None:
+    for threshold in DOSE_RATE_CONTOURS:
+        if dose_rate >= threshold:
+            return f"≥ {threshold:,.0f} R/hr"
+    return None
+
+
+def plume_geojson(gz_lat: float, gz_lon: float, yield_kt: float, fission_fraction: float, hob_m: float,
+                  wind_kmh: float, wind_from_deg: float) -> dict:
+    """
+    Dose-rate contours as a FeatureCollection, weakest first so stronger contours draw on top.
+    Contours come from the cached grid (per column, the widest cell above the
+    threshold) and are rotated into place; only the rotation depends on direction.
+    """
+    xs, ys, field = plume_field(yield_kt, fission_fraction, hob_m, wind_kmh)
+    features = []
+    for threshold, color in reversed(list(zip(DOSE_RATE_CONTOURS, CONTOUR_COLORS))):
+        above = field >= threshold
+        columns = above.any(axis=0)
+        if not columns.any():
+            continue
+        half_width = np.where(above, np.abs(ys)[:, None], 0.0).max(axis=0)[columns]
+        x = xs[columns]
+        # Upper edge out, lower edge back: a closed outline in the wind frame.
+        down = np.concatenate([x, x[::-1], x[:1]])
+        across = np.concatenate([half_width, -half_width[::-1], half_width[:1]])
+        toward = np.radians((wind_from_deg + 180) % 360)
+        east = down * np.sin(toward) + across * np.cos(toward)
+        north = down * np.cos(toward) - across * np.sin(toward)
+        lats, lons = destination(gz_lat, gz_lon, np.degrees(np.arctan2(east, north)), np.hypot(east, north) * 1000)
+        ring = np.round(np.column_stack([lons, lats]), 5).tolist()
+        features.append({
+            "type": "Feature",
+            "geometry": {"type": "Polygon", "coordinates": [ring]},
+            "properties": {"name": f"Fallout {contour_label(threshold)} (H+1)", "color": color},
+        })
+    return {"type": "FeatureCollection", "features": features}
@@ -0,0 +1,152 @@
+# gazetteer.py
+
+"""
+Offline place-name autocomplete from a GeoNames cities file.
+
+Compile once:
+    python gazetteer.py cities15000.txt gazetteer [--min-population 1000]
+
+This writes `gazetteer.keys.npy` (sorted, fixed-width ASCII search keys) and
+`gazetteer.records.npy` (label, coordinates, population per key). At startup
+both files are memory-mapped, so loading costs a few milliseconds and pages
+are only brought into memory when a lookup touches them. A prefix lookup is
+two binary searches over the keys plus a top-N by population.
+"""
+
+import argparse
+import csv
+import os
+import re
+import sys
+import time
+import unicodedata
+
+import numpy as np
+
+KEY_BYTES = 32
+LABEL_BYTES = 96
+RECORD_DTYPE = np.dtype([
+    ("label", f"S{LABEL_BYTES}"),
+    ("lat", "f4"),
+    ("lon", "f4"),
+    ("population", "u4"),
+    ("geonameid", "u4"),
+])
+
+# GeoNames "geoname" table columns used here.
+_ID, _NAME, _ASCIINAME, _ALTERNATE, _LAT, _LON, _COUNTRY, _POPULATION = 0, 1, 2, 3, 4, 5, 8, 14
+
+
+def normalize_key(text: str) -> bytes:
+    """
+    Lowercase ASCII with accents and punctuation stripped, e.g. "São Paulo" -> b"sao paulo".
+    """
+    ascii_text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
+    return re.sub(r"[^a-z0-9]+", " ", ascii_text.lower()).strip().encode("ascii")[:KEY_BYTES]
+
+
+def compile_gazetteer(source: str, prefix: str, min_population: int = 0, alternate_names: bool = False) -> int:
+    """
+    Builds the on-disk index from a GeoNames tab-separated file. Each place is
+    indexed under its name (and, optionally, its alternate names). Returns the
+    number of keys written.
+    """
+    keys, records = [], []
+    with open(source, encoding="utf-8", newline="") as f:
+        for row in csv.reader(f, delimiter="\t", quoting=csv.QUOTE_NONE):
+            population = int(row[_POPULATION] or 0)
+            if population < min_population:
+                continue
+            label = f"{row[_NAME]}, {row[_COUNTRY]}".encode("utf-8")[:LABEL_BYTES]
+            record = (label, float(row[_LAT]), float(row[_LON]), population, int(row[_ID]))
+            names = {row[_NAME], row[_ASCIINAME]}
+            if alternate_names and row[_ALTERNATE]:
+                names.update(row[_ALTERNATE].split(","))
+            for key in {normalize_key(name) for name in names} - {b""}:
+                keys.append(key)
+                records.append(record)
+
+    keys = np.array(keys, dtype=f"S{KEY_BYTES}")
+    records = np.array(records, dtype=RECORD_DTYPE)
+    # Sort by key, most populous first within equal keys.
+    order = np.lexsort((-records["population"].astype(np.int64), keys))
+    np.save(f"{prefix}.keys.npy", keys[order])
+    np.save(f"{prefix}.records.npy", records[order])
+    return len(keys)
+
+
+class Gazetteer:
+    """
+    Memory-mapped prefix index produced by compile_gazetteer().
+    """
+
+    def __init__(self, prefix: str):
+        start = time.perf_counter()
+        self.keys = np.load(f"{prefix}.keys.npy", mmap_mode="r")
+        self.records = np.load(f"{prefix}.records.npy", mmap_mode="r")
+        self.load_seconds = time.perf_counter() - start
+        self.index_bytes = os.path.getsize(f"{prefix}.keys.npy") + os.path.getsize(f"{prefix}.records.npy")
+
+    def __len__(self):
+        return len(self.keys)
+
+    def search(self, query: str, limit: int = 5) -> list:
+        """
+        Up to `limit` places whose name starts with `query`, most populous first,
+        one entry per place. Results are shaped like Geoapify autocomplete features.
+        """
+        key = normalize_key(query)[:KEY_BYTES - 1]
+        if not key:
+            return []
+        lo = int(np.searchsorted(self.keys, key, side="left"))
+        hi = int(np.searchsorted(self.keys, key + b"\xff", side="left"))
+        if lo == hi:
+            return []
+        candidates = self.records[lo:hi]
+        population = candidates["population"]
+        # Over-fetch so places indexed under several names can be deduplicated.
+        top = min(len(candidates), limit * 4)
+        best = np.argpartition(-population.astype(np.int64), top - 1)[:top]
+        best = best[np.argsort(-population[best].astype(np.int64), kind="stable")]
+
+        features, seen = [], set()
+        for record in candidates[best]:
+            geonameid = int(record["geonameid"])
+            if geonameid in seen:
+                continue
+            seen.add(geonameid)
+            features.append({
+                "type": "Feature",
+                "properties": {"formatted": record["label"].decode("utf-8", "ignore"),
+                               "place_id": f"geonames:{geonameid}"},
+                "geometry": {"type": "Point", "coordinates": [float(record["lon"]), float(record["lat"])]},
+            })
+            if len(features) == limit:
+                break
+        return features
+
+    def stats(self) -> dict:
+        return {"keys": len(self), "index_bytes": self.index_bytes, "load_seconds": self.load_seconds}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile a GeoNames cities file into a prefix index.")
+    parser.add_argument("source", help="GeoNames tab-separated file, e.g. cities15000.txt")
+    parser.add_argument("prefix", help="Output path prefix")
+    parser.add_argument("--min-population", type=int, default=0,
+                        help="Skip smaller places to bound index size")
+    parser.add_argument("--alternate-names", action="store_true",
+                        help="Also index alternate names (larger index)")
+    args = parser.parse_args(argv)
+
+    count = compile_gazetteer(args.source, args.prefix, args.min_population, args.alternate_names)
+    gazetteer = Gazetteer(args.prefix)
+    start = time.perf_counter()
+    gazetteer.search("new")
+    lookup_ms = (time.perf_counter() - start) * 1000
+    print(f"Wrote {count:,} keys ({gazetteer.index_bytes / 1e6:.1f} MB); "
+          f"load {gazetteer.load_seconds * 1000:.2f} ms, sample lookup {lookup_ms:.3f} ms", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,339 @@
+# geocache.py
+
+import re
+import threading
+import time
+import unicodedata
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import NamedTuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import perf
+from cache import TieredCache
+
+GEOAPIFY_AUTOCOMPLETE_URL = "https://api.geoapify.com/v1/geocode/autocomplete"
+
+# 4 decimal places is ~11 m at the equator: far finer than any effect radius,
+# coarse enough that a marker nudged by a pixel still hits the cache.
+COORD_PRECISION = 4
+REVERSE_TTL_S = 30 * 24 * 3600
+AUTOCOMPLETE_TTL_S = 24 * 3600
+# Geoapify's free plan allows 5 requests/s; Nominatim's usage policy asks for at most 1.
+AUTOCOMPLETE_MAX_QPS = 5.0
+REVERSE_MAX_QPS = 1.0
+# A lookup that would wait longer than this for the rate limiter fails instead (and is not cached).
+RATE_LIMIT_MAX_WAIT_S = 2.0
+# Gazetteer and Geoapify results for one place share a name but not an id, and
+# their coordinates differ by up to a few km; 0.1 degrees is ~11 km.
+MERGE_TOLERANCE_DEG = 0.1
+AUTOCOMPLETE_DEBOUNCE_S = 0.3
+
+
+def make_http_session(pool_size: int = 32) -> requests.Session:
+    """
+    Returns a requests.Session with a connection pool large enough to be shared
+    by every Streamlit session in the process.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def normalize_query(query: str) -> str:
+    return re.sub(r"\s+", " ", query).strip().lower()
+
+
+class Suggestion(NamedTuple):
+    """
+    One autocomplete result, as kept in session state: a few hundred bytes
+    instead of the full GeoJSON feature.
+    """
+    place_id: str
+    label: str
+    lat: float
+    lon: float
+
+    @property
+    def place_name(self) -> str:
+        """
+        The label's first part without accents or case, e.g. "sao paulo" for "São Paulo, BR".
+        """
+        name = unicodedata.normalize("NFKD", self.label.split(",")[0])
+        return normalize_query("".join(char for char in name if not unicodedata.combining(char)).casefold())
+
+    @classmethod
+    def from_feature(cls, feature: dict) -> "Suggestion":
+        properties = feature['properties']
+        lon, lat = feature['geometry']['coordinates'][:2]
+        label = properties.get('formatted', "")
+        return cls(str(properties.get('place_id') or label), label, float(lat), float(lon))
+
+
+def unique_suggestions(suggestions) -> list:
+    """
+    Suggestions in order, dropping repeats; the first one wins. A repeat has
+    an already kept place id, or the same place_name within
+    MERGE_TOLERANCE_DEG of a kept suggestion (a tolerance rather than rounded
+    coordinates, so places near a rounding boundary still match).
+    """
+    ids, places = set(), {}
+    unique = []
+    for suggestion in suggestions:
+        nearby = places.setdefault(suggestion.place_name, [])
+        repeat = suggestion.place_id in ids or any(abs(suggestion.lat - lat) <= MERGE_TOLERANCE_DEG and
+                                                   abs(suggestion.lon - lon) <= MERGE_TOLERANCE_DEG for lat, lon in nearby)
+        ids.add(suggestion.place_id)
+        if repeat:
+            continue
+        nearby.append((suggestion.lat, suggestion.lon))
+        unique.append(suggestion)
+    return unique
+
+
+class RateLimiter:
+    """
+    Token bucket shared by every session in the process: at most `rate` calls
+    per second on average, in bursts of up to `burst`. `rate=None` only meters.
+    Granted calls are timestamped, so `recent_rate` reports the upstream QPS.
+    """
+
+    def __init__(self, rate: float | None, burst: int | None = None, window_s: float = 60):
+        self.rate = rate
+        self.burst = burst or max(1, int(rate or 1))
+        self.window_s = window_s
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._granted = deque()
+        self._lock = threading.Lock()
+        self.stats = {"granted": 0, "waited": 0, "rejected": 0}
+
+    def acquire(self, max_wait: float = RATE_LIMIT_MAX_WAIT_S) -> bool:
+        """
+        Takes a token, sleeping until one is available; False if that would take longer than `max_wait`.
+        """
+        with self._lock:
+            now = time.monotonic()
+            wait = 0.0
+            if self.rate is not None:
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                wait = max(0.0, (1 - self._tokens) / self.rate)
+                if wait > max_wait:
+                    self.stats["rejected"] += 1
+                    return False
+                # Reserve the token now so concurrent callers queue up behind it.
+                self._tokens -= 1
+            self.stats["granted"] += 1
+            self.stats["waited"] += wait > 0
+            self._granted.append(now + wait)
+            while self._granted and self._granted[0] < now - self.window_s:
+                self._granted.popleft()
+        if wait:
+            time.sleep(wait)
+        return True
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(self.stats)
+
+    def recent_rate(self) -> float:
+        """
+        Granted calls per second over the last `window_s` seconds.
+        """
+        with self._lock:
+            cutoff = time.monotonic() - self.window_s
+            return sum(1 for t in self._granted if t >= cutoff) / self.window_s
+
+
+class Debouncer:
+    """
+    Runs the latest call per slot (e.g. one search box in one session) once
+    the slot has been quiet for `delay` seconds. A newer call for the same
+    slot cancels the pending one, whose future then reports cancelled and
+    whose function never runs. One timer thread serves every slot; due calls
+    run on `executor` in a fresh context, since the caller's perf run may be
+    over by then. Their perf counters are left on the future as
+    `perf_counters` for whoever collects the result (see perf.merge).
+    """
+
+    def __init__(self, executor, delay: float):
+        self.executor = executor
+        self.delay = delay
+        self._pending = {}  # slot -> (due, future, fn, args)
+        self._wakeup = threading.Condition()
+        self._thread = None
+        self.stats = {"submitted": 0, "superseded": 0, "ran": 0}
+
+    def submit(self, slot, fn, *args) -> Future:
+        future = Future()
+        with self._wakeup:
+            previous = self._pending.pop(slot, None)
+            if previous is not None and previous[1].cancel():
+                self.stats["superseded"] += 1
+            self._pending[slot] = (time.monotonic() + self.delay, future, fn, args)
+            self.stats["submitted"] += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="debouncer", daemon=True)
+                self._thread.start()
+            self._wakeup.notify()
+        return future
+
+    def _loop(self):
+        while True:
+            with self._wakeup:
+                now = time.monotonic()
+                due = [slot for slot, entry in self._pending.items() if entry[0] <= now]
+                if not due:
+                    next_due = min((entry[0] for entry in self._pending.values()), default=None)
+                    self._wakeup.wait(None if next_due is None else next_due - now)
+                    continue
+                ready = [self._pending.pop(slot) for slot in due]
+            for _, future, fn, args in ready:
+                if future.set_running_or_notify_cancel():
+                    with self._wakeup:
+                        self.stats["ran"] += 1
+                    self.executor.submit(self._resolve, future, fn, args)
+
+    def snapshot(self) -> dict:
+        with self._wakeup:
+            return dict(self.stats)
+
+    @staticmethod
+    def _resolve(future: Future, fn, args):
+        future.perf_counters = {}
+        try:
+            result, future.perf_counters = perf.capture(fn, *args)
+            future.set_result(result)
+        except BaseException as exc:
+            future.set_exception(exc)
+
+
+class GeoCache:
+    """
+    Process-wide cache in front of reverse geocoding and autocomplete lookups.
+
+    `geolocator` is anything with a geopy-style `reverse(point, exactly_one, timeout)`
+    method, so a local stub can be swapped in to measure hit rates and latency.
+    Failed lookups are never cached.
+
+    With a `gazetteer`, autocomplete answers from the local index first and
+    only calls Geoapify when it has fewer than `min_local_results` matches.
+
+    Upstream calls go through one RateLimiter per service, and concurrent
+    identical lookups from different sessions share one call (the caches'
+    Coalescer). `autocomplete_debounced` is the entry point for search boxes.
+    """
+
+    def __init__(self, geolocator=None, api_key: str | None = None, session: requests.Session | None = None,
+                 autocomplete_url: str = GEOAPIFY_AUTOCOMPLETE_URL, disk: bool = True, timeout: float = 10,
+                 gazetteer=None, min_local_results: int = 3, autocomplete_max_qps: float | None = AUTOCOMPLETE_MAX_QPS,
+                 reverse_max_qps: float | None = REVERSE_MAX_QPS, debounce_s: float = AUTOCOMPLETE_DEBOUNCE_S):
+        if geolocator is None:
+            from geopy.geocoders import Nominatim
+            geolocator = Nominatim(user_agent="nuclear_bomb_visualizer_app_v9")
+        self.geolocator = geolocator
+        self.api_key = api_key
+        self.session = session or make_http_session()
+        self.autocomplete_url = autocomplete_url
+        self.timeout = timeout
+        self.gazetteer = gazetteer
+        self.min_local_results = min_local_results
+        self.local_hits = 0
+        self._stats_lock = threading.Lock()
+        self.reverse_cache = TieredCache("reverse_geocode", maxsize=4096, ttl=REVERSE_TTL_S, disk=disk)
+        # Holds Suggestion lists; the "autocomplete" tier of older versions held raw features.
+        self.autocomplete_cache = TieredCache("suggestions", maxsize=2048, ttl=AUTOCOMPLETE_TTL_S, disk=disk)
+        # A limit of None (or 0) meters calls without limiting them.
+        self.autocomplete_limiter = RateLimiter(autocomplete_max_qps or None, burst=2 * int(autocomplete_max_qps or 1))
+        self.reverse_limiter = RateLimiter(reverse_max_qps or None, burst=2)
+        self._executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="geocache")
+        self.debouncer = Debouncer(self._executor, debounce_s)
+
+    def reverse(self, lat: float, lon: float) -> str | None:
+        """
+        Returns the address for a point, or None if the lookup failed.
+        """
+        key = (round(lat, COORD_PRECISION), round(lon, COORD_PRECISION))
+
+        def compute():
+            if not self.reverse_limiter.acquire():
+                perf.count("external.nominatim.rate_limited")
+                return None
+            perf.count("external.nominatim")
+            try:
+                location = self.geolocator.reverse(key, exactly_one=True, timeout=self.timeout)
+            except Exception:
+                return None
+            return location.address if location is not None else None
+
+        return self.reverse_cache.get_or_compute(key, compute, should_cache=lambda address: address is not None)
+
+    def reverse_many(self, points) -> list:
+        """
+        Reverse-geocodes several (lat, lon) points concurrently instead of one after another.
+        """
+        futures = [perf.submit_in_context(self._executor, self.reverse, *point) for point in points]
+        return [future.result() for future in futures]
+
+    def autocomplete(self, query: str) -> list:
+        """
+        Returns Suggestions for a query (local gazetteer first, then
+        Geoapify), or [] on any failure.
+        """
+        key = normalize_query(query)
+        if len(key) < 3:
+            return []
+        local = [Suggestion.from_feature(f) for f in self.gazetteer.search(key)] if self.gazetteer is not None else []
+        if len(local) >= self.min_local_results or not self.api_key:
+            with self._stats_lock:
+                self.local_hits += bool(local)
+            perf.count("gazetteer.hit" if local else "gazetteer.miss")
+            return local
+
+        def compute():
+            if not self.autocomplete_limiter.acquire():
+                perf.count("external.geoapify.rate_limited")
+                return None
+            perf.count("external.geoapify")
+            try:
+                response = self.session.get(
+                    self.autocomplete_url, params={"text": key, "apiKey": self.api_key}, timeout=self.timeout
+                )
+                if response.status_code != 200:
+                    return None
+                # Geoapify can return the same place twice, and the labels double as button keys in the app.
+                return unique_suggestions(Suggestion.from_feature(feature)
+                                          for feature in response.json().get('features', []))
+            except (requests.RequestException, ValueError, KeyError, TypeError, AttributeError, IndexError):
+                # Network errors, and 200 responses that are not JSON or hold malformed features.
+                return None
+
+        remote = self.autocomplete_cache.get_or_compute(key, compute, should_cache=lambda s: s is not None) or []
+        return unique_suggestions(local + remote)
+
+    def autocomplete_debounced(self, slot, query: str) -> Future:
+        """
+        `autocomplete` after the debounce delay, as a future. `slot` names the
+        search box (e.g. (session token, "det")); a newer query for the same
+        slot cancels this one if it has not been sent yet.
+        """
+        return self.debouncer.submit(slot, self.autocomplete, query)
+
+    def upstream_qps(self) -> dict:
+        return {"geoapify": self.autocomplete_limiter.recent_rate(), "nominatim": self.reverse_limiter.recent_rate()}
+
+    def stats(self) -> dict:
+        return {
+            "reverse": self.reverse_cache.snapshot(),
+            "autocomplete": dict(self.autocomplete_cache.snapshot(), local_hits=self.local_hits,
+                                 debounce=self.debouncer.snapshot()),
+            "rate_limits": {"geoapify": dict(self.autocomplete_limiter.snapshot(), max_qps=self.autocomplete_limiter.rate),
+                            "nominatim": dict(self.reverse_limiter.snapshot(), max_qps=self.reverse_limiter.rate)},
+            "upstream_qps": self.upstream_qps(),
+            "gazetteer": self.gazetteer.stats() if self.gazetteer is not None else None,
+        }
@@ -1,12 +1,76 @@
 # llm.py
 
-import streamlit as st
+import contextvars
+import json
+import queue
+import threading
+import time
+from abc import ABC, abstractmethod
 
-def get_safety_recommendations(effect_name: str) -> str:
+import requests
+
+import perf
+from cache import TieredCache
+
+# Arabic versions of the static recommendations, keyed by zone (None = outside all radii).
+_ARABIC_RECOMMENDATIONS = {
+    "Fireball": """
+        ### المنطقة: كرة النار
+        - **التأثير:** تبخر كامل.
+        - **فرصة النجاة:** معدومة.
+        - **التوصية:** لا توجد أي إجراءات وقائية ممكنة داخل هذه المنطقة.
+        """,
+    "Heavy Blast Damage": """
+        ### المنطقة: دمار انفجاري شديد (5 رطل/بوصة مربعة)
+        - **التأثير:** تنهار معظم المباني. تتحرك موجة انفجار عالية الضغط بسرعة تفوق سرعة الصوت.
+        - **فرصة النجاة:** منخفضة جدًا.
+        - **التوصيات:**
+            - **إذا كنت في الداخل:** لا تقف بالقرب من النوافذ. احتمِ في قبو أو في غرفة داخلية متينة البناء. الهدف الأساسي هو حماية نفسك من انهيار المبنى والحطام المتطاير.
+            - **إذا كنت في الخارج:** **انبطح فورًا على الأرض ووجهك للأسفل**، مع تغطية رأسك ورقبتك بذراعيك. إن أمكن، احتمِ خلف أي جسم صلب قد يحميك من ضغط الانفجار.
+            - **بعد مرور موجة الانفجار:** انتبه للمباني المتساقطة والحرائق.
+        """,
+    "Thermal Radiation": """
+        ### المنطقة: الإشعاع الحراري (حروق من الدرجة الثالثة)
+        - **التأثير:** وميض حراري شديد يستمر عدة ثوانٍ ويسبب حروقًا بالغة للجلد المكشوف ويمكن أن يشعل الحرائق.
+        - **فرصة النجاة:** متوسطة، إذا اتُّخذ إجراء فوري.
+        - **التوصيات:**
+            - **احتمِ فورًا.** ينتقل الوميض الحراري بسرعة الضوء، ولديك ثانية أو ثانيتان فقط.
+            - **"انبطح واحتمِ":** انبطح على الأرض واختبئ خلف أي جسم يلقي ظلًا. جدار أو خندق أو سيارة، أي شيء يحجب خط الرؤية المباشر إلى الانفجار سيحميك من الحرارة.
+            - **لا تنظر إلى الوميض:** فقد يسبب عمى مؤقتًا أو دائمًا.
+            - **بعد الوميض:** استعد لوصول موجة الانفجار، التي تنتقل أبطأ من الضوء.
+        """,
+    "Moderate Blast Damage": """
+        ### المنطقة: دمار انفجاري معتدل (1 رطل/بوصة مربعة)
+        - **التأثير:** تتحطم النوافذ بقوة هائلة وتتحول إلى مقذوفات عالية السرعة. قد تلحق بعض الأضرار الهيكلية بالمنازل.
+        - **فرصة النجاة:** مرتفعة، لكن مع خطر التعرض لإصابات خطيرة.
+        - **التوصيات:**
+            - **ابتعد عن النوافذ.** هذه هي القاعدة الأهم، فمعظم الإصابات في هذه المنطقة سببها الزجاج المتطاير.
+            - **انتقل إلى غرفة داخلية أو ممر** بلا نوافذ.
+            - **احتمِ تحت قطعة أثاث متينة** مثل مكتب أو طاولة ثقيلة للوقاية من الحطام المتساقط من السقف.
+            - **بعد الانفجار:** احذر من المباني المتضررة والزجاج المكسور.
+        """,
+    None: """
+        ### المنطقة: خارج نطاقات التأثير المباشر
+        - **التأثير:** أنت خارج المناطق المباشرة للانفجار الشديد والإشعاع الحراري وكرة النار، لكن المخاطر لا تزال قائمة.
+        - **فرصة النجاة:** مرتفعة جدًا.
+        - **التوصيات:**
+            - **توقع الغبار الذري:** الخطر الأكبر على هذه المسافة هو الغبار الذري المشع، الذي تحمله الرياح وقد يصل بعد ساعات من الانفجار.
+            - **ادخل إلى مبنى:** ابحث عن أمتن ملجأ ممكن. المباني المشيدة من الطوب أو الخرسانة هي الأفضل، والأقبية مثالية.
+            - **أحكم إغلاق الملجأ:** أغلق جميع النوافذ والأبواب وفتحات المدافئ. أوقف تشغيل أنظمة التهوية.
+            - **تابع الأخبار:** استخدم راديو يعمل بالبطارية أو باليد للاستماع إلى تعليمات خدمات الطوارئ.
+            - **ابقَ في الملجأ:** خطط للبقاء في ملجئك لمدة 24 إلى 48 ساعة على الأقل ما لم تطلب السلطات خلاف ذلك.
+        """,
+}
+
+
+def get_safety_recommendations(effect_name: str, language: str = "English") -> str:
     """
-    This function simulates an LLM call.
-    It returns detailed, actionable safety recommendations based on the impact zone.
+    Static, hand-written recommendations for each impact zone, in English or
+    Arabic (any `language` naming Arabic, such as the app's "العربية (Arabic)").
+    Used directly when no LLM backend is configured, and as the fallback when it fails.
     """
+    if "Arabic" in language or "العربية" in language:
+        return _ARABIC_RECOMMENDATIONS.get(effect_name, _ARABIC_RECOMMENDATIONS[None])
     if effect_name == "Fireball":
         return """
         ### Zone: Fireball
@@ -57,4 +121,175 @@ def get_safety_recommendations(effect_name: str) -> str:
             - **Seal the Shelter:** Close all windows, doors, and fireplace dampers. Turn off ventilation systems.
             - **Tune In:** Use a battery-powered or hand-crank radio to listen for instructions from emergency services.
             - **Shelter in Place:** Plan to stay in your shelter for at least 24-48 hours unless told otherwise by authorities.
-        """
\ No newline at end of file
+        """
+
+
+# --- Pluggable LLM Backends ---
+
+class RecommendationBackend(ABC):
+    """
+    Interface for recommendation generators: `stream` yields text chunks as they arrive.
+    `request` holds "zone", "weapon", "yield_kt", "band" (distance band) and "language".
+    `identity` names what produces the text (e.g. endpoint and model) and is
+    part of every cache key, so a different model never gets another's answers.
+    """
+    name = "base"
+
+    @property
+    def identity(self) -> str:
+        return self.name
+
+    @abstractmethod
+    def stream(self, request: dict, timeout: float):
+        ...
+
+
+class StaticBackend(RecommendationBackend):
+    """
+    No model at all: replays the static text for the zone.
+    """
+    name = "static"
+
+    def stream(self, request: dict, timeout: float):
+        yield get_safety_recommendations(request["zone"], request["language"])
+
+
+class OpenAICompatibleBackend(RecommendationBackend):
+    """
+    Streams from any server implementing the OpenAI chat-completions API
+    (`POST {base_url}/chat/completions` with `"stream": true`, server-sent events).
+    """
+    name = "openai"
+
+    def __init__(self, base_url: str, model: str, api_key: str | None = None, session: requests.Session | None = None):
+        self.url = base_url.rstrip("/") + "/chat/completions"
+        self.model = model
+        self.session = session or requests.Session()
+        self.headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+
+    @property
+    def identity(self) -> str:
+        return f"{self.url} {self.model}"
+
+    def stream(self, request: dict, timeout: float):
+        payload = {"model": self.model, "stream": True, "messages": build_messages(**request)}
+        perf.count("external.llm")
+        with self.session.post(self.url, json=payload, headers=self.headers, stream=True,
+                               timeout=(min(timeout, 5.0), timeout)) as response:
+            response.raise_for_status()
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                delta = json.loads(data)["choices"][0].get("delta", {}).get("content")
+                if delta:
+                    yield delta
+
+
+# --- Cached, Streaming Recommendations ---
+
+# Cached answers are regenerated after this long, e.g. to pick up server-side model updates.
+RECOMMENDATION_TTL_S = 7 * 24 * 3600
+
+# Distances are bucketed so that nearby users share cache entries.
+DISTANCE_BANDS_KM = (1, 2, 5, 10, 20, 50, 100, 200)
+
+
+def distance_band(distance_m: float) -> str:
+    distance_km = distance_m / 1000
+    lower = 0
+    for upper in DISTANCE_BANDS_KM:
+        if distance_km < upper:
+            return f"{lower}-{upper} km"
+        lower = upper
+    return f"over {lower} km"
+
+
+def build_messages(zone: str, weapon: str, yield_kt: float, band: str, language: str) -> list:
+    system = (
+        "You are a civil-defense expert. Give short, actionable protective-action advice for a person "
+        "after a nuclear detonation, as Markdown: a '### Zone' heading, then Impact, Survival Chance and "
+        f"Recommendations bullets. Under 200 words. Answer in {language}."
+    )
+    user = (
+        f"Weapon: {weapon} ({yield_kt:g} kt). The person is {band} from ground zero, in the zone "
+        f"'{zone}'. Reference guidance for this zone:\n{get_safety_recommendations(zone)}"
+    )
+    return [{"role": "system", "content": system}, {"role": "user", "content": user}]
+
+
+_END = object()
+
+
+def _pump(chunks, out: queue.Queue, stop: threading.Event):
+    """
+    Moves a backend's chunks onto `out`, then _END or the exception that ended the stream.
+    """
+    try:
+        for chunk in chunks:
+            if stop.is_set():
+                break
+            out.put(chunk)
+        out.put(_END)
+    except Exception as exc:
+        out.put(exc)
+    finally:
+        chunks.close()
+
+
+class Recommender:
+    """
+    Streams zone-specific recommendations from a backend, with a bounded
+    timeout and the static text as fallback. Complete responses are cached
+    (LRU + SQLite, for `ttl` seconds) on (backend identity, zone, weapon,
+    distance band, language), so repeated scenarios are served instantly
+    without calling the model, and changing the model or endpoint starts afresh.
+
+    The backend is read on a helper thread so the timeout also covers a
+    stream that stalls mid-response; the abandoned reader stops at its
+    next chunk or at the backend's own read timeout.
+    """
+
+    def __init__(self, backend: RecommendationBackend | None = None, timeout: float = 20.0, disk: bool = True,
+                 ttl: float | None = RECOMMENDATION_TTL_S):
+        self.backend = backend or StaticBackend()
+        self.timeout = timeout
+        self.cache = TieredCache(f"recommendations_{self.backend.name}", maxsize=1024, ttl=ttl, disk=disk)
+
+    def stream(self, zone: str, weapon: str, yield_kt: float, distance_m: float, language: str = "English"):
+        band = distance_band(distance_m)
+        key = (self.backend.identity, zone, weapon, round(float(yield_kt), 3), band, language)
+        cached = self.cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+
+        chunks = []
+        deadline = time.monotonic() + self.timeout
+        request = {"zone": zone, "weapon": weapon, "yield_kt": yield_kt, "band": band, "language": language}
+        out, stop = queue.Queue(), threading.Event()
+        # A copied context keeps the backend's perf counters on this run.
+        reader = threading.Thread(target=contextvars.copy_context().run, daemon=True, name="recommendation-stream",
+                                  args=(_pump, self.backend.stream(request, self.timeout), out, stop))
+        reader.start()
+        try:
+            while True:
+                item = out.get(timeout=max(deadline - time.monotonic(), 0.0))
+                if item is _END:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                chunks.append(item)
+                yield item
+        except Exception:
+            # Covers queue.Empty (time budget spent) and backend errors. A partial
+            # answer is followed by the complete static text and is not cached.
+            fallback = get_safety_recommendations(zone, language)
+            yield f"\n\n---\n{fallback}" if chunks else fallback
+            return
+        finally:
+            stop.set()
+        if chunks:
+            self.cache.set(key, "".join(chunks))
@@ -1,8 +1,8 @@
 # pages/02_ℹ️_Information.py (Updated to use use_container_width)
 
 import streamlit as st
-from data import BOMB_DATA
-from PIL import Image
+from catalog import get_catalog
+from thumbnails import pick_width, thumbnail
 
 st.set_page_config(page_title="Information", page_icon="ℹ️", layout="wide")
 
@@ -18,15 +18,28 @@ selected_language = st.radio(
 
 # --- Define Content in Both Languages ---
 
-# Bomb name to image file mapping
-IMAGE_MAP = {
-    "W-87 (Modern US Warhead)": "w87.jpg",
-    "B-61-12 (Modern US Tactical Bomb)": "b61.jpg",
-    "Topol-M SS-27 (Modern Russian ICBM)": "topol_m.jpg",
-    "DF-5 (Modern Chinese ICBM)": "df5.jpg",
-    "Tsar Bomba (Largest Tested)": "tsar_bomba.jpg",
-    "Little Boy (Hiroshima)": "little_boy.jpg"
-}
+# Image columns are a quarter of the wide layout, ~320 px on common screens.
+# Thumbnails are pre-resized WebP, cached on disk and in memory across sessions.
+IMAGE_WIDTH = pick_width(320)
+
+# Devices come from the same catalog as the simulator (images are a catalog column).
+# Larger catalogs get a search box and only the first DEVICES_PER_PAGE matches are shown.
+catalog = get_catalog()
+DEVICES_PER_PAGE = 20
+
+def device_records(search_label, country_label, all_label, count_label):
+    rows = catalog.search()
+    if len(catalog) > DEVICES_PER_PAGE:
+        search_col, country_col = st.columns(2)
+        query = search_col.text_input(search_label, key="device_query")
+        country = country_col.selectbox(country_label, [""] + catalog.countries(), key="device_country",
+                                        format_func=lambda country: country or all_label)
+        rows = catalog.search(query, country or None)
+        st.caption(count_label.format(shown=min(len(rows), DEVICES_PER_PAGE), total=len(rows)))
+    return [catalog.record(row) for row in rows[:DEVICES_PER_PAGE]]
+
+def format_number(value):
+    return f"{value:,.0f}" if float(value).is_integer() else f"{value:,.2f}"
 
 # --- ENGLISH CONTENT ---
 if selected_language == "English":
@@ -47,21 +60,21 @@ if selected_language == "English":
     st.divider()
     st.header("Nuclear Device Information")
 
-    for bomb_name, details in BOMB_DATA.items():
+    for details in device_records("Search devices", "Possessing country", "All countries",
+                                  "Showing {shown} of {total} matching devices."):
+        bomb_name = details['name']
         st.subheader(bomb_name)
         col1, col2 = st.columns([1, 3])
         
-        try:
-            image_path = f"assets/{IMAGE_MAP.get(bomb_name, 'default.jpg')}"
-            image = Image.open(image_path)
-            # --- THE FIX IS HERE ---
+        image = thumbnail(details['image'], IMAGE_WIDTH)
+        if image is not None:
             col1.image(image, use_container_width=True, caption=f"Image of {bomb_name}")
-        except FileNotFoundError:
+        else:
             col1.warning(f"Image not found for {bomb_name}")
 
-        col2.metric("Explosive Yield", f"{details['yield_kt']:,} kilotons")
+        col2.metric("Explosive Yield", f"{format_number(details['yield_kt'])} kilotons")
         col2.markdown(f"**Possessing Country:** {details['possessing_country']}")
-        col2.markdown(f"Equivalent to **{details['yield_kt'] * 1000:,} tons** of TNT.")
+        col2.markdown(f"Equivalent to **{format_number(details['yield_kt'] * 1000)} tons** of TNT.")
         st.divider()
 
 
@@ -87,25 +100,25 @@ elif selected_language == "العربية (Arabic)":
     st.divider()
     st.markdown("<h2 style='direction: rtl; text-align: right;'>معلومات عن الأجهزة النووية</h2>", unsafe_allow_html=True)
 
-    for bomb_name, details in BOMB_DATA.items():
+    for details in device_records("البحث عن الأجهزة", "الدولة المالكة", "جميع الدول",
+                                  "عرض {shown} من {total} جهازًا مطابقًا."):
+        bomb_name = details['name']
         st.markdown(f"<h3 style='direction: rtl; text-align: right;'>{bomb_name}</h3>", unsafe_allow_html=True)
         
         text_col, image_col = st.columns([3, 1])
         
         with image_col:
-            try:
-                image_path = f"assets/{IMAGE_MAP.get(bomb_name, 'default.jpg')}"
-                image = Image.open(image_path)
-                # --- THE FIX IS HERE ---
+            image = thumbnail(details['image'], IMAGE_WIDTH)
+            if image is not None:
                 st.image(image, use_container_width=True, caption=f"صورة لـ {bomb_name}")
-            except FileNotFoundError:
+            else:
                 st.warning(f"لم يتم العثور على صورة لـ {bomb_name}")
 
         with text_col:
             country_en = details['possessing_country']
             country_ar = country_translation.get(country_en, country_en)
-            yield_kt_formatted = f"{details['yield_kt']:,}"
-            tnt_equiv_formatted = f"{details['yield_kt'] * 1000:,}"
+            yield_kt_formatted = format_number(details['yield_kt'])
+            tnt_equiv_formatted = format_number(details['yield_kt'] * 1000)
 
             rtl_details_html = f"""
             <div style='direction: rtl; text-align: right; height: 100%;'>
@@ -0,0 +1,240 @@
+# perf.py
+
+"""
+Lightweight per-rerun instrumentation.
+
+    perf.begin_run(enabled)            # top of the script
+    perf.begin_callback_run(enabled)   # in widget callbacks, which run before it
+    with perf.span("folium_map"): ...  # time a phase
+    perf.count("external.nominatim")   # count an event
+    summary = perf.end_run()           # bottom of the script
+
+State lives in a ContextVar, so every Streamlit session (script thread) records
+its own run. When no run is active, `span` returns a shared no-op context
+manager and `count` returns immediately, so the disabled cost is one
+ContextVar lookup. A rerun cut short by st.rerun(), st.stop() or an exception
+never reaches end_run; its run is discarded by the next begin_run (or
+begin_callback_run), so it cannot absorb the next rerun's timings. Finished
+runs go to a rolling in-process history, to a
+JSON-lines file (NUKE_PERF_EXPORT, default CACHE_DIR/perf.jsonl, rotated at
+EXPORT_MAX_BYTES), and to process-wide totals exposed in Prometheus text format.
+
+Set NUKE_PERF=1 to instrument every session, not just those with the panel on.
+"""
+
+import contextlib
+import contextvars
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+
+ALWAYS_ON = os.environ.get("NUKE_PERF") == "1"
+EXPORT_PATH = os.environ.get("NUKE_PERF_EXPORT")
+EXPORT_MAX_BYTES = 5 * 1024 * 1024
+
+_current = contextvars.ContextVar("perf_run", default=None)
+_NOOP = contextlib.nullcontext()
+
+history = deque(maxlen=500)
+_totals_lock = threading.Lock()
+_span_totals = {}        # name -> [count, total seconds]
+_counter_totals = Counter()
+_runs_total = 0
+
+
+class _Run:
+    __slots__ = ("started", "spans", "counters", "adoptable")
+
+    def __init__(self, adoptable: bool = False):
+        self.started = time.perf_counter()
+        self.spans = {}
+        self.counters = Counter()
+        # Started by a callback and not yet taken over by the script body.
+        self.adoptable = adoptable
+
+
+class _Span:
+    __slots__ = ("run", "name", "start")
+
+    def __init__(self, run, name):
+        self.run = run
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.run.spans[self.name] = self.run.spans.get(self.name, 0.0) + time.perf_counter() - self.start
+        return False
+
+
+def begin_run(enabled: bool = False):
+    """
+    Starts recording for the current session's rerun. A run begun by this
+    rerun's callback is continued; any other active run is left over from an
+    interrupted rerun and is replaced.
+    """
+    run = _current.get()
+    if run is not None and run.adoptable:
+        run.adoptable = False
+    elif enabled or ALWAYS_ON:
+        _current.set(_Run())
+    else:
+        _current.set(None)
+
+
+def begin_callback_run(enabled: bool = False):
+    """
+    Starts recording from a widget callback, so the lookup it triggers is
+    counted in the rerun that follows; begin_run then continues this run.
+    """
+    _current.set(_Run(adoptable=True) if enabled or ALWAYS_ON else None)
+
+
+def active() -> bool:
+    return _current.get() is not None
+
+
+def span(name: str):
+    run = _current.get()
+    return _NOOP if run is None else _Span(run, name)
+
+
+def timed(name: str):
+    """
+    Decorator form of `span`.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count(name: str, n: int = 1):
+    run = _current.get()
+    if run is not None:
+        run.counters[name] += n
+
+
+def end_run() -> dict | None:
+    """
+    Finishes the active run, records and exports it, and returns its summary:
+    {"ts", "total_ms", "spans_ms": {...}, "counters": {...}}.
+    """
+    global _runs_total
+    run = _current.get()
+    if run is None:
+        return None
+    _current.set(None)
+    summary = {
+        "ts": time.time(),
+        "total_ms": (time.perf_counter() - run.started) * 1000,
+        "spans_ms": {name: seconds * 1000 for name, seconds in run.spans.items()},
+        "counters": dict(run.counters),
+    }
+    history.append(summary)
+    with _totals_lock:
+        _runs_total += 1
+        for name, seconds in run.spans.items():
+            total = _span_totals.setdefault(name, [0, 0.0])
+            total[0] += 1
+            total[1] += seconds
+        _counter_totals.update(run.counters)
+        _export(summary)
+    return summary
+
+
+def _export(summary: dict):
+    # Imported here: cache.py itself reports hits and misses through this module.
+    from cache import CACHE_DIR
+
+    path = EXPORT_PATH or os.path.join(CACHE_DIR, "perf.jsonl")
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if os.path.exists(path) and os.path.getsize(path) > EXPORT_MAX_BYTES:
+            os.replace(path, path + ".1")
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(summary) + "\n")
+    except OSError:
+        pass
+
+
+def prometheus_text() -> str:
+    """
+    Process-wide totals in the Prometheus text exposition format.
+    """
+    lines = [
+        "# TYPE nuke_reruns_total counter",
+        f"nuke_reruns_total {_runs_total}",
+        "# TYPE nuke_phase_seconds summary",
+    ]
+    with _totals_lock:
+        for name, (n, seconds) in sorted(_span_totals.items()):
+            lines.append(f'nuke_phase_seconds_count{{phase="{name}"}} {n}')
+            lines.append(f'nuke_phase_seconds_sum{{phase="{name}"}} {seconds:.6f}')
+        lines.append("# TYPE nuke_events_total counter")
+        for name, n in sorted(_counter_totals.items()):
+            lines.append(f'nuke_events_total{{event="{name}"}} {n}')
+    return "\n".join(lines) + "\n"
+
+
+def deep_sizeof(obj) -> int:
+    """
+    Approximate bytes held by an object graph (containers, their items and
+    instance attributes), counting shared objects once. Used to report the
+    size of a session's state.
+    """
+    seen, stack, total = set(), [obj], 0
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset, deque)):
+            stack.extend(item)
+        elif hasattr(item, "__dict__") and not isinstance(item, type):
+            stack.append(vars(item))
+    return total
+
+
+def submit_in_context(executor, fn, *args):
+    """
+    executor.submit that carries the caller's active run into the worker thread.
+    """
+    return executor.submit(contextvars.copy_context().run, fn, *args)
+
+
+def _capture(fn, args) -> tuple:
+    run = _Run()
+    _current.set(run)
+    return fn(*args), dict(run.counters)
+
+
+def capture(fn, *args) -> tuple:
+    """
+    Calls fn in a fresh context with a private run and returns (result,
+    counters), for work that outlives the rerun that asked for it. The owner
+    adds the counters to its own run with `merge`.
+    """
+    return contextvars.Context().run(_capture, fn, args)
+
+
+def merge(counters: dict):
+    """
+    Adds counters captured elsewhere (see `capture`) to the active run.
+    """
+    run = _current.get()
+    if run is not None:
+        run.counters.update(counters)
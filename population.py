@@ -0,0 +1,93 @@
+# population.py
+
+import json
+import os
+
+import numpy as np
+
+from geo import ZoneIndex, haversine_m
+
+METERS_PER_DEGREE_LAT = 111_320.0
+
+
+class PopulationRaster:
+    """
+    Gridded population counts (people per cell) on a regular lat/lon grid.
+
+    Two formats are supported, neither of which is read fully into memory:
+      - `.npy`: a 2-D array opened with mmap_mode='r', plus a sidecar JSON file
+        (same name, `.json` extension) holding {"west", "north", "cell_deg"} for
+        the top-left corner and the cell size in degrees, and optionally "nodata".
+      - GeoTIFF: opened with rasterio (an optional dependency) and read one
+        window at a time; the file's own nodata value applies.
+    Nodata, NaN and negative values count as zero.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        if path.endswith(".npy"):
+            self.data = np.load(path, mmap_mode='r')
+            with open(os.path.splitext(path)[0] + ".json", encoding="utf-8") as f:
+                meta = json.load(f)
+            self.west, self.north = float(meta['west']), float(meta['north'])
+            self.cell_lon = self.cell_lat = float(meta['cell_deg'])
+            self.height, self.width = self.data.shape
+            self.nodata = meta.get('nodata')
+            self._dataset = None
+        else:
+            try:
+                import rasterio
+            except ImportError:
+                raise ImportError(f"Reading the GeoTIFF population raster {path!r} needs rasterio "
+                                  "(pip install rasterio), or convert it to .npy with a .json sidecar.") from None
+            self._dataset = rasterio.open(path)
+            self.nodata = self._dataset.nodata
+            transform = self._dataset.transform
+            self.west, self.north = transform.c, transform.f
+            self.cell_lon, self.cell_lat = transform.a, -transform.e
+            self.height, self.width = self._dataset.height, self._dataset.width
+            self.data = None
+
+    def read_window(self, lat: float, lon: float, radius_m: float) -> tuple:
+        """
+        Returns (counts, cell-center lats, cell-center lons) for the cells whose
+        centers fall within the bounding box of a circle. Only that window is read.
+        """
+        dlat = radius_m / METERS_PER_DEGREE_LAT
+        dlon = dlat / max(np.cos(np.radians(lat)), 1e-6)
+        row0 = max(int(np.floor((self.north - (lat + dlat)) / self.cell_lat)), 0)
+        row1 = min(int(np.ceil((self.north - (lat - dlat)) / self.cell_lat)), self.height)
+        col0 = max(int(np.floor((lon - dlon - self.west) / self.cell_lon)), 0)
+        col1 = min(int(np.ceil((lon + dlon - self.west) / self.cell_lon)), self.width)
+        if row0 >= row1 or col0 >= col1:
+            return np.zeros((0, 0)), np.zeros(0), np.zeros(0)
+
+        if self.data is not None:
+            counts = np.asarray(self.data[row0:row1, col0:col1], dtype=float)
+        else:
+            from rasterio.windows import Window
+            counts = self._dataset.read(1, window=Window(col0, row0, col1 - col0, row1 - row0)).astype(float)
+        lats = self.north - (np.arange(row0, row1) + 0.5) * self.cell_lat
+        lons = self.west + (np.arange(col0, col1) + 0.5) * self.cell_lon
+        # NaN survives np.maximum, so invalid cells are masked explicitly.
+        valid = np.isfinite(counts) & (counts >= 0)
+        if self.nodata is not None and not np.isnan(self.nodata):
+            valid &= counts != self.nodata
+        return np.where(valid, counts, 0.0), lats, lons
+
+    def exposure(self, lat: float, lon: float, effects: dict) -> dict:
+        """
+        Population per effect zone (name -> people), using the app's rule that
+        each cell belongs to the most severe ring containing its center.
+        """
+        index = ZoneIndex(effects)
+        counts, lats, lons = self.read_window(lat, lon, index.envelope[-1])
+        totals = dict.fromkeys(index.names, 0.0)
+        if counts.size == 0:
+            return totals
+        distances = haversine_m(lat, lon, lats[:, None], lons[None, :])
+        positions = index.assign(distances)
+        per_zone = np.bincount(positions.ravel(), weights=counts.ravel(), minlength=len(index.names) + 1)
+        for name, total in zip(index.names, per_zone):
+            totals[name] = float(total)
+        return totals
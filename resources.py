@@ -0,0 +1,88 @@
+# resources.py
+
+"""
+Process-wide resources, built once per process with st.cache_resource and
+shared by every session: the HTTP connection pool, the Nominatim geolocator,
+the geocoding cache, the recommender, the population raster and scenarios.
+(Effect tables are memoized process-wide in core.py, which has no Streamlit
+dependency.)
+
+Each getter imports the library it wraps on first call, so importing this
+module does not pull geopy, requests or rasterio into the script's startup.
+Everything returned here is shared between sessions and must be treated as
+read-only.
+"""
+
+import streamlit as st
+
+NOMINATIM_USER_AGENT = "nuclear_bomb_visualizer_app_v9"
+
+
+@st.cache_resource
+def get_http_session():
+    """
+    One pooled requests.Session for Geoapify and the LLM backend.
+    """
+    from geocache import make_http_session
+
+    return make_http_session()
+
+
+@st.cache_resource
+def get_geolocator(domain: str | None = None, scheme: str | None = None):
+    from geopy.geocoders import Nominatim
+
+    return Nominatim(user_agent=NOMINATIM_USER_AGENT, domain=domain or "nominatim.openstreetmap.org",
+                     scheme=scheme or "https")
+
+
+@st.cache_resource
+def get_geocache(api_key, gazetteer_prefix, autocomplete_url=None, nominatim_domain=None, nominatim_scheme=None,
+                 autocomplete_max_qps=None, reverse_max_qps=None):
+    """
+    Geocoding caches, the optional gazetteer mapping, the worker pool and the
+    per-process rate limits. The endpoint arguments override the public
+    Geoapify and Nominatim URLs; the limits default to those services' policies
+    (0 disables a limit).
+    """
+    from gazetteer import Gazetteer
+    from geocache import AUTOCOMPLETE_MAX_QPS, GEOAPIFY_AUTOCOMPLETE_URL, REVERSE_MAX_QPS, GeoCache
+
+    return GeoCache(geolocator=get_geolocator(nominatim_domain, nominatim_scheme), api_key=api_key,
+                    session=get_http_session(), autocomplete_url=autocomplete_url or GEOAPIFY_AUTOCOMPLETE_URL,
+                    gazetteer=Gazetteer(gazetteer_prefix) if gazetteer_prefix else None,
+                    autocomplete_max_qps=AUTOCOMPLETE_MAX_QPS if autocomplete_max_qps is None else autocomplete_max_qps,
+                    reverse_max_qps=REVERSE_MAX_QPS if reverse_max_qps is None else reverse_max_qps)
+
+
+@st.cache_resource
+def get_recommender(base_url, model, api_key, timeout_s):
+    """
+    Static text unless an LLM is configured; responses are cached across sessions either way.
+    """
+    from llm import OpenAICompatibleBackend, Recommender
+
+    if not base_url:
+        return Recommender()
+    backend = OpenAICompatibleBackend(base_url, model=model, api_key=api_key, session=get_http_session())
+    return Recommender(backend, timeout=timeout_s)
+
+
+@st.cache_resource
+def get_population_raster(path):
+    """
+    Memory-mapped once per process; sessions only page in the windows they read.
+    """
+    from population import PopulationRaster
+
+    return PopulationRaster(path)
+
+
+@st.cache_resource(max_entries=32)
+def get_scenario(bursts_key):
+    """
+    Scenarios (spatial index + dissolved zone GeoJSON) are built once per distinct burst list.
+    """
+    from scenario import Scenario
+
+    return Scenario([dict(burst) for burst in bursts_key])
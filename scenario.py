@@ -0,0 +1,176 @@
+# scenario.py
+
+import itertools
+import json
+
+import numpy as np
+
+from core import validate_inputs, weapon_parameters, weapon_radii
+from data import EFFECT_ZONES, OUTSIDE_ZONE, build_effects
+from geo import ZoneIndex, arc_to_chord, chord_to_arc, circle_ring, haversine_m, unit_vectors
+
+# Zones ordered from most to least severe; the last entry means "no zone".
+ZONE_SEVERITY = list(EFFECT_ZONES) + [OUTSIDE_ZONE]
+OUTSIDE_RANK = len(ZONE_SEVERITY) - 1
+# Rank of points with missing or out-of-range coordinates (not an index into ZONE_SEVERITY).
+INVALID_RANK = -1
+INVALID_ZONE = "Invalid coordinates"
+
+
+def make_burst(lat: float, lon: float, bomb: str, yield_kt: float | None = None, hob_m: float | None = None) -> dict:
+    """
+    A scenario entry. Yield and height of burst default to the weapon's catalog values.
+    Raises ValueError for an unknown weapon or invalid coordinates, yield or height,
+    as core.assess_point does.
+    """
+    yield_kt, hob_m = weapon_parameters(bomb, yield_kt, hob_m)
+    validate_inputs(lat, lon, lat, lon, yield_kt, hob_m)
+    return {"lat": float(lat), "lon": float(lon), "bomb": bomb, "yield_kt": yield_kt, "hob_m": hob_m}
+
+
+def rings_geojson(lat: float, lon: float, effects: dict, vertices: int = 128) -> dict:
+    """
+    FeatureCollection with one geodesic ring polygon per effect, largest first
+    so smaller rings draw on top. Rings that do not reach the ground are left out.
+    """
+    features = []
+    for name, details in sorted(effects.items(), key=lambda item: item[1]['radius_m'], reverse=True):
+        if details['radius_m'] <= 0:
+            continue
+        r, g, b, a = details['color']
+        ring = np.round(circle_ring(lat, lon, details['radius_m'], vertices), 5)
+        features.append({
+            "type": "Feature",
+            "geometry": {"type": "Polygon", "coordinates": [ring.tolist()]},
+            "properties": {"name": name, "color": f"#{r:02x}{g:02x}{b:02x}"},
+        })
+    return {"type": "FeatureCollection", "features": features}
+
+
+class Scenario:
+    """
+    Many detonations, each with its own weapon.
+
+    A KD-tree over the bursts' unit-sphere coordinates limits every query to
+    bursts within reach of the largest ring, so query cost grows with the
+    number of *nearby* bursts rather than the scenario size.
+    """
+
+    def __init__(self, bursts: list):
+        from scipy.spatial import cKDTree
+
+        if not bursts:
+            raise ValueError("A scenario needs at least one burst.")
+        self.bursts = [make_burst(**burst) for burst in bursts]
+        self.lats = np.array([b['lat'] for b in self.bursts])
+        self.lons = np.array([b['lon'] for b in self.bursts])
+
+        # Per burst: the ZoneIndex severity envelope, whose positions are
+        # severity ranks (position len(EFFECT_ZONES) is "outside").
+        self.effects = [build_effects(b['yield_kt'], b['hob_m'], weapon_radii(b['bomb'], b['yield_kt'], b['hob_m']))
+                        for b in self.bursts]
+        self.radii = np.array([ZoneIndex(effects).envelope for effects in self.effects])
+        self.max_radius = float(self.radii.max())
+        self._tree = cKDTree(unit_vectors(self.lats, self.lons))
+        self._geojson = None
+
+    @classmethod
+    def from_json(cls, path: str) -> "Scenario":
+        """
+        Loads a JSON list of {"lat", "lon", "bomb", optional "yield_kt", "hob_m"} objects.
+        """
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def __len__(self):
+        return len(self.bursts)
+
+    def classify(self, lat, lon) -> tuple:
+        """
+        Vectorized worst-zone lookup. Returns (distance to nearest burst in m,
+        severity rank per point); translate ranks with ZONE_SEVERITY.
+        Within a single burst and across bursts the most severe containing
+        zone wins, as in the app and core.assess_batch.
+        Points with a NaN or out-of-range coordinate get distance NaN and
+        INVALID_RANK instead of failing the whole batch.
+        """
+        lat = np.atleast_1d(np.asarray(lat, dtype=float))
+        lon = np.atleast_1d(np.asarray(lon, dtype=float))
+        # NaN fails both comparisons.
+        valid = (np.abs(lat) <= 90) & (np.abs(lon) <= 180)
+        if valid.all():
+            return self._classify_valid(lat, lon)
+        nearest_m = np.full(len(lat), np.nan)
+        rank = np.full(len(lat), INVALID_RANK)
+        if valid.any():
+            nearest_m[valid], rank[valid] = self._classify_valid(lat[valid], lon[valid])
+        return nearest_m, rank
+
+    def _classify_valid(self, lat: np.ndarray, lon: np.ndarray) -> tuple:
+        xyz = unit_vectors(lat, lon)
+        chord, _ = self._tree.query(xyz)
+        nearest_m = chord_to_arc(chord)
+
+        candidates = self._tree.query_ball_point(xyz, arc_to_chord(self.max_radius), return_sorted=False)
+        counts = np.fromiter(map(len, candidates), dtype=np.intp, count=len(candidates))
+        point_idx = np.repeat(np.arange(len(lat)), counts)
+        burst_idx = np.fromiter(itertools.chain.from_iterable(candidates), dtype=np.intp, count=counts.sum())
+
+        distance = haversine_m(self.lats[burst_idx], self.lons[burst_idx], lat[point_idx], lon[point_idx])
+        envelope = self.radii[burst_idx]
+        # As in ZoneIndex.assign, zero-radius rings contain nothing.
+        positions = np.maximum((envelope < distance[:, None]).sum(axis=1), (envelope <= 0).sum(axis=1))
+        rank = np.full(len(lat), OUTSIDE_RANK)
+        np.minimum.at(rank, point_idx, positions)
+        return nearest_m, rank
+
+    def zone_at(self, lat: float, lon: float) -> tuple:
+        """
+        Scalar convenience: (distance to nearest burst in m, zone name).
+        Raises ValueError for an invalid coordinate.
+        """
+        nearest_m, rank = self.classify(lat, lon)
+        if rank[0] == INVALID_RANK:
+            raise ValueError(f"Invalid coordinates: ({lat}, {lon})")
+        return float(nearest_m[0]), ZONE_SEVERITY[int(rank[0])]
+
+    def zone_geometries(self, vertices: int = 64, tolerance_deg: float = 1e-4) -> dict:
+        """
+        Dissolved, non-overlapping geometry per zone (shapely, lon/lat).
+        Each zone's union has every more severe zone's union cut out of it,
+        then is simplified to `tolerance_deg` (~11 m) to keep the map payload small.
+        """
+        import shapely
+        from shapely.geometry import Polygon
+        from shapely.ops import unary_union
+
+        geometries = {}
+        covered = None
+        for name in EFFECT_ZONES:
+            rings = [Polygon(circle_ring(b['lat'], b['lon'], effects[name]['radius_m'], vertices))
+                     for b, effects in zip(self.bursts, self.effects)]
+            zone = unary_union(rings)
+            exclusive = zone if covered is None else zone.difference(covered)
+            geometries[name] = shapely.set_precision(exclusive.simplify(tolerance_deg), tolerance_deg / 10)
+            covered = zone if covered is None else covered.union(zone)
+        return geometries
+
+    def to_geojson(self) -> dict:
+        """
+        FeatureCollection of the dissolved zones, ready for folium.GeoJson. Cached.
+        """
+        if self._geojson is None:
+            from shapely.geometry import mapping
+
+            features = []
+            for name, geometry in self.zone_geometries().items():
+                if geometry.is_empty:
+                    continue
+                r, g, b, a = EFFECT_ZONES[name]['color']
+                features.append({
+                    "type": "Feature",
+                    "geometry": mapping(geometry),
+                    "properties": {"name": name, "color": f"#{r:02x}{g:02x}{b:02x}"},
+                })
+            self._geojson = {"type": "FeatureCollection", "features": features}
+        return self._geojson
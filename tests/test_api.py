@@ -0,0 +1,130 @@
+# tests/test_api.py
+
+import asyncio
+import json
+
+import numpy as np
+import pyarrow as pa
+import pytest
+
+import api
+from bench.api_load import make_batches
+from catalog import get_catalog
+from core import assess_batch, assess_point
+
+W87 = "W-87 (Modern US Warhead)"
+
+
+def call(path: str, body: bytes = b"", content_type: str = "application/json", method: str = "POST",
+         query: str = "") -> tuple:
+    """
+    Runs one request through the ASGI app; returns (status, content type, body).
+    """
+    scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": method,
+             "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": query.encode(),
+             "headers": [(b"content-type", content_type.encode())], "client": ("test", 0),
+             "server": ("test", 80), "root_path": ""}
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(api.app(scope, receive, send))
+    start = sent[0]
+    headers = dict(start["headers"])
+    return start["status"], headers.get(b"content-type", b"").decode(), b"".join(m.get("body", b"") for m in sent[1:])
+
+
+def post_json(payload, query: str = "") -> tuple:
+    status, _, body = call("/v1/assess", json.dumps(payload).encode(), query=query)
+    return status, json.loads(body)
+
+
+def arrow_bytes(columns: dict) -> bytes:
+    table = pa.table(columns)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+COLUMNS = {"weapon": [W87, W87], "det_lat": [40.7128, 40.7128], "det_lon": [-74.0060, -74.0060],
+           "lat": [40.7128, 40.80], "lon": [-74.0060, -74.0060]}
+
+
+def test_items_and_columns_agree_with_assess_point():
+    items = [{"weapon": w, "detonation": [a, b], "point": [c, d]} for w, a, b, c, d in zip(*COLUMNS.values())]
+    status, by_items = post_json({"items": items})
+    assert status == 200
+    status, by_columns = post_json({"columns": COLUMNS})
+    assert status == 200
+    for i, result in enumerate(by_items["results"]):
+        expected = assess_point(W87, (40.7128, -74.0060), (COLUMNS["lat"][i], COLUMNS["lon"][i]))
+        assert result["zone"] == by_columns["columns"]["zone"][i] == expected["zone"]
+        assert result["distance_m"] == pytest.approx(expected["distance_m"])
+
+
+def test_arrow_round_trip_with_recommendations():
+    status, content_type, body = call("/v1/assess", arrow_bytes(COLUMNS), api.ARROW_MEDIA_TYPE,
+                                      query="format=arrow&recommendations=1")
+    assert status == 200 and content_type == api.ARROW_MEDIA_TYPE
+    table = pa.ipc.open_stream(body).read_all()
+    zones = table.column("zone").cast(pa.string()).to_pylist()
+    assert zones == post_json({"columns": COLUMNS})[1]["columns"]["zone"]
+    assert all(f"recommendations:{zone}".encode() in table.schema.metadata for zone in zones)
+
+
+@pytest.mark.parametrize("column, value", [("lat", None), ("lat", float("nan")), ("lat", 91.0), ("lon", 180.5),
+                                          ("det_lon", -200.0), ("yield_kt", -1.0), ("hob_m", -5.0)])
+def test_invalid_values_are_rejected(column, value):
+    columns = dict(COLUMNS, **{column: [COLUMNS.get(column, [1.0])[0], value]})
+    if column in ("yield_kt", "hob_m"):
+        columns[column] = [None, value]
+    # NaN is not valid JSON, so send that case as Arrow.
+    status, _, body = call("/v1/assess", arrow_bytes(columns), api.ARROW_MEDIA_TYPE)
+    assert status == 400 and column in json.loads(body)["error"]
+
+
+@pytest.mark.parametrize("body", [b"not json", b"[1, 2]", b'{"items": [{"weapon": "x"}]}',
+                                  b'{"columns": {"weapon": []}}', b'{"columns": {"weapon": ["a"], "det_lat": [1, 2], '
+                                                                  b'"det_lon": [1], "lat": [1], "lon": [1]}}'])
+def test_malformed_bodies_are_rejected(body):
+    status, _, response = call("/v1/assess", body)
+    assert status == 400 and "error" in json.loads(response)
+
+
+def test_unknown_weapon_is_rejected():
+    status, body = post_json({"columns": dict(COLUMNS, weapon=["No such bomb"] * 2)})
+    assert status == 400 and "error" in body
+
+
+def test_load_generator_batches_are_accepted():
+    # Seed 25 puts a detonation 0.1 degrees from the antimeridian.
+    batches = make_batches(16, 50, "columns", seed=25)
+    assert max(abs(json.loads(body)["columns"]["det_lon"][0]) for body, _ in batches) > 179.5
+    for body, content_type in batches:
+        assert np.all(np.abs(json.loads(body)["columns"]["lon"]) <= 180)
+        status, _, response = call("/v1/assess", body, content_type)
+        assert status == 200, response
+
+
+def test_assess_batch_matches_assess_point():
+    rng = np.random.default_rng(11)
+    weapons = list(rng.choice(get_catalog().names(), 300))
+    det_lat, det_lon = rng.uniform(-60, 60, 300), rng.uniform(-180, 180, 300)
+    lat = det_lat + rng.normal(0, 0.1, 300)
+    lon = (det_lon + rng.normal(0, 0.1, 300) + 180) % 360 - 180
+    # Every third row overrides the preset yield and burst height.
+    yields = np.where(np.arange(300) % 3 == 0, rng.uniform(0.1, 5000, 300), np.nan)
+    hobs = np.where(np.arange(300) % 3 == 0, rng.uniform(0, 3000, 300), np.nan)
+    batch = assess_batch(weapons, det_lat, det_lon, lat, lon, yield_kt=yields, hob_m=hobs)
+    for i in range(300):
+        override = {} if np.isnan(yields[i]) else {"yield_kt": float(yields[i]), "hob_m": float(hobs[i])}
+        point = assess_point(weapons[i], (det_lat[i], det_lon[i]), (lat[i], lon[i]), **override)
+        assert batch["zone"][i] == point["zone"]
+        assert batch["distance_m"][i] == pytest.approx(point["distance_m"])
+        assert batch["yield_kt"][i] == pytest.approx(point["yield_kt"])
@@ -0,0 +1,73 @@
+# tests/test_catalog.py
+
+import pandas as pd
+import pytest
+
+import core
+from catalog import WeaponCatalog, compile_catalog, presets_table
+from data import EFFECT_ZONES, build_effects
+
+
+@pytest.fixture
+def catalog(tmp_path, monkeypatch):
+    source = tmp_path / "weapons.csv"
+    pd.DataFrame({
+        "name": ["Ébauche Σ-1", "Straße X", "Plain"],
+        "possessing_country": ["France", "Germany", "Nowhere"],
+        "yield_kt": [10.0, 20.0, 0.005],
+        "hob_m": [None, 1537.3, 0.0],
+        "radius_5psi": [1234.0, None, None],
+    }).to_csv(source, index=False)
+    path = str(tmp_path / "weapons.npy")
+    assert compile_catalog(str(source), path) == 3
+    catalog = WeaponCatalog(path)
+    monkeypatch.setattr(core, "get_catalog", lambda: catalog)
+    return catalog
+
+
+def test_source_radii_are_kept_and_missing_ones_computed(catalog):
+    stored = catalog.record("Ébauche Σ-1")
+    computed = build_effects(stored["yield_kt"], stored["hob_m"])
+    assert stored["radii_m"]["Heavy Blast Damage"] == 1234.0
+    assert stored["radii_m"]["Thermal Radiation"] == pytest.approx(computed["Thermal Radiation"]["radius_m"])
+
+
+def test_stored_radii_apply_only_at_the_records_own_parameters(catalog):
+    radii = core.weapon_radii("Ébauche Σ-1")
+    assert radii[list(EFFECT_ZONES).index("Heavy Blast Damage")] == 1234.0
+    record = catalog.record("Straße X")
+    # A fractional burst height must still match its record.
+    assert core.weapon_radii("Straße X", record["yield_kt"], 1537.3) is not None
+    assert core.weapon_radii("Straße X", 21.0) is None
+    assert core.weapon_radii("Straße X", hob_m=1540.0) is None
+
+
+def test_assessment_uses_stored_radii(catalog):
+    # 1300 m lies outside the stored 1234 m ring but inside the computed 5 psi ring.
+    computed = build_effects(10.0, catalog.record("Ébauche Σ-1")["hob_m"])["Heavy Blast Damage"]["radius_m"]
+    assert computed > 1300.0
+    point = (0.0, 1300.0 / 111_195.0)
+    assert core.assess_point("Ébauche Σ-1", (0.0, 0.0), point)["zone"] != "Heavy Blast Damage"
+    batch = core.assess_batch(["Ébauche Σ-1"] * 2, 0.0, 0.0, [point[0]] * 2, [point[1]] * 2, yield_kt=[None, 10.001])
+    # The second row overrides the yield, so its radii are computed.
+    assert list(batch["zone"] == "Heavy Blast Damage") == [False, True]
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("ébauche", "Ébauche Σ-1"), ("ÉBAUCHE", "Ébauche Σ-1"), ("σ-1", "Ébauche Σ-1"),
+    ("strasse", "Straße X"), ("STRASSE", "Straße X"), ("plain", "Plain"),
+])
+def test_search_casefolds_names_and_query(catalog, query, expected):
+    assert catalog.names(catalog.search(query)) == [expected]
+
+
+def test_filters_combine(catalog):
+    assert catalog.names(catalog.search(country="Germany")) == ["Straße X"]
+    assert catalog.names(catalog.search(max_kt=1.0)) == ["Plain"]
+    assert catalog.yield_range() == (0.005, 20.0)
+
+
+def test_presets_resolve_missing_hob_to_the_optimum():
+    table = presets_table()
+    assert (table["hob_m"] > 0).any()
+    assert len(WeaponCatalog()) == len(table)
@@ -0,0 +1,44 @@
+# tests/test_effects.py
+
+import numpy as np
+import pytest
+
+from core import assess_batch, assess_point
+from effects import compute_radii, effect_radii, fireball_radius, optimum_hob
+from fallout import local_fraction
+
+W87 = "W-87 (Modern US Warhead)"
+
+
+def test_surface_burst_fireball_is_full_radius():
+    assert effect_radii(300.0, 0.0)["fireball"] == pytest.approx(float(fireball_radius(300.0)))
+
+
+def test_fireball_is_projected_onto_the_ground():
+    radius = float(fireball_radius(300.0))
+    assert effect_radii(300.0, 400.0)["fireball"] == pytest.approx(np.sqrt(radius ** 2 - 400.0 ** 2))
+    assert effect_radii(300.0, radius)["fireball"] == 0.0
+    assert effect_radii(300.0, 20000.0)["fireball"] == 0.0
+
+
+def test_batched_and_memoized_radii_agree():
+    yields = np.array([0.1, 15.0, 300.0, 5000.0, 50000.0])
+    hobs = np.array([0.0, 580.0, 20000.0, 100.0, float(optimum_hob(50000.0))])
+    batched = compute_radii(yields, hobs)
+    for i, (y, h) in enumerate(zip(yields, hobs)):
+        for name, value in effect_radii(float(y), float(h)).items():
+            assert batched[name][i] == pytest.approx(value)
+
+
+def test_high_airburst_puts_nothing_in_the_fireball():
+    # No fireball on the ground means no local fallout either; the two must agree.
+    assert local_fraction(300.0, 20000.0) == 0
+    assert assess_point(W87, (0.0, 0.0), (0.0, 0.0), hob_m=20000.0)["zone"] != "Fireball"
+    batch = assess_batch([W87, W87], 0.0, 0.0, [0.0, 0.0], [0.0, 0.0], hob_m=[20000.0, 0.0])
+    assert list(batch["zone"]) == ["Outside all immediate impact radii", "Fireball"]
+
+
+def test_radii_shrink_with_height_above_the_optimum():
+    radii = compute_radii(300.0, np.array([2000.0, 5000.0, 20000.0]))
+    assert np.all(np.diff(radii["5psi"]) <= 0)
+    assert radii["5psi"][-1] == 0.0
@@ -0,0 +1,167 @@
+# tests/test_geocache.py
+
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import cache
+from geocache import GeoCache
+
+
+class StubGeocoder:
+    """
+    geopy-style reverse geocoder that counts calls and can be held until released.
+    """
+
+    def __init__(self, blocking: bool = False):
+        self.calls = 0
+        self.started = threading.Event()
+        self.release = threading.Event()
+        if not blocking:
+            self.release.set()
+        self._lock = threading.Lock()
+
+    def reverse(self, point, exactly_one=True, timeout=None):
+        with self._lock:
+            self.calls += 1
+        self.started.set()
+        self.release.wait(5)
+        return SimpleNamespace(address=f"Stub Street ({point[0]:.4f}, {point[1]:.4f})")
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, "CACHE_DIR", str(tmp_path))
+    return tmp_path
+
+
+def make_geocache(geocoder, disk=False):
+    return GeoCache(geolocator=geocoder, disk=disk, reverse_max_qps=None)
+
+
+def test_reverse_counts_hits_and_misses():
+    geocoder = StubGeocoder()
+    geocache = make_geocache(geocoder)
+
+    first = geocache.reverse(40.71281, -74.00601)
+    # Rounds to the same key, so it is a memory hit.
+    second = geocache.reverse(40.71283, -74.00598)
+    geocache.reverse(51.5072, -0.1276)
+
+    assert first == second
+    assert geocoder.calls == 2
+    stats = geocache.stats()["reverse"]
+    assert (stats["memory_hits"], stats["disk_hits"], stats["misses"]) == (1, 0, 2)
+    assert stats["hit_rate"] == pytest.approx(1 / 3)
+
+
+def test_failed_lookups_are_not_cached():
+    class FailingGeocoder(StubGeocoder):
+        def reverse(self, point, exactly_one=True, timeout=None):
+            super().reverse(point)
+            raise TimeoutError("upstream down")
+
+    geocoder = FailingGeocoder()
+    geocache = make_geocache(geocoder)
+
+    assert geocache.reverse(1.0, 2.0) is None
+    assert geocache.reverse(1.0, 2.0) is None
+    assert geocoder.calls == 2
+
+
+def test_entries_expire_after_ttl():
+    tiered = cache.TieredCache("ttl_test", ttl=0.05)
+    tiered.set("key", "value")
+    assert tiered.get("key") == "value"
+
+    time.sleep(0.1)
+    assert tiered.get("key") is None
+    # Both tiers expire: the disk tier does not resurrect the entry.
+    assert tiered.snapshot()["disk_hits"] == 0
+
+
+def test_concurrent_misses_share_one_lookup():
+    geocoder = StubGeocoder(blocking=True)
+    geocache = make_geocache(geocoder)
+    sessions = 8
+    results = [None] * sessions
+
+    def lookup(i):
+        results[i] = geocache.reverse(35.6762, 139.6503)
+
+    threads = [threading.Thread(target=lookup, args=(i,)) for i in range(sessions)]
+    for thread in threads:
+        thread.start()
+    assert geocoder.started.wait(5)
+    deadline = time.monotonic() + 5
+    while geocache.reverse_cache.coalescer.waits < sessions - 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    geocoder.release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert geocoder.calls == 1
+    assert len(set(results)) == 1 and results[0] is not None
+    stats = geocache.stats()["reverse"]
+    assert stats["misses"] == 1
+    assert stats["inflight_waits"] == sessions - 1
+
+
+def test_disk_tier_survives_a_new_process_cache():
+    geocoder = StubGeocoder()
+    address = make_geocache(geocoder, disk=True).reverse(48.8566, 2.3522)
+
+    # A fresh GeoCache stands in for a restarted app process: empty memory tier, same files.
+    restarted = make_geocache(geocoder, disk=True)
+    assert restarted.reverse(48.8566, 2.3522) == address
+    assert geocoder.calls == 1
+    stats = restarted.stats()["reverse"]
+    assert (stats["memory_hits"], stats["disk_hits"], stats["misses"]) == (0, 1, 0)
+
+    # The disk hit was promoted to memory.
+    restarted.reverse(48.8566, 2.3522)
+    assert restarted.stats()["reverse"]["memory_hits"] == 1
+
+
+class StubResponse:
+    def __init__(self, body, status_code=200):
+        self.body = body
+        self.status_code = status_code
+
+    def json(self):
+        if isinstance(self.body, Exception):
+            raise self.body
+        return self.body
+
+
+class StubSession:
+    """
+    requests.Session stand-in for Geoapify that replays one response and counts calls.
+    """
+
+    def __init__(self, response):
+        self.response = response
+        self.calls = 0
+
+    def get(self, url, params=None, timeout=None):
+        self.calls += 1
+        return self.response
+
+
+@pytest.mark.parametrize("body", [
+    ValueError("Expecting value: line 1 column 1 (char 0)"),
+    {"features": [{"properties": {"formatted": "Nowhere"}}]},
+    {"features": [{"geometry": {"coordinates": [1.0, 2.0]}}]},
+    ["not", "an", "object"],
+], ids=["not-json", "no-geometry", "no-properties", "wrong-shape"])
+def test_malformed_autocomplete_response_gives_no_suggestions(body):
+    session = StubSession(StubResponse(body))
+    geocache = GeoCache(geolocator=StubGeocoder(), api_key="key", session=session, disk=False,
+                        autocomplete_max_qps=None)
+
+    assert geocache.autocomplete("berlin") == []
+    # Failures are not cached: the next call asks again.
+    assert geocache.autocomplete("berlin") == []
+    assert session.calls == 2
@@ -0,0 +1,98 @@
+# tests/test_llm.py
+
+import textwrap
+import time
+
+import pytest
+
+import cache
+from llm import OpenAICompatibleBackend, RecommendationBackend, Recommender, get_safety_recommendations
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, "CACHE_DIR", str(tmp_path))
+
+
+class ScriptedBackend(RecommendationBackend):
+    """
+    Yields the given chunks; an Exception raises, a number sleeps that many seconds.
+    """
+    name = "scripted"
+
+    def __init__(self, *script, identity="scripted"):
+        self.script = script
+        self._identity = identity
+        self.calls = 0
+
+    @property
+    def identity(self) -> str:
+        return self._identity
+
+    def stream(self, request, timeout):
+        self.calls += 1
+        for step in self.script:
+            if isinstance(step, Exception):
+                raise step
+            if isinstance(step, (int, float)):
+                time.sleep(step)
+                continue
+            yield step
+
+
+def answer(recommender, zone="Thermal Radiation", language="English"):
+    return "".join(recommender.stream(zone, "W-87", 300, 4000, language))
+
+
+def test_complete_answers_are_cached():
+    backend = ScriptedBackend("### Zone", ": advice")
+    recommender = Recommender(backend, timeout=5)
+    assert answer(recommender) == "### Zone: advice"
+    assert answer(recommender) == "### Zone: advice"
+    assert backend.calls == 1
+
+
+def test_backend_error_falls_back_to_static_text():
+    recommender = Recommender(ScriptedBackend(ConnectionError("refused")), timeout=5, disk=False)
+    assert answer(recommender) == get_safety_recommendations("Thermal Radiation")
+
+
+def test_stalled_stream_falls_back_within_the_timeout():
+    backend = ScriptedBackend("partial ", 30, "never")
+    recommender = Recommender(backend, timeout=0.5, disk=False)
+    started = time.monotonic()
+    text = answer(recommender)
+    assert time.monotonic() - started < 5
+    assert text.startswith("partial ")
+    assert text.endswith(get_safety_recommendations("Thermal Radiation"))
+    # Partial answers are not cached.
+    answer(recommender)
+    assert backend.calls == 2
+
+
+def test_fallback_follows_the_language():
+    recommender = Recommender(ScriptedBackend(RuntimeError("down")), timeout=5, disk=False)
+    text = answer(recommender, language="العربية (Arabic)")
+    assert text == get_safety_recommendations("Thermal Radiation", "العربية (Arabic)")
+    assert "الإشعاع الحراري" in textwrap.dedent(text)
+
+
+def test_changing_model_or_endpoint_does_not_reuse_answers():
+    identity = OpenAICompatibleBackend("http://a/v1", "model-a").identity
+    for base_url, model in (("http://a/v1", "model-b"), ("http://b/v1", "model-a")):
+        assert OpenAICompatibleBackend(base_url, model).identity != identity
+
+    # Both recommenders share the "recommendations_scripted" disk cache.
+    old = Recommender(ScriptedBackend("old answer", identity="model-a"), timeout=5)
+    assert answer(old) == "old answer"
+    new = Recommender(ScriptedBackend("new answer", identity="model-b"), timeout=5)
+    assert answer(new) == "new answer"
+
+
+def test_cached_answers_expire():
+    backend = ScriptedBackend("answer")
+    recommender = Recommender(backend, timeout=5, ttl=0.05)
+    answer(recommender)
+    time.sleep(0.1)
+    answer(recommender)
+    assert backend.calls == 2
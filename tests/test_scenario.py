@@ -0,0 +1,72 @@
+# tests/test_scenario.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from classify import classify_file
+from core import assess_batch
+from scenario import INVALID_RANK, INVALID_ZONE, OUTSIDE_RANK, ZONE_SEVERITY, Scenario, make_burst
+
+W87 = "W-87 (Modern US Warhead)"
+
+
+@pytest.fixture(scope="module")
+def scenario():
+    return Scenario([{"lat": 40.7128, "lon": -74.0060, "bomb": W87}])
+
+
+def test_single_burst_matches_assess_batch(scenario):
+    rng = np.random.default_rng(7)
+    lat = 40.7128 + rng.uniform(-0.15, 0.15, 2000)
+    lon = -74.0060 + rng.uniform(-0.2, 0.2, 2000)
+    _, rank = scenario.classify(lat, lon)
+    expected = assess_batch([W87] * len(lat), 40.7128, -74.0060, lat, lon)["zone"]
+    assert list(np.asarray(ZONE_SEVERITY)[rank]) == list(expected)
+
+
+def test_most_severe_zone_wins_across_bursts():
+    near = Scenario([{"lat": 0.0, "lon": 0.0, "bomb": W87, "hob_m": 0.0},
+                     {"lat": 0.0, "lon": 0.05, "bomb": W87, "hob_m": 0.0}])
+    # At the second ground zero: that burst's fireball beats the first burst's outer ring.
+    assert near.zone_at(0.0, 0.05)[1] == "Fireball"
+    assert near.zone_at(5.0, 5.0)[1] == ZONE_SEVERITY[OUTSIDE_RANK]
+
+
+@pytest.mark.parametrize("lat, lon", [(np.nan, -74.0), (40.7, np.nan), (91.0, -74.0), (40.7, 200.0)])
+def test_invalid_points_are_flagged_not_fatal(scenario, lat, lon):
+    distance, rank = scenario.classify([40.7128, lat, 40.72], [-74.0060, lon, -74.0])
+    assert rank[1] == INVALID_RANK and np.isnan(distance[1])
+    assert rank[0] != INVALID_RANK and rank[2] != INVALID_RANK
+    with pytest.raises(ValueError):
+        scenario.zone_at(lat, lon)
+
+
+def test_classify_file_keeps_going_past_bad_rows(scenario, tmp_path):
+    source = tmp_path / "points.csv"
+    source.write_text("id,lat,lon\n1,40.7128,-74.0060\n2,,-74.0\n3,abc,-74.0\n4,91,-74.0\n5,40.7,200\n6,45.0,-60.0\n")
+    output = tmp_path / "zones.csv"
+
+    # A chunk size of 2 puts bad rows in several chunks, after output has started.
+    assert classify_file(str(source), str(output), scenario, chunksize=2) == 6
+    zones = pd.read_csv(output)
+    assert list(zones["id"]) == [1, 2, 3, 4, 5, 6]
+    assert list(zones["zone"][1:5]) == [INVALID_ZONE] * 4
+    # Ground zero of the default airburst: no fireball on the ground, inside the 5 psi ring.
+    assert zones["zone"][0] == "Heavy Blast Damage"
+    assert zones["zone"][5] == ZONE_SEVERITY[OUTSIDE_RANK]
+    assert zones["distance_m"][1:5].isna().all()
+
+
+@pytest.mark.parametrize("burst", [
+    {"lat": 500.0, "lon": 0.0},
+    {"lat": 0.0, "lon": -181.0},
+    {"lat": float("nan"), "lon": 0.0},
+    {"lat": 0.0, "lon": 0.0, "yield_kt": 0.0},
+    {"lat": 0.0, "lon": 0.0, "hob_m": -10.0},
+], ids=["lat", "lon", "nan", "yield", "hob"])
+def test_invalid_bursts_are_rejected(burst):
+    with pytest.raises(ValueError):
+        make_burst(bomb=W87, **burst)
+    with pytest.raises(ValueError):
+        Scenario([dict(burst, bomb=W87)])
@@ -0,0 +1,102 @@
+# thumbnails.py
+
+"""
+Resized WebP thumbnails for the images in assets/.
+
+Thumbnails are generated on first use (or ahead of time with
+`python thumbnails.py`) and stored on disk under CACHE_DIR/thumbnails, named
+by the source file's content hash and target width, so an edited image gets
+new thumbnails automatically. Encoded bytes are also kept in a process-wide
+in-memory cache shared by every session.
+"""
+
+import hashlib
+import io
+import os
+
+from cache import CACHE_DIR, LRUCache
+
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
+THUMBNAIL_DIR = os.path.join(CACHE_DIR, "thumbnails")
+# The Information page shows images in quarter-width columns (~320 px); add a
+# width here only together with a page that displays images that large.
+THUMBNAIL_WIDTHS = (320,)
+WEBP_QUALITY = 80
+
+_memory = LRUCache(maxsize=64)
+
+
+def pick_width(display_px: int) -> int:
+    """
+    Smallest thumbnail width that still covers `display_px` (the largest one otherwise).
+    """
+    return next((width for width in THUMBNAIL_WIDTHS if width >= display_px), THUMBNAIL_WIDTHS[-1])
+
+
+def _content_hash(path: str) -> str:
+    # Keyed by (path, mtime, size) so the file is only hashed again after it changes.
+    stat = os.stat(path)
+    key = ("hash", path, stat.st_mtime_ns, stat.st_size)
+    digest = _memory.get(key)
+    if digest is None:
+        with open(path, "rb") as f:
+            digest = hashlib.sha256(f.read()).hexdigest()[:16]
+        _memory.set(key, digest)
+    return digest
+
+
+def thumbnail(filename: str | None, width: int) -> bytes | None:
+    """
+    WebP bytes of `assets/<filename>` scaled to `width` pixels wide (never upscaled),
+    or None if the image does not exist.
+    """
+    if not filename:
+        return None
+    source = os.path.join(ASSETS_DIR, filename)
+    if not os.path.exists(source):
+        return None
+
+    key = (_content_hash(source), width)
+    data = _memory.get(key)
+    if data is not None:
+        return data
+
+    target = os.path.join(THUMBNAIL_DIR, f"{key[0]}_{width}.webp")
+    if os.path.exists(target):
+        with open(target, "rb") as f:
+            data = f.read()
+    else:
+        from PIL import Image
+
+        with Image.open(source) as image:
+            image = image.convert("RGB")
+            if image.width > width:
+                image = image.resize((width, round(image.height * width / image.width)), Image.LANCZOS)
+            buffer = io.BytesIO()
+            image.save(buffer, format="WEBP", quality=WEBP_QUALITY, method=6)
+        data = buffer.getvalue()
+        os.makedirs(THUMBNAIL_DIR, exist_ok=True)
+        # Write then rename, so concurrent first requests never read a partial file.
+        tmp = f"{target}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, target)
+
+    _memory.set(key, data)
+    return data
+
+
+def build_all():
+    """
+    Pre-generates every thumbnail, e.g. as a deploy step.
+    """
+    for filename in sorted(os.listdir(ASSETS_DIR)):
+        if filename.lower().endswith((".jpg", ".jpeg", ".png")):
+            for width in THUMBNAIL_WIDTHS:
+                data = thumbnail(filename, width)
+                print(f"{filename} @ {width}px: {len(data) / 1024:.1f} KiB "
+                      f"(source {os.path.getsize(os.path.join(ASSETS_DIR, filename)) / 1024:.1f} KiB)")
+
+
+if __name__ == "__main__":
+    build_all()
@@ -0,0 +1,197 @@
+# tiles.py
+
+import base64
+import io
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from urllib.parse import quote, urlencode
+
+import numpy as np
+
+from cache import TieredCache
+from effects import peak_overpressure, thermal_fluence
+from geo import haversine_m
+
+# Web-mercator field tiles for the heatmap overlays.
+#
+# Tiles are computed on demand, rendered to PNG in a thread pool (NumPy and the
+# PNG encoder release the GIL, and threads avoid forking a Streamlit server),
+# and cached (LRU + SQLite) per burst and z/x/y. With a tile server (api.py's
+# /v1/tiles route, see tile_url) the map loads them as a regular TileLayer;
+# without one, field_tiles returns the viewport's tiles as data URLs for image
+# overlays, dropping to a coarser zoom when the view needs too many.
+
+TILE_SIZE = 256
+MAX_TILE_ZOOM = 14
+MAX_TILES_PER_VIEW = 48
+
+# Field name -> (function of (distances, yield, hob), lower bound, upper bound, unit).
+# Values are log-scaled between the bounds; anything below the lower bound is transparent.
+FIELDS = {
+    "Peak Overpressure": (peak_overpressure, 0.5, 200.0, "psi"),
+    "Thermal Fluence": (thermal_fluence, 1.0, 1000.0, "cal/cm²"),
+}
+
+# Color stops from weakest to strongest (RGB).
+_COLOR_STOPS = np.array([
+    [0, 0, 255], [0, 200, 255], [0, 255, 0], [255, 255, 0], [255, 128, 0], [255, 0, 0], [255, 255, 255],
+], dtype=float)
+_LUT = np.stack([
+    np.interp(np.linspace(0, 1, 256), np.linspace(0, 1, len(_COLOR_STOPS)), _COLOR_STOPS[:, channel])
+    for channel in range(3)
+], axis=1).astype(np.uint8)
+FIELD_ALPHA = 150
+
+_tile_cache = TieredCache("field_tiles", maxsize=2048)
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ThreadPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(thread_name_prefix="field-tiles")
+        return _pool
+
+
+def tile_bounds(z: int, x: int, y: int) -> tuple:
+    """
+    ((south, west), (north, east)) of a web-mercator tile, in degrees.
+    """
+    n = 2 ** z
+
+    def lat(row):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * row / n))))
+
+    return (lat(y + 1), x / n * 360 - 180), (lat(y), (x + 1) / n * 360 - 180)
+
+
+def tiles_for_bounds(south: float, west: float, north: float, east: float, z: int) -> list:
+    """
+    (x, y) of every tile at zoom `z` intersecting the box. Does not wrap the antimeridian.
+    """
+    n = 2 ** z
+
+    def to_tile(lat, lon):
+        lat = max(min(lat, 85.0511), -85.0511)
+        x = int((lon + 180) / 360 * n)
+        y = int((1 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2 * n)
+        return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+    x0, y0 = to_tile(north, west)
+    x1, y1 = to_tile(south, east)
+    return [(x, y) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1)]
+
+
+def _pixel_centers(z: int, x: int, y: int) -> tuple:
+    n = 2 ** z
+    offsets = (np.arange(TILE_SIZE) + 0.5) / TILE_SIZE
+    lons = (x + offsets) / n * 360 - 180
+    lats = np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * (y + offsets) / n))))
+    return np.meshgrid(lats, lons, indexing='ij')
+
+
+def render_tile(field: str, yield_kt: float, hob_m: float, lat: float, lon: float, z: int, x: int, y: int) -> bytes | None:
+    """
+    PNG bytes for one field tile, or None when the whole tile is below the field's lower bound.
+    """
+    function, vmin, vmax, _ = FIELDS[field]
+    lats, lons = _pixel_centers(z, x, y)
+    values = function(haversine_m(lat, lon, lats, lons), yield_kt, hob_m)
+    visible = values >= vmin
+    if not visible.any():
+        return None
+    scaled = np.log(np.clip(values, vmin, vmax) / vmin) / np.log(vmax / vmin)
+    rgba = np.empty((TILE_SIZE, TILE_SIZE, 4), dtype=np.uint8)
+    rgba[..., :3] = _LUT[(scaled * 255).astype(np.uint8)]
+    rgba[..., 3] = np.where(visible, FIELD_ALPHA, 0)
+
+    from PIL import Image
+    buffer = io.BytesIO()
+    Image.fromarray(rgba, "RGBA").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+@lru_cache(maxsize=1)
+def blank_tile() -> bytes:
+    """
+    A fully transparent tile, served in place of empty ones.
+    """
+    from PIL import Image
+    buffer = io.BytesIO()
+    Image.new("RGBA", (TILE_SIZE, TILE_SIZE), (0, 0, 0, 0)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _render_job(args):
+    return render_tile(*args)
+
+
+def _burst_key(field: str, yield_kt: float, hob_m: float, lat: float, lon: float) -> tuple:
+    return field, float(yield_kt), float(hob_m), round(lat, 4), round(lon, 4)
+
+
+def _cached_tiles(keys: list) -> list:
+    """
+    PNG bytes (or None for empty tiles) per cache key; misses are rendered in the thread pool.
+    """
+    _missing = object()
+    pngs = [_tile_cache.get(key, _missing) for key in keys]
+    misses = [i for i, png in enumerate(pngs) if png is _missing]
+    if len(misses) == 1:
+        pngs[misses[0]] = _render_job(keys[misses[0]])
+        _tile_cache.set(keys[misses[0]], pngs[misses[0]])
+    elif misses:
+        rendered = _get_pool().map(_render_job, [keys[i] for i in misses])
+        for i, png in zip(misses, rendered):
+            _tile_cache.set(keys[i], png)
+            pngs[i] = png
+    return pngs
+
+
+def field_tile(field: str, yield_kt: float, hob_m: float, lat: float, lon: float, z: int, x: int, y: int) -> bytes | None:
+    """
+    One cached tile as PNG bytes, or None when it is empty. Backs the tile server route.
+    """
+    return _cached_tiles([_burst_key(field, yield_kt, hob_m, lat, lon) + (z, x, y)])[0]
+
+
+def tile_url(base_url: str, field: str, yield_kt: float, hob_m: float, lat: float, lon: float) -> str:
+    """
+    Leaflet URL template ({z}/{x}/{y}) for a field's tiles on a tile server (api.py).
+    """
+    query = urlencode({"yield_kt": float(yield_kt), "hob_m": float(hob_m), "lat": round(lat, 4), "lon": round(lon, 4)})
+    return f"{base_url.rstrip('/')}/v1/tiles/{quote(field)}/{{z}}/{{x}}/{{y}}.png?{query}"
+
+
+def view_zoom(bounds: tuple, zoom: int) -> int:
+    """
+    The tile zoom for a viewport: the map's zoom (capped at MAX_TILE_ZOOM),
+    lowered until the view needs at most MAX_TILES_PER_VIEW tiles.
+    """
+    (south, west), (north, east) = bounds
+    z = int(min(max(zoom, 0), MAX_TILE_ZOOM))
+    while z > 0 and len(tiles_for_bounds(south, west, north, east, z)) > MAX_TILES_PER_VIEW:
+        z -= 1
+    return z
+
+
+def field_tiles(field: str, yield_kt: float, hob_m: float, lat: float, lon: float, bounds: tuple, zoom: int) -> list:
+    """
+    Tiles covering `bounds` ((south, west), (north, east)), at the map's zoom
+    or a coarser one (see view_zoom) so the whole view is covered.
+    Returns [(tile bounds, PNG data URL)], skipping empty tiles.
+    """
+    z = view_zoom(bounds, zoom)
+    (south, west), (north, east) = bounds
+    coords = tiles_for_bounds(south, west, north, east, z)
+    burst = _burst_key(field, yield_kt, hob_m, lat, lon)
+    pngs = _cached_tiles([burst + (z, x, y) for x, y in coords])
+
+    return [
+        (tile_bounds(z, x, y), "data:image/png;base64," + base64.b64encode(png).decode("ascii"))
+        for (x, y), png in zip(coords, pngs) if png is not None
+    ]
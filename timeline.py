@@ -0,0 +1,281 @@
+# timeline.py
+
+"""
+Time-resolved blast effects for the animated map.
+
+For one (yield, HOB) everything is computed in a single vectorized pass and
+memoized:
+  * fireball growth: Sedov-Taylor R ~ t^(2/5) until the maximum radius;
+  * thermal pulse: the normalized power curve 2 tau^2 / (1 + tau^4), with
+    tau = t / t_max and t_max = 0.0417 s * Y^0.44, integrated to the fraction
+    of thermal energy delivered so far; the burn ring is where that fraction
+    of the yield produces the zone's fluence;
+  * blast front: the Rankine-Hugoniot shock speed for the peak overpressure
+    at each slant distance from the burst point (the hemispherical, surface-burst
+    curve), integrated along the slant path, gives the arrival time at every
+    ground distance;
+  * overpressure at each ring against time: a Friedlander waveform starting
+    at the ring's arrival time.
+
+`frames` turns these into a compact frame table (radii per timestep, rounded,
+as lists) that is embedded once in the map, where `animation_element` plays
+it back in the browser: scrubbing and playback never rerun the script.
+These are open-literature approximations meant for training visuals.
+"""
+
+import json
+from functools import lru_cache
+
+import numpy as np
+
+from data import EFFECT_ZONES
+from effects import compute_radii, fireball_radius, peak_overpressure, thermal_key, thermal_radii, THERMAL_FLUENCE_CAL_CM2
+
+SOUND_SPEED_M_S = 340.0
+AMBIENT_PSI = 14.7
+GAMMA = 1.4
+AIR_DENSITY_KG_M3 = 1.225
+J_PER_KT = 4.184e12
+SEDOV_CONSTANT = 1.03
+THERMAL_MAX_1KT_S = 0.0417        # time of the thermal power maximum for 1 kt
+THERMAL_MAX_EXPONENT = 0.44
+POSITIVE_PHASE_1KT_S = 0.35       # blast positive-phase duration for 1 kt, scaled by Y^(1/3)
+
+FRAME_COUNT = 120
+FRAME_MS = 80
+PATH_SAMPLES = 4096
+
+
+def shock_speed(overpressure_psi) -> np.ndarray:
+    """
+    Shock front speed (m/s) for a peak overpressure (Rankine-Hugoniot, ideal air).
+    """
+    ratio = np.asarray(overpressure_psi, dtype=float) / AMBIENT_PSI
+    return SOUND_SPEED_M_S * np.sqrt(1.0 + (GAMMA + 1) / (2 * GAMMA) * ratio)
+
+
+@lru_cache(maxsize=256)
+def _arrival_curve(yield_kt: float, hob_m: float) -> tuple:
+    """
+    (ground distances, arrival times) out to twice the outermost zone radius.
+
+    The front's strength depends on how far it has travelled from the burst
+    point, so overpressure is taken at the slant distance, including on the
+    way down to ground zero. The ground-range curve would be extrapolated to
+    about 1 m there and send the front across the burst height almost at once.
+    """
+    radii = compute_radii(yield_kt, hob_m)
+    reach = max(2.0 * max(float(radii[zone["metric"]]) for zone in EFFECT_ZONES.values()), 1.0)
+    slant = np.linspace(0.0, np.hypot(reach, hob_m), PATH_SAMPLES)
+    ground = np.sqrt(np.maximum(slant ** 2 - hob_m ** 2, 0.0))
+    pace = 1.0 / shock_speed(peak_overpressure(slant, yield_kt, 0.0))
+    times = np.concatenate([[0.0], np.cumsum((pace[1:] + pace[:-1]) / 2 * np.diff(slant))])
+    # Keep the part of the path that has reached the ground (the first sample is ground zero).
+    on_ground = slant >= hob_m
+    first = max(int(np.argmax(on_ground)) - 1, 0)
+    ground, times = ground[first:], times[first:]
+    ground[0] = 0.0
+    return ground, times
+
+
+def arrival_time(distances_m, yield_kt: float, hob_m: float) -> np.ndarray:
+    """
+    Blast-front arrival time (s) at ground distances from ground zero. Beyond
+    the precomputed path the front is taken to move at the speed of sound.
+    """
+    ground, times = _arrival_curve(float(yield_kt), float(hob_m))
+    d = np.asarray(distances_m, dtype=float)
+    beyond = times[-1] + (d - ground[-1]) / SOUND_SPEED_M_S
+    return np.where(d <= ground[-1], np.interp(d, ground, times), beyond)
+
+
+def blast_front_radius(times_s, yield_kt: float, hob_m: float) -> np.ndarray:
+    """
+    Ground radius (m) the blast front has reached at each time; 0 before it touches down.
+    """
+    ground, times = _arrival_curve(float(yield_kt), float(hob_m))
+    t = np.asarray(times_s, dtype=float)
+    beyond = ground[-1] + (t - times[-1]) * SOUND_SPEED_M_S
+    return np.where(t <= times[-1], np.interp(t, times, ground, left=0.0), beyond)
+
+
+def fireball_growth(times_s, yield_kt: float) -> np.ndarray:
+    """
+    Fireball radius (m) against time: Sedov-Taylor expansion capped at the maximum radius.
+    """
+    t = np.maximum(np.asarray(times_s, dtype=float), 0.0)
+    energy = yield_kt * J_PER_KT
+    sedov = SEDOV_CONSTANT * (energy * t ** 2 / AIR_DENSITY_KG_M3) ** 0.2
+    return np.minimum(sedov, fireball_radius(yield_kt))
+
+
+def thermal_fraction(times_s, yield_kt: float) -> np.ndarray:
+    """
+    Fraction of the thermal energy delivered by each time.
+    """
+    t_max = THERMAL_MAX_1KT_S * yield_kt ** THERMAL_MAX_EXPONENT
+    tau = np.linspace(0.0, 200.0, 20001)
+    power = 2 * tau ** 2 / (1 + tau ** 4)
+    delivered = np.concatenate([[0.0], np.cumsum((power[1:] + power[:-1]) / 2 * np.diff(tau))])
+    return np.interp(np.asarray(times_s, dtype=float) / t_max, tau, delivered / (np.pi / np.sqrt(2)), right=1.0)
+
+
+def thermal_front_radius(times_s, yield_kt: float, hob_m: float, fluence_cal_cm2: float = 8.0) -> np.ndarray:
+    """
+    Ground radius (m) that has received `fluence_cal_cm2` by each time.
+    """
+    i = THERMAL_FLUENCE_CAL_CM2.index(fluence_cal_cm2)
+    delivered = np.maximum(thermal_fraction(times_s, yield_kt), 1e-9) * yield_kt
+    return thermal_radii(delivered, hob_m)[i]
+
+
+def overpressure_history(times_s, distances_m, yield_kt: float, hob_m: float) -> np.ndarray:
+    """
+    Overpressure (psi) at each distance (rows) against time (columns): a
+    Friedlander waveform of the distance's peak overpressure from its arrival time.
+    """
+    d = np.asarray(distances_m, dtype=float)[:, None]
+    t = np.asarray(times_s, dtype=float)[None, :]
+    since = t - arrival_time(d, yield_kt, hob_m)
+    duration = POSITIVE_PHASE_1KT_S * np.cbrt(yield_kt)
+    wave = (1 - since / duration) * np.exp(-since / duration)
+    return np.where(since >= 0, np.maximum(wave, 0.0) * peak_overpressure(d, yield_kt, hob_m), 0.0)
+
+
+@lru_cache(maxsize=128)
+def frames(yield_kt: float, hob_m: float, radii: tuple | None = None, count: int = FRAME_COUNT) -> str:
+    """
+    The animation's frame table as JSON, memoized per (yield, HOB, ring radii).
+    `radii` (EFFECT_ZONES order) replaces the computed ring radii, as in
+    data.build_effects, so the rings match the static map.
+
+    Frame times are spaced quadratically so the first seconds (fireball and
+    thermal pulse) get as many frames as the slower blast front. Keys: "t",
+    "fireball", "thermal", "blast" (per frame) and "rings", one entry per
+    effect zone with its radius, color, arrival time and overpressure per frame.
+    """
+    if radii is None:
+        zone_radii = compute_radii(yield_kt, hob_m)
+        radii = [float(zone_radii[zone["metric"]]) for zone in EFFECT_ZONES.values()]
+    ring_radii = np.asarray(radii, dtype=float)
+    thermal_end = 10 * THERMAL_MAX_1KT_S * yield_kt ** THERMAL_MAX_EXPONENT
+    end = max(1.15 * float(arrival_time(ring_radii.max(), yield_kt, hob_m)), thermal_end)
+    t = end * np.linspace(0.0, 1.0, count) ** 2
+
+    arrivals = arrival_time(ring_radii, yield_kt, hob_m)
+    pressure = overpressure_history(t, ring_radii, yield_kt, hob_m)
+    zone_metrics = {zone["metric"] for zone in EFFECT_ZONES.values()}
+    fluence = next(f for f in THERMAL_FLUENCE_CAL_CM2 if thermal_key(f) in zone_metrics)
+    table = {
+        "t": np.round(t, 3).tolist(),
+        "fireball": np.round(fireball_growth(t, yield_kt)).tolist(),
+        "thermal": np.round(thermal_front_radius(t, yield_kt, hob_m, fluence)).tolist(),
+        "blast": np.round(blast_front_radius(t, yield_kt, hob_m)).tolist(),
+        "rings": [
+            {"name": name, "radius": round(float(radius)), "arrival": round(float(arrival), 2),
+             "color": "#{:02x}{:02x}{:02x}".format(*zone["color"][:3]),
+             "psi": np.round(psi, 1).tolist()}
+            for (name, zone), radius, arrival, psi in zip(EFFECT_ZONES.items(), ring_radii, arrivals, pressure)
+        ],
+    }
+    return json.dumps(table, separators=(",", ":"))
+
+
+_ANIMATION_JS = """
+{% macro script(this, kwargs) %}
+(function() {
+    var layer = {{ this._parent.get_name() }};
+    var data = {{ this.frames }};
+    var userArrival = {{ this.user_arrival }};
+    var center = [{{ this.lat }}, {{ this.lon }}];
+    var last = data.t.length - 1;
+    var rings = data.rings.map(function(ring) {
+        return L.circle(center, {radius: ring.radius, color: ring.color, weight: 1, opacity: 0.3, fill: false}).addTo(layer);
+    });
+    var thermal = L.circle(center, {radius: 0, color: "#ffa500", weight: 1, fillOpacity: 0.15}).addTo(layer);
+    var blast = L.circle(center, {radius: 0, color: "#ffffff", weight: 2, dashArray: "6 4", fill: false}).addTo(layer);
+    var fireball = L.circle(center, {radius: 0, color: "#ffff00", weight: 1, fillOpacity: 0.7}).addTo(layer);
+    var frame = 0, timer = null, control = null, button, slider, label;
+
+    function show(i) {
+        frame = i;
+        var t = data.t[i];
+        fireball.setRadius(data.fireball[i]);
+        thermal.setRadius(data.thermal[i]);
+        blast.setRadius(data.blast[i]);
+        var reached = null;
+        data.rings.forEach(function(ring, k) {
+            // Ring outline flares with the overpressure passing through it.
+            var strength = Math.min(ring.psi[i] / 5, 1);
+            rings[k].setStyle({weight: 1 + 5 * strength, opacity: 0.3 + 0.7 * strength});
+            if (t >= ring.arrival && (!reached || ring.arrival > reached.arrival)) { reached = ring; }
+        });
+        var text = "T+" + t.toFixed(t < 10 ? 2 : 1) + " s";
+        if (reached) { text += " · blast past " + reached.name; }
+        if (userArrival !== null) { text += t >= userArrival ? " · reached you" : " · reaches you at T+" + userArrival.toFixed(1) + " s"; }
+        label.textContent = text;
+        slider.value = i;
+    }
+    function pause() {
+        if (timer) { clearInterval(timer); timer = null; }
+        if (button) { button.textContent = "▶"; }
+    }
+    function play() {
+        if (timer) { return; }
+        if (frame >= last) { show(0); }
+        button.textContent = "⏸";
+        timer = setInterval(function() {
+            if (frame >= last) { pause(); } else { show(frame + 1); }
+        }, {{ this.frame_ms }});
+    }
+    function start(map) {
+        if (control) { return; }
+        control = L.control({position: "bottomleft"});
+        control.onAdd = function() {
+            var box = L.DomUtil.create("div", "leaflet-bar");
+            box.style.cssText = "background:#222;color:#eee;padding:6px 8px;font:12px sans-serif;min-width:260px";
+            button = L.DomUtil.create("button", "", box);
+            button.style.cssText = "margin-right:6px;cursor:pointer";
+            slider = L.DomUtil.create("input", "", box);
+            slider.type = "range"; slider.min = 0; slider.max = last; slider.value = 0;
+            slider.style.cssText = "width:140px;vertical-align:middle";
+            label = L.DomUtil.create("div", "", box);
+            button.onclick = function() { timer ? pause() : play(); };
+            slider.oninput = function() { pause(); show(parseInt(slider.value, 10)); };
+            L.DomEvent.disableClickPropagation(box);
+            L.DomEvent.disableScrollPropagation(box);
+            return box;
+        };
+        control.addTo(map);
+        pause();
+        show(0);
+    }
+    function stop() {
+        pause();
+        if (control) { control.remove(); control = null; }
+    }
+    // The layer is replaced on every rerun; its timer and control go with it.
+    layer.on("add", function(e) { start(e.target._map); });
+    layer.on("remove", stop);
+    if (layer._map) { start(layer._map); }
+})();
+{% endmacro %}
+"""
+
+
+def animation_element(lat: float, lon: float, yield_kt: float, hob_m: float, user_arrival_s: float | None = None,
+                      radii: tuple | None = None):
+    """
+    A folium element that plays the frame table at (lat, lon); add it to a FeatureGroup.
+    """
+    from branca.element import MacroElement
+    from jinja2 import Template
+
+    element = MacroElement()
+    element._name = "BlastAnimation"
+    element._template = Template(_ANIMATION_JS)
+    element.frames = frames(float(yield_kt), float(hob_m), radii)
+    element.user_arrival = "null" if user_arrival_s is None else f"{user_arrival_s:.3f}"
+    element.lat, element.lon = float(lat), float(lon)
+    element.frame_ms = FRAME_MS
+    return element